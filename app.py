@@ -8,12 +8,31 @@ PROJECT_ROOT = os.path.dirname(os.path.abspath(__file__))
 SRC_DIR = os.path.join(PROJECT_ROOT, "src")
 sys.path.insert(0, SRC_DIR)
 
+import gradio as gr
+import uvicorn
+from fastapi import FastAPI
+from fastapi.responses import PlainTextResponse
+
+from learnbee.metrics import CONTENT_TYPE, render_metrics
 from learnbee.ui import create_gradio_ui
 
 
 if __name__ == "__main__":
     demo = create_gradio_ui()
 
-    # Launch the Gradio app with MCP server enabled.
+    # Prometheus metrics are served next to the Gradio app, which is mounted at the root
+    app = FastAPI()
+
+    @app.get("/metrics", include_in_schema=False)
+    def metrics():
+        return PlainTextResponse(render_metrics(), media_type=CONTENT_TYPE)
+
+    # Mount the Gradio app with MCP server enabled.
     # NOTE: It is required to restart the app when you add or remove MCP tools.
-    demo.launch(mcp_server=True)
+    app = gr.mount_gradio_app(app, demo, path="/", mcp_server=True)
+    uvicorn.run(
+        app,
+        host=os.getenv("GRADIO_SERVER_NAME", "127.0.0.1"),
+        port=int(os.getenv("GRADIO_SERVER_PORT", "7860")),
+        log_level="warning",
+    )
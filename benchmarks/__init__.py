@@ -0,0 +1 @@
+"""Offline benchmarks for Learnbee, run against a local fake OpenAI-compatible server."""
@@ -0,0 +1,121 @@
+"""Helpers shared by the benchmark scripts."""
+
+import os
+import platform
+import socket
+import statistics
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from datetime import datetime, timezone
+from pathlib import Path
+
+import httpx
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+RESULTS_DIR = PROJECT_ROOT / "benchmarks" / "results"
+
+if str(PROJECT_ROOT / "src") not in sys.path:
+    sys.path.insert(0, str(PROJECT_ROOT / "src"))
+
+
+def percentile(values: list[float], pct: float) -> float:
+    """Nearest-rank percentile of a list of values."""
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, round(pct / 100 * len(ordered)) - 1))
+    return ordered[index]
+
+
+def summarize(samples: list[float], scale: float = 1000.0) -> dict:
+    """
+    Summarize timing samples.
+
+    Args:
+        samples (list[float]): Durations in seconds.
+        scale (float): Multiplier applied to the reported values (1000 for milliseconds).
+
+    Returns:
+        dict: Count, mean, p50, p99, min and max of the samples.
+    """
+    if not samples:
+        return {"n": 0}
+    return {
+        "n": len(samples),
+        "mean": round(statistics.mean(samples) * scale, 4),
+        "p50": round(percentile(samples, 50) * scale, 4),
+        "p99": round(percentile(samples, 99) * scale, 4),
+        "min": round(min(samples) * scale, 4),
+        "max": round(max(samples) * scale, 4),
+    }
+
+
+def git_commit() -> str:
+    """Return the short hash of the checked out commit, with a suffix if the tree is dirty."""
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=PROJECT_ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+        dirty = subprocess.run(
+            ["git", "status", "--porcelain", "--untracked-files=no"], cwd=PROJECT_ROOT, capture_output=True, text=True
+        ).stdout.strip()
+        return f"{commit}-dirty" if dirty else commit
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def run_metadata() -> dict:
+    """Describe where and when a benchmark ran."""
+    return {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+    }
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+@contextmanager
+def launch_app(timeout: float = 120.0, env: dict = None):
+    """
+    Start app.py on a free port and yield its base URL and process.
+
+    Args:
+        timeout (float): Seconds to wait for the app to answer.
+        env (dict): Extra environment variables for the app.
+    """
+    port = _free_port()
+    env = {**os.environ, **(env or {}), "GRADIO_SERVER_NAME": "127.0.0.1", "GRADIO_SERVER_PORT": str(port)}
+    process = subprocess.Popen(
+        [sys.executable, str(PROJECT_ROOT / "app.py")],
+        cwd=PROJECT_ROOT,
+        env=env,
+        stdout=subprocess.DEVNULL,
+        stderr=subprocess.DEVNULL,
+    )
+    base_url = f"http://127.0.0.1:{port}"
+    try:
+        deadline = time.monotonic() + timeout
+        while True:
+            if process.poll() is not None:
+                raise RuntimeError(f"app.py exited with code {process.returncode}")
+            try:
+                if httpx.get(f"{base_url}/config", timeout=2).status_code == 200:
+                    break
+            except httpx.HTTPError:
+                pass
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"app.py did not start within {timeout} seconds")
+            time.sleep(0.5)
+        yield base_url, process
+    finally:
+        process.terminate()
+        try:
+            process.wait(timeout=10)
+        except subprocess.TimeoutExpired:
+            process.kill()
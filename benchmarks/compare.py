@@ -0,0 +1,76 @@
+"""
+Compare two benchmark result files written by benchmarks.run.
+
+Usage:
+    python -m benchmarks.compare benchmarks/results/OLD.json benchmarks/results/NEW.json [--threshold 10]
+
+Prints the p50 of every metric in both runs and the relative change. Changes
+beyond the threshold are flagged; the exit code is 1 if any metric regressed.
+"""
+
+import argparse
+import json
+import sys
+from pathlib import Path
+
+
+def _metrics(results: dict) -> dict[str, float]:
+    """Flatten a result file into ``{"suite/benchmark/metric": p50}``."""
+    metrics = {}
+    for suite in ("e2e", "micro"):
+        for name, values in results.get(suite, {}).items():
+            for metric, summary in values.items():
+                if "p50" in summary:
+                    metrics[f"{suite}/{name}/{metric}"] = summary["p50"]
+    return metrics
+
+
+def compare(old: dict, new: dict, threshold: float) -> list[dict]:
+    """
+    Compare the p50 of every metric present in both runs.
+
+    Args:
+        old (dict): Baseline results.
+        new (dict): Results to compare against the baseline.
+        threshold (float): Change, in percent, beyond which a metric is flagged.
+
+    Returns:
+        list[dict]: One row per metric with old, new, change_pct and status.
+    """
+    old_metrics, new_metrics = _metrics(old), _metrics(new)
+    rows = []
+    for key in sorted(old_metrics.keys() & new_metrics.keys()):
+        before, after = old_metrics[key], new_metrics[key]
+        change = (after - before) / before * 100 if before else 0.0
+        if change > threshold:
+            status = "slower"
+        elif change < -threshold:
+            status = "faster"
+        else:
+            status = ""
+        rows.append({"metric": key, "old": before, "new": after, "change_pct": round(change, 1), "status": status})
+    return rows
+
+
+def main(argv: list[str] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Compare two benchmark result files.")
+    parser.add_argument("old", type=Path)
+    parser.add_argument("new", type=Path)
+    parser.add_argument("--threshold", type=float, default=10.0, help="Percent change to flag (default: 10).")
+    args = parser.parse_args(argv)
+
+    old = json.loads(args.old.read_text())
+    new = json.loads(args.new.read_text())
+    print(f"{old.get('commit', args.old.stem)} -> {new.get('commit', args.new.stem)}")
+    rows = compare(old, new, args.threshold)
+    for row in rows:
+        print(
+            f"{row['metric']:<60} {row['old']:>12} -> {row['new']:>12} "
+            f"{row['change_pct']:>+8.1f}%  {row['status']}"
+        )
+    return 1 if any(row["status"] == "slower" for row in rows) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,197 @@
+"""
+Local OpenAI-compatible stub server for offline benchmarks.
+
+Serves ``POST /v1/chat/completions`` (streamed and non-streamed) with a
+configurable time to first token, token rate and jitter, so latency numbers
+do not depend on the network or on a real model.
+
+Usage:
+    python -m benchmarks.fake_openai --port 8765 --ttft 0.3 --tokens-per-second 80 --jitter 0.1
+
+Then point the app at it:
+    OPENAI_BASE_URL=http://127.0.0.1:8765/v1 OPENAI_API_KEY=fake python app.py
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from dataclasses import asdict, dataclass
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+WORDS = (
+    "circle square triangle dinosaur star planet ocean rainbow count color shape animal "
+    "big small round pointy happy learn explore look find"
+).split()
+
+
+@dataclass
+class FakeModelConfig:
+    """Timing and size of the fake completions."""
+
+    # Seconds before the first token is sent
+    ttft: float = 0.3
+    tokens_per_second: float = 80.0
+    # Relative standard deviation applied to every delay
+    jitter: float = 0.1
+    # Completion length in tokens, capped by the request's max_tokens
+    completion_tokens: int = 200
+    seed: int = 0
+
+
+def _delay(base: float, config: FakeModelConfig, rng: random.Random) -> float:
+    return max(0.0, rng.gauss(base, base * config.jitter)) if config.jitter else base
+
+
+def _completion_text(tokens: int, rng: random.Random) -> list[str]:
+    """Return ``tokens`` word tokens, with a line break every dozen words."""
+    return [rng.choice(WORDS) + ("\n" if (i + 1) % 12 == 0 else " ") for i in range(tokens)]
+
+
+class FakeOpenAIHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    config = FakeModelConfig()
+
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        if self.path.rstrip("/").endswith("/models"):
+            self._send_json({"object": "list", "data": [{"id": "fake", "object": "model", "owned_by": "benchmarks"}]})
+        else:
+            self._send_json({"error": {"message": "Not found"}}, status=404)
+
+    def do_POST(self):
+        if not self.path.rstrip("/").endswith("/chat/completions"):
+            self._send_json({"error": {"message": "Not found"}}, status=404)
+            return
+        body = json.loads(self.rfile.read(int(self.headers.get("Content-Length", 0))) or b"{}")
+        config = self.config
+        rng = random.Random(config.seed + threading.get_ident())
+        tokens = min(config.completion_tokens, body.get("max_tokens") or config.completion_tokens)
+        prompt_tokens = sum(len(str(m.get("content", ""))) for m in body.get("messages", [])) // 4
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": tokens,
+            "total_tokens": prompt_tokens + tokens,
+            "prompt_tokens_details": {"cached_tokens": 0},
+        }
+        model = body.get("model", "fake")
+        pieces = _completion_text(tokens, rng)
+
+        time.sleep(_delay(config.ttft, config, rng))
+        if not body.get("stream"):
+            # Non-streamed requests still take as long as generating every token
+            time.sleep(_delay(tokens / config.tokens_per_second, config, rng))
+            self._send_json(
+                {
+                    "id": "chatcmpl-fake",
+                    "object": "chat.completion",
+                    "created": int(time.time()),
+                    "model": model,
+                    "choices": [
+                        {"index": 0, "message": {"role": "assistant", "content": "".join(pieces)}, "finish_reason": "stop"}
+                    ],
+                    "usage": usage,
+                }
+            )
+            return
+
+        self.send_response(200)
+        self.send_header("Content-Type", "text/event-stream")
+        self.send_header("Transfer-Encoding", "chunked")
+        self.end_headers()
+        for index, piece in enumerate(pieces):
+            if index:
+                time.sleep(_delay(1 / config.tokens_per_second, config, rng))
+            self._send_event(self._chunk(model, {"content": piece}))
+        self._send_event(self._chunk(model, {}, finish_reason="stop"))
+        if (body.get("stream_options") or {}).get("include_usage"):
+            self._send_event({**self._chunk(model, {}), "choices": [], "usage": usage})
+        self._send_event("[DONE]")
+        self.wfile.write(b"0\r\n\r\n")
+        self.wfile.flush()
+
+    @staticmethod
+    def _chunk(model: str, delta: dict, finish_reason: str = None) -> dict:
+        return {
+            "id": "chatcmpl-fake",
+            "object": "chat.completion.chunk",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish_reason}],
+        }
+
+    def _send_event(self, data):
+        payload = f"data: {data if isinstance(data, str) else json.dumps(data)}\n\n".encode()
+        self.wfile.write(b"%x\r\n%s\r\n" % (len(payload), payload))
+        self.wfile.flush()
+
+    def _send_json(self, data: dict, status: int = 200):
+        payload = json.dumps(data).encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+
+def start_fake_server(config: FakeModelConfig = None, host: str = "127.0.0.1", port: int = 0):
+    """
+    Start the stub server in a background thread.
+
+    Args:
+        config (FakeModelConfig): Timing of the fake completions.
+        host (str): Interface to bind.
+        port (int): Port to bind; 0 picks a free port.
+
+    Returns:
+        tuple[ThreadingHTTPServer, str]: The server (call shutdown() to stop it) and its OpenAI base URL.
+    """
+    handler = type("ConfiguredFakeOpenAIHandler", (FakeOpenAIHandler,), {"config": config or FakeModelConfig()})
+    server = ThreadingHTTPServer((host, port), handler)
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}/v1"
+
+
+def add_config_arguments(parser: argparse.ArgumentParser):
+    """Add the FakeModelConfig options to a command line parser."""
+    defaults = FakeModelConfig()
+    parser.add_argument("--ttft", type=float, default=defaults.ttft, help="Seconds before the first token.")
+    parser.add_argument("--tokens-per-second", type=float, default=defaults.tokens_per_second)
+    parser.add_argument("--jitter", type=float, default=defaults.jitter, help="Relative standard deviation of delays.")
+    parser.add_argument("--completion-tokens", type=int, default=defaults.completion_tokens)
+    parser.add_argument("--seed", type=int, default=defaults.seed)
+
+
+def config_from_args(args) -> FakeModelConfig:
+    return FakeModelConfig(
+        ttft=args.ttft,
+        tokens_per_second=args.tokens_per_second,
+        jitter=args.jitter,
+        completion_tokens=args.completion_tokens,
+        seed=args.seed,
+    )
+
+
+def main(argv: list[str] = None):
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Run a fake OpenAI-compatible server.")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8765)
+    add_config_arguments(parser)
+    args = parser.parse_args(argv)
+
+    config = config_from_args(args)
+    server, base_url = start_fake_server(config, args.host, args.port)
+    print(f"Fake OpenAI server on {base_url} with {asdict(config)}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,303 @@
+"""
+Concurrent load test of the Gradio app with simulated children.
+
+Usage:
+    python -m benchmarks.load_test --children 1 4 16 32 --turns 5 --think-time 2
+    python -m benchmarks.load_test --base-url http://localhost:7860 --children 8
+
+By default app.py is launched on a free port and pointed at the fake OpenAI
+server (see benchmarks/fake_openai.py), so no API key is needed. Each child
+gets its own Gradio session. It loads a lesson, then sends ``--turns`` chat
+messages through the /chat API, waiting ``--think-time`` seconds (±50%)
+between turns. Every concurrency level is run in turn. For each level the
+harness reports throughput, queue wait, time to first token, latency, error
+rate and the server's CPU and RSS.
+
+The /chat API endpoint is stateless, so every turn is sent without history.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import asdict, dataclass, field
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import launch_app, run_metadata, summarize  # noqa: E402
+from benchmarks.fake_openai import add_config_arguments, config_from_args, start_fake_server  # noqa: E402
+from gradio_client import Client  # noqa: E402
+from gradio_client.utils import Status  # noqa: E402
+from learnbee.constants import TUTOR_NAMES  # noqa: E402
+
+CHILD_MESSAGES = [
+    "What is this?",
+    "Can you tell me more?",
+    "Why is that?",
+    "I don't understand",
+    "How many are there?",
+    "Can we play a game?",
+    "What color is it?",
+    "That's so cool! What else?",
+]
+
+# How often a pending job is checked for a state change, in seconds
+POLL_INTERVAL = 0.005
+
+
+@dataclass
+class ChildStats:
+    """Timings collected by one simulated child, in seconds."""
+
+    load_lesson: list[float] = field(default_factory=list)
+    queue_wait: list[float] = field(default_factory=list)
+    ttft: list[float] = field(default_factory=list)
+    latency: list[float] = field(default_factory=list)
+    turns: int = 0
+    errors: int = 0
+
+
+class ResourceSampler:
+    """Sample the CPU usage and resident memory of a process from /proc (Linux only)."""
+
+    def __init__(self, pid: int, interval: float = 0.5):
+        self.pid = pid
+        self.interval = interval
+        self.cpu_percent: list[float] = []
+        self.rss_mb: list[float] = []
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        try:
+            self._ticks_per_second = os.sysconf("SC_CLK_TCK")
+        except (AttributeError, ValueError, OSError):
+            self._ticks_per_second = 100
+
+    def _cpu_seconds(self) -> float:
+        with open(f"/proc/{self.pid}/stat") as f:
+            # The process name may contain spaces; the fields after it are fixed
+            fields = f.read().rsplit(")", 1)[1].split()
+        return (int(fields[11]) + int(fields[12])) / self._ticks_per_second
+
+    def _rss(self) -> float:
+        with open(f"/proc/{self.pid}/status") as f:
+            for line in f:
+                if line.startswith("VmRSS:"):
+                    return int(line.split()[1]) / 1024
+        return 0.0
+
+    def _run(self):
+        try:
+            last_cpu, last_time = self._cpu_seconds(), time.monotonic()
+            while not self._stop.wait(self.interval):
+                cpu, now = self._cpu_seconds(), time.monotonic()
+                self.cpu_percent.append(100 * (cpu - last_cpu) / (now - last_time))
+                self.rss_mb.append(self._rss())
+                last_cpu, last_time = cpu, now
+        except OSError:
+            # No /proc on this platform, or the process exited
+            pass
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+    def summary(self) -> dict:
+        if not self.cpu_percent:
+            return {"cpu_percent_mean": None, "cpu_percent_max": None, "rss_mb_max": None}
+        return {
+            "cpu_percent_mean": round(sum(self.cpu_percent) / len(self.cpu_percent), 1),
+            "cpu_percent_max": round(max(self.cpu_percent), 1),
+            "rss_mb_max": round(max(self.rss_mb), 1),
+        }
+
+
+class _NoSampler:
+    """Stand-in for ResourceSampler when the server runs elsewhere."""
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        pass
+
+    def summary(self) -> dict:
+        return {"cpu_percent_mean": None, "cpu_percent_max": None, "rss_mb_max": None}
+
+
+def _run_job(client: Client, stats: ChildStats, *args, api_name: str):
+    """
+    Submit a call, wait for it to finish, and record its queue wait, first output and latency.
+
+    Returns:
+        The final output of the call.
+    """
+    start = time.perf_counter()
+    job = client.submit(*args, api_name=api_name)
+    started = first_output = None
+    while not job.done():
+        now = time.perf_counter()
+        if started is None and job.status().code in (Status.PROCESSING, Status.ITERATING):
+            started = now
+        if first_output is None and job.outputs():
+            first_output = now
+        time.sleep(POLL_INTERVAL)
+    result = job.result()
+    end = time.perf_counter()
+    stats.queue_wait.append((started or end) - start)
+    stats.ttft.append((first_output or end) - start)
+    stats.latency.append(end - start)
+    return result
+
+
+def simulate_child(base_url: str, args, seed: int) -> ChildStats:
+    """Load a lesson and chat with the tutor like one child would."""
+    rng = random.Random(seed)
+    stats = ChildStats()
+    tutor = f"{args.tutor} - {dict(TUTOR_NAMES)[args.tutor]}"
+    try:
+        client = Client(base_url, verbose=False)
+        start = time.perf_counter()
+        outputs = client.predict(args.lesson, tutor, "English", api_name="/load_lesson_content")
+        stats.load_lesson.append(time.perf_counter() - start)
+        lesson_content = outputs[1]
+    except Exception as e:
+        print(f"Child {seed} could not load the lesson: {e}")
+        stats.errors += 1
+        return stats
+
+    for _ in range(args.turns):
+        time.sleep(args.think_time * rng.uniform(0.5, 1.5))
+        try:
+            _run_job(
+                client,
+                stats,
+                rng.choice(CHILD_MESSAGES),
+                args.lesson,
+                lesson_content,
+                tutor,
+                "beginner",
+                "English",
+                api_name="/chat",
+            )
+            stats.turns += 1
+        except Exception as e:
+            print(f"Child {seed} turn failed: {e}")
+            stats.errors += 1
+    return stats
+
+
+def run_level(base_url: str, pid: int, children: int, args) -> dict:
+    """Run ``children`` concurrent children and summarize the level."""
+    with ResourceSampler(pid) if pid else _NoSampler() as sampler:
+        start = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=children) as pool:
+            all_stats = list(pool.map(lambda seed: simulate_child(base_url, args, seed), range(children)))
+        elapsed = time.perf_counter() - start
+
+    def merged(attr: str) -> list[float]:
+        return [value for stats in all_stats for value in getattr(stats, attr)]
+
+    turns = sum(stats.turns for stats in all_stats)
+    errors = sum(stats.errors for stats in all_stats)
+    attempts = children * (args.turns + 1)
+    return {
+        "children": children,
+        "turns": turns,
+        "errors": errors,
+        "error_rate": round(errors / attempts, 4),
+        "elapsed_s": round(elapsed, 2),
+        "throughput_turns_per_s": round(turns / elapsed, 3),
+        "load_lesson_ms": summarize(merged("load_lesson")),
+        "queue_wait_ms": summarize(merged("queue_wait")),
+        "ttft_ms": summarize(merged("ttft")),
+        "latency_ms": summarize(merged("latency")),
+        "server": sampler.summary(),
+    }
+
+
+def saturation_point(levels: list[dict], min_gain: float = 0.1) -> int | None:
+    """
+    Return the first concurrency level whose throughput per child fell by more than ``min_gain``.
+
+    Think time caps each child's rate, so below saturation throughput grows
+    with the number of children.
+    """
+    for previous, current in zip(levels, levels[1:]):
+        before = previous["throughput_turns_per_s"] / previous["children"]
+        after = current["throughput_turns_per_s"] / current["children"]
+        if before and after < before * (1 - min_gain):
+            return current["children"]
+    return None
+
+
+def _print_level(level: dict):
+    server = level["server"]
+    print(
+        f"{level['children']:>5} children: {level['throughput_turns_per_s']:>7} turns/s, "
+        f"queue p50 {level['queue_wait_ms'].get('p50')} ms, "
+        f"TTFT p50/p99 {level['ttft_ms'].get('p50')}/{level['ttft_ms'].get('p99')} ms, "
+        f"latency p99 {level['latency_ms'].get('p99')} ms, errors {level['error_rate']:.1%}, "
+        f"CPU mean/max {server['cpu_percent_mean']}/{server['cpu_percent_max']}%, RSS {server['rss_mb_max']} MB"
+    )
+
+
+def run(base_url: str, pid: int, args) -> list[dict]:
+    levels = []
+    for children in args.children:
+        level = run_level(base_url, pid, children, args)
+        _print_level(level)
+        levels.append(level)
+    return levels
+
+
+def main(argv: list[str] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Load test the Gradio app with concurrent simulated children.")
+    parser.add_argument("--base-url", help="URL of a running app. By default app.py is launched locally.")
+    parser.add_argument("--children", type=int, nargs="+", default=[1, 4, 16], help="Concurrency levels to run.")
+    parser.add_argument("--turns", type=int, default=5, help="Chat turns per child.")
+    parser.add_argument("--think-time", type=float, default=2.0, help="Mean seconds between a child's turns.")
+    parser.add_argument("--lesson", default="shapes")
+    parser.add_argument("--tutor", default="Elsa", choices=[name for name, _ in TUTOR_NAMES])
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    add_config_arguments(parser)
+    args = parser.parse_args(argv)
+
+    config = config_from_args(args)
+    if args.base_url:
+        levels = run(args.base_url, None, args)
+    else:
+        server, openai_url = start_fake_server(config)
+        try:
+            with launch_app(env={"OPENAI_BASE_URL": openai_url, "OPENAI_API_KEY": "fake"}) as (base_url, process):
+                levels = run(base_url, process.pid, args)
+        finally:
+            server.shutdown()
+
+    saturated_at = saturation_point(levels)
+    if saturated_at:
+        print(f"Throughput per child dropped at {saturated_at} concurrent children.")
+    if args.output:
+        results = {
+            **run_metadata(),
+            "fake_server": None if args.base_url else asdict(config),
+            "turns": args.turns,
+            "think_time_s": args.think_time,
+            "saturated_at": saturated_at,
+            "levels": levels,
+        }
+        Path(args.output).write_text(json.dumps(results, indent=2))
+    return 1 if any(level["errors"] for level in levels) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
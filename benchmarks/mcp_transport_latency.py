@@ -0,0 +1,118 @@
+"""
+Compare MCP tool-call latency and throughput over SSE and streamable HTTP.
+
+Usage:
+    python benchmarks/mcp_transport_latency.py --launch [--calls 200] [--concurrency 8]
+    python benchmarks/mcp_transport_latency.py --base-url http://localhost:7860 --tool get_lesson_chunk \\
+        --arguments '{"lesson_name": "shapes", "length": 500}'
+
+With --launch, the app is started on a free local port for the duration of
+the run. Tool calls that reach the LLM need OPENAI_API_KEY; the default tool,
+get_lesson_list, does not.
+"""
+
+import argparse
+import asyncio
+import json
+import statistics
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import launch_app, percentile, run_metadata  # noqa: E402
+from learnbee.mcp_client import MCP_TRANSPORTS, MCPClient  # noqa: E402
+
+TRANSPORT_PATHS = {
+    "sse": "/gradio_api/mcp/sse",
+    "streamable-http": "/gradio_api/mcp/",
+}
+
+
+async def bench_transport(
+    base_url: str, transport: str, tool: str, arguments: dict, calls: int, concurrency: int, pool_size: int
+) -> dict:
+    """Measure one transport: connection setup, then ``calls`` tool calls at the given concurrency."""
+    url = base_url.rstrip("/") + TRANSPORT_PATHS[transport]
+    async with MCPClient(url, pool_size=pool_size, transport=transport) as client:
+        start = time.perf_counter()
+        # Open every pooled session before timing the calls
+        await asyncio.gather(*(client.call_tool(tool, arguments) for _ in range(pool_size)))
+        setup = time.perf_counter() - start
+
+        latencies = []
+        errors = 0
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def _call():
+            nonlocal errors
+            async with semaphore:
+                call_start = time.perf_counter()
+                try:
+                    await client.call_tool(tool, arguments)
+                except Exception:
+                    errors += 1
+                    return
+                latencies.append(time.perf_counter() - call_start)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(_call() for _ in range(calls)))
+        elapsed = time.perf_counter() - start
+
+    return {
+        "transport": transport,
+        "url": url,
+        "calls": calls,
+        "errors": errors,
+        "concurrency": concurrency,
+        "pool_size": pool_size,
+        "setup_s": round(setup, 4),
+        "p50_ms": round(percentile(latencies, 50) * 1000, 2) if latencies else None,
+        "p99_ms": round(percentile(latencies, 99) * 1000, 2) if latencies else None,
+        "mean_ms": round(statistics.mean(latencies) * 1000, 2) if latencies else None,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else None,
+    }
+
+
+async def run(args, base_url: str) -> list[dict]:
+    results = []
+    for transport in args.transports:
+        result = await bench_transport(
+            base_url, transport, args.tool, args.arguments, args.calls, args.concurrency, args.pool_size
+        )
+        print(
+            f"{transport:>16}: p50 {result['p50_ms']} ms, p99 {result['p99_ms']} ms, "
+            f"{result['throughput_rps']} calls/s, setup {result['setup_s']} s, {result['errors']} errors"
+        )
+        results.append(result)
+    return results
+
+
+def main(argv: list[str] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Benchmark MCP tool calls over each transport.")
+    parser.add_argument("--base-url", default="http://localhost:7860", help="URL of a running app.")
+    parser.add_argument("--launch", action="store_true", help="Start app.py locally instead of using --base-url.")
+    parser.add_argument("--transports", nargs="+", choices=MCP_TRANSPORTS, default=list(MCP_TRANSPORTS))
+    parser.add_argument("--tool", default="get_lesson_list", help="The tool to call.")
+    parser.add_argument("--arguments", type=json.loads, default={}, help="Tool arguments as a JSON object.")
+    parser.add_argument("--calls", type=int, default=200, help="Number of timed calls per transport.")
+    parser.add_argument("--concurrency", type=int, default=8, help="Maximum number of calls in flight.")
+    parser.add_argument("--pool-size", type=int, default=2, help="Number of pooled MCP sessions.")
+    parser.add_argument("--output", help="Write the results to this JSON file.")
+    args = parser.parse_args(argv)
+
+    if args.launch:
+        with launch_app() as (base_url, _):
+            results = asyncio.run(run(args, base_url))
+    else:
+        results = asyncio.run(run(args, args.base_url))
+
+    if args.output:
+        Path(args.output).write_text(json.dumps({**run_metadata(), "results": results}, indent=2))
+    return 1 if any(r["errors"] for r in results) else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
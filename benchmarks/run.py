@@ -0,0 +1,237 @@
+"""
+End-to-end and micro benchmarks, run offline against the fake OpenAI server.
+
+Usage:
+    python -m benchmarks.run [--suite all|e2e|micro] [--iterations 5] [--ttft 0.3] [--tokens-per-second 80]
+
+Lessons are copied to a temporary directory (sidecar artifacts are looked up
+there too) and the LLM caches and usage ledger point to temporary databases,
+so the benchmark neither reads nor writes ./lessons.
+Results are written to benchmarks/results/<commit>.json; compare two runs with
+``python -m benchmarks.compare OLD.json NEW.json``.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+from dataclasses import asdict
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from benchmarks.common import PROJECT_ROOT, RESULTS_DIR, run_metadata, summarize  # noqa: E402
+from benchmarks.fake_openai import add_config_arguments, config_from_args, start_fake_server  # noqa: E402
+
+BENCH_LESSON = "shapes"
+BENCH_TUTOR = "Elsa"
+
+
+def _no_progress(*args, **kwargs):
+    pass
+
+
+def _clear_llm_caches():
+    from learnbee import llm_call, prompts
+
+    llm_call.concept_cache.clear()
+    llm_call.introduction_cache.clear()
+    if llm_call.response_cache is not None:
+        llm_call.response_cache.clear()
+    prompts._prompt_cache.clear()
+
+
+def setup_sandbox(workdir: Path):
+    """Point the lesson catalog, the LLM caches and the usage ledger at a temporary copy of the lessons."""
+    from learnbee import llm_call
+    from learnbee.lesson_catalog import lesson_catalog
+    from learnbee.usage import usage_ledger
+
+    lessons_dir = workdir / "lessons"
+    lessons_dir.mkdir()
+    for lesson_file in (PROJECT_ROOT / "lessons").glob("*.txt"):
+        shutil.copy(lesson_file, lessons_dir / lesson_file.name)
+    lesson_catalog.lessons_dir = lessons_dir
+    lesson_catalog.invalidate()
+    llm_call.concept_cache.path = workdir / "cache.sqlite3"
+    usage_ledger.path = workdir / "usage.sqlite3"
+
+
+async def _time_stream(agen) -> tuple[float, float]:
+    """Return the time to the first item and the total time of an async generator."""
+    start = time.perf_counter()
+    first = None
+    async for _ in agen:
+        if first is None:
+            first = time.perf_counter() - start
+    total = time.perf_counter() - start
+    return (first if first is not None else total), total
+
+
+def _record(results: dict, name: str, first: list[float], total: list[float]):
+    results[name] = {"first_chunk_ms": summarize(first), "total_ms": summarize(total)}
+    print(f"{name:>34}: first {results[name]['first_chunk_ms']['p50']:>9} ms, total {results[name]['total_ms']['p50']:>9} ms")
+
+
+async def bench_e2e(iterations: int) -> dict:
+    """Time the UI handlers and MCP tools against the fake server."""
+    from learnbee import mcp_server
+    from learnbee.tutor_handlers import create_new_lesson, custom_respond, load_lesson_content
+
+    results = {}
+    lesson_content = mcp_server.get_lesson_content(BENCH_LESSON)
+
+    first, total = [], []
+    for i in range(iterations):
+        greeting = [{"role": "assistant", "content": "Hello! Let's learn about shapes!"}]
+        f, t = await _time_stream(
+            custom_respond(
+                f"What is a circle? ({i})", greeting, BENCH_LESSON, lesson_content, BENCH_TUTOR, "beginner", "English", {}
+            )
+        )
+        first.append(f)
+        total.append(t)
+    _record(results, "custom_respond", first, total)
+
+    for label, clear in (("load_lesson_content (cold)", True), ("load_lesson_content (warm)", False)):
+        samples = []
+        for _ in range(iterations):
+            if clear:
+                _clear_llm_caches()
+            start = time.perf_counter()
+            await load_lesson_content(BENCH_LESSON, BENCH_TUTOR, "English", progress=_no_progress)
+            samples.append(time.perf_counter() - start)
+        _record(results, label, samples, samples)
+
+    first, total = [], []
+    for i in range(iterations):
+        f, t = await _time_stream(create_new_lesson(f"benchmark topic {i}", "", "3-6", progress=_no_progress))
+        first.append(f)
+        total.append(t)
+    _record(results, "create_new_lesson", first, total)
+
+    results.update(bench_mcp_tools(iterations))
+    return results
+
+
+def bench_mcp_tools(iterations: int) -> dict:
+    """Time each MCP tool function, without the MCP transport (see mcp_transport_latency.py)."""
+    from learnbee import mcp_server
+
+    def introduction_cold(i):
+        _clear_llm_caches()
+        mcp_server.get_lesson_introduction(BENCH_LESSON)
+
+    # name: (call, whether it reaches the LLM)
+    calls = {
+        "get_lesson_list": (lambda i: mcp_server.get_lesson_list(), False),
+        "get_lesson_content": (lambda i: mcp_server.get_lesson_content(BENCH_LESSON), False),
+        "get_lesson_chunk": (lambda i: mcp_server.get_lesson_chunk(BENCH_LESSON, 0, 4000), False),
+        "search_lessons": (lambda i: mcp_server.search_lessons("how many corners does a triangle have"), False),
+        "get_lesson_introduction (cold)": (introduction_cold, True),
+        "create_lessons (4 topics)": (lambda i: mcp_server.create_lessons([f"bulk topic {i} {n}" for n in range(4)]), True),
+    }
+    results = {}
+    for name, (call, uses_llm) in calls.items():
+        samples = []
+        for i in range(iterations if uses_llm else iterations * 20):
+            start = time.perf_counter()
+            call(i)
+            samples.append(time.perf_counter() - start)
+        _record(results, f"mcp:{name}", samples, samples)
+    return results
+
+
+def _time_calls(fn, repeat: int, before=None) -> dict:
+    samples = []
+    for _ in range(repeat):
+        if before:
+            before()
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples, scale=1e6)
+
+
+def bench_micro(repeat: int) -> dict:
+    """Microbenchmarks of the CPU-bound helpers, in microseconds."""
+    from learnbee import prompts
+    from learnbee.history import HistoryPolicy
+    from learnbee.lesson_catalog import LessonCatalog, lesson_catalog
+    from learnbee.llm_call import LLMCall
+    from learnbee.prompts import generate_tutor_system_prompt
+    from learnbee.token_budget import fit_lesson
+
+    lesson_content = lesson_catalog.get_content(BENCH_LESSON)
+    history = [
+        {"role": "user" if i % 2 == 0 else "assistant", "content": f"Message number {i} about circles and squares. " * 4}
+        for i in range(40)
+    ]
+    call_llm = LLMCall()
+    policy = HistoryPolicy()
+
+    def prompt():
+        generate_tutor_system_prompt(BENCH_TUTOR, "Magical queen", "beginner", lesson_content)
+
+    benchmarks = {
+        "generate_tutor_system_prompt (cold)": lambda: _time_calls(prompt, repeat, prompts._prompt_cache.clear),
+        "generate_tutor_system_prompt (warm)": lambda: _time_calls(prompt, repeat),
+        "convert_history (40 messages)": lambda: _time_calls(lambda: call_llm._convert_history("Hi", history), repeat),
+        "history_window (40 messages)": lambda: _time_calls(lambda: policy.apply(history), repeat),
+        "catalog.get_content (warm)": lambda: _time_calls(lambda: lesson_catalog.get_content(BENCH_LESSON), repeat),
+        "catalog.read_range (4 KB)": lambda: _time_calls(
+            lambda: lesson_catalog.read_range(BENCH_LESSON, 0, 4096), repeat
+        ),
+        "catalog scan + read (cold)": lambda: _time_calls(
+            lambda: LessonCatalog(lesson_catalog.lessons_dir).get_content(BENCH_LESSON), max(repeat // 10, 1)
+        ),
+        "fit_lesson": lambda: _time_calls(lambda: fit_lesson(lesson_content), repeat),
+    }
+    results = {}
+    for name, bench in benchmarks.items():
+        results[name] = {"us": bench()}
+        print(f"{name:>38}: p50 {results[name]['us']['p50']:>10} us, p99 {results[name]['us']['p99']:>10} us")
+    return results
+
+
+def main(argv: list[str] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Run the Learnbee benchmarks against a fake OpenAI server.")
+    parser.add_argument("--suite", choices=["all", "e2e", "micro"], default="all")
+    parser.add_argument("--iterations", type=int, default=5, help="Iterations of each end-to-end benchmark.")
+    parser.add_argument("--repeat", type=int, default=1000, help="Repetitions of each microbenchmark.")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/<commit>.json).")
+    add_config_arguments(parser)
+    args = parser.parse_args(argv)
+
+    from learnbee.usage import usage_ledger
+
+    config = config_from_args(args)
+    server, base_url = start_fake_server(config)
+    os.environ["OPENAI_BASE_URL"] = base_url
+    os.environ["OPENAI_API_KEY"] = "fake"
+
+    results = {**run_metadata(), "fake_server": asdict(config)}
+    with tempfile.TemporaryDirectory() as workdir:
+        setup_sandbox(Path(workdir))
+        if args.suite in ("all", "micro"):
+            results["micro"] = bench_micro(args.repeat)
+        if args.suite in ("all", "e2e"):
+            results["e2e"] = asyncio.run(bench_e2e(args.iterations))
+        # Write the recorded usage into the sandbox before it is deleted
+        usage_ledger.flush()
+    server.shutdown()
+
+    output = Path(args.output) if args.output else RESULTS_DIR / f"{results['commit']}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2))
+    print(f"Results written to {output}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,104 @@
+"""
+Batched generation for VLLMModel.
+
+The batching logic only talks to a small engine interface, so it runs on CPU
+with a fake engine; VLLMEngine adapts a vllm.LLM to it on the GPU container.
+"""
+
+from typing import NamedTuple, Protocol
+
+
+class Generation(NamedTuple):
+    """Text generated for one prompt and its length in tokens."""
+
+    text: str
+    completion_tokens: int
+
+
+class Engine(Protocol):
+    def encode_chat(self, chat_history: list[dict]) -> list[int]:
+        """Apply the chat template to a conversation and return its prompt token ids."""
+        ...
+
+    def generate(self, prompts: list[list[int]]) -> list[Generation]:
+        """Generate one completion per prompt, in order."""
+        ...
+
+
+class VLLMEngine:
+    """Engine backed by a vllm.LLM and fixed sampling parameters."""
+
+    def __init__(self, llm, sampling_params):
+        self.llm = llm
+        self.sampling_params = sampling_params
+
+    def encode_chat(self, chat_history):
+        # Formatting and tokenizing in one pass also avoids a second BOS token
+        tokenizer = self.llm.get_tokenizer()
+        return list(tokenizer.apply_chat_template(chat_history, tokenize=True, add_generation_prompt=True))
+
+    def generate(self, prompts):
+        # Token ids go straight to the engine, which then skips tokenization
+        outputs = self.llm.generate([{"prompt_token_ids": ids} for ids in prompts], self.sampling_params)
+        return [Generation(o.outputs[0].text, len(o.outputs[0].token_ids)) for o in outputs]
+
+
+def check_input_length(input_token_len, max_model_tokens, max_output_tokens):
+    """Raise ValueError if a prompt leaves no room for the output in the context window."""
+    if input_token_len + max_output_tokens > max_model_tokens:
+        raise ValueError(
+            f"Input length exceeds the maximum allowed tokens: {max_model_tokens}. "
+            f"Current input length: {input_token_len} tokens."
+        )
+
+
+def _error(e):
+    return f"{type(e).__name__}: {e}"
+
+
+def generate_batch(engine, chat_histories, max_model_tokens, max_output_tokens):
+    """
+    Generate a response for each conversation in a single engine call.
+
+    Each conversation is formatted and tokenized once. Conversations that
+    fail to format or are too long get an error instead of failing the batch.
+    If the engine call fails, or does not return one generation per prompt,
+    every conversation sent to it gets that error.
+
+    Returns a list with one dict per conversation, in order:
+    {"text", "error", "prompt_tokens", "completion_tokens"}; "text" is None
+    when "error" is set.
+    """
+    results = [None] * len(chat_histories)
+    prompts = []
+    indices = []
+    for i, chat_history in enumerate(chat_histories):
+        token_ids = []
+        try:
+            token_ids = engine.encode_chat(chat_history)
+            check_input_length(len(token_ids), max_model_tokens, max_output_tokens)
+        except Exception as e:
+            results[i] = {"text": None, "error": _error(e), "prompt_tokens": len(token_ids), "completion_tokens": 0}
+            continue
+        prompts.append(token_ids)
+        indices.append(i)
+
+    if prompts:
+        try:
+            generations = engine.generate(prompts)
+            if len(generations) != len(prompts):
+                raise RuntimeError(f"The engine returned {len(generations)} generations for {len(prompts)} prompts")
+        except Exception as e:
+            generations = None
+            error = _error(e)
+        for n, (i, token_ids) in enumerate(zip(indices, prompts)):
+            if generations is None:
+                results[i] = {"text": None, "error": error, "prompt_tokens": len(token_ids), "completion_tokens": 0}
+            else:
+                results[i] = {
+                    "text": generations[n].text,
+                    "error": None,
+                    "prompt_tokens": len(token_ids),
+                    "completion_tokens": generations[n].completion_tokens,
+                }
+    return results
@@ -5,6 +5,8 @@ import vllm
 
 import modal
 
+from batching import VLLMEngine, check_input_length, generate_batch
+
 APP_NAME = "llm-server"
 VOLUME_NAME = APP_NAME + "-volume"
 MOUNT_VOLUME = modal.Volume.from_name(VOLUME_NAME, create_if_missing=True)
@@ -62,6 +64,7 @@ image = (
             "VLLM_CACHE_ROOT": MOUNT_DIR + "/vllm",
         }
     )
+    .add_local_python_source("batching")
 )
 
 app = modal.App(APP_NAME, image=image)
@@ -116,6 +119,7 @@ class VLLMModel:
             gpu_memory_utilization=0.9,
             trust_remote_code=True,
         )
+        self.engine = VLLMEngine(self.llm, self._get_sampling_params())
 
         # Show GPU information
         subprocess.run(["nvidia-smi"])
@@ -123,57 +127,32 @@ class VLLMModel:
     @modal.method()
     def generate(self, chat_history):
         """Generate a response"""
-        formatted_text = self._get_formatted_text(chat_history)
-
-        input_token_len = self._check_input_length(formatted_text)
-        if input_token_len + MAX_OUTPUT_TOKENS > MAX_MODEL_TOKENS:
-            raise ValueError(
-                f"Input length exceeds the maximum allowed tokens: {MAX_MODEL_TOKENS}. "
-                f"Current input length: {input_token_len} tokens."
-            )
-
-        sampling_params = self._get_sampling_params()
+        token_ids = self.engine.encode_chat(chat_history)
+        check_input_length(len(token_ids), MAX_MODEL_TOKENS, MAX_OUTPUT_TOKENS)
 
-        outputs = self.llm.generate([formatted_text], sampling_params)
-        response = outputs[0].outputs[0].text
+        return self.engine.generate([token_ids])[0].text
 
-        return response
+    @modal.method()
+    def generate_batch(self, chat_histories):
+        """
+        Generate a response for each chat history in one engine call
+        Returns one {"text", "error", "prompt_tokens", "completion_tokens"} dict per history
+        """
+        return generate_batch(self.engine, chat_histories, MAX_MODEL_TOKENS, MAX_OUTPUT_TOKENS)
 
     @modal.method()
     def generate_stream(self, chat_history):
         """
         Generate a streaming response
+        Yields text deltas: the caller concatenates them into the full response
         NOTE: This function may NOT generate streaming output as expected
         """
-        formatted_text = self._get_formatted_text(chat_history)
-
-        input_token_len = self._check_input_length(formatted_text)
-        if input_token_len + MAX_OUTPUT_TOKENS > MAX_MODEL_TOKENS:
-            raise ValueError(
-                f"Input length exceeds the maximum allowed tokens: {MAX_MODEL_TOKENS}. "
-                f"Current input length: {input_token_len} tokens."
-            )
-
-        sampling_params = self._get_sampling_params()
-
-        # Streaming generation with vLLM
-        for output in self.llm.generate([formatted_text], sampling_params):
-            for completion_output in output.outputs:
-                yield completion_output.text
-
-    def _get_formatted_text(self, chat_history):
-        """Format the chat history"""
-        tokenizer = self.llm.get_tokenizer()
-        return tokenizer.apply_chat_template(
-            chat_history,
-            tokenize=False,
-            add_generation_prompt=True,
-        )
+        token_ids = self.engine.encode_chat(chat_history)
+        check_input_length(len(token_ids), MAX_MODEL_TOKENS, MAX_OUTPUT_TOKENS)
 
-    def _check_input_length(self, formatted_text):
-        tokenizer = self.llm.get_tokenizer()
-        input_token_len = len(tokenizer(formatted_text)["input_ids"])
-        return input_token_len
+        # vLLM's offline engine returns the whole text at once: a single delta
+        for generation in self.engine.generate([token_ids]):
+            yield generation.text
 
     def _get_sampling_params(self):
         """Get sampling parameters for generation"""
@@ -234,3 +213,15 @@ def main():
         print(chunk, end="", flush=True)
         response += chunk
     print()
+
+    # Call batch function: one engine call for several conversations
+    questions = ["What color is the sky?", "How many legs does a spider have?"]
+    chat_histories = [
+        [
+            {"role": "system", "content": [{"type": "text", "text": SYSTEM_PROMPT}]},
+            {"role": "user", "content": [{"type": "text", "text": question}]},
+        ]
+        for question in questions
+    ]
+    for question, result in zip(questions, model.generate_batch.remote(chat_histories)):
+        print(f"USER: {question}\nAI: {result['text'] if result['error'] is None else result['error']}")
@@ -0,0 +1,103 @@
+"""CPU tests of the batching logic of VLLMModel, with a fake engine instead of vLLM."""
+
+import pytest
+
+from batching import Generation, generate_batch
+
+MAX_MODEL_TOKENS = 16
+MAX_OUTPUT_TOKENS = 4
+
+
+class FakeEngine:
+    """
+    Engine with one token per word; it answers each prompt with its words reversed.
+
+    Conversations whose last message is "bad" fail to format. generate() fails
+    with the given error, or returns at most max_generations generations.
+    """
+
+    def __init__(self, error: Exception = None, max_generations: int = None):
+        self.error = error
+        self.max_generations = max_generations
+        self.calls = []
+
+    def encode_chat(self, chat_history):
+        words = " ".join(message["content"] for message in chat_history).split()
+        if words[-1:] == ["bad"]:
+            raise KeyError("unsupported role")
+        return words
+
+    def generate(self, prompts):
+        self.calls.append(prompts)
+        if self.error is not None:
+            raise self.error
+        generations = [Generation(" ".join(reversed(prompt)), len(prompt)) for prompt in prompts]
+        return generations[: self.max_generations]
+
+
+def _chat(text):
+    return [{"role": "user", "content": text}]
+
+
+def test_results_keep_the_order_of_the_conversations():
+    engine = FakeEngine()
+
+    results = generate_batch(engine, [_chat("a b"), _chat("c d e"), _chat("f")], MAX_MODEL_TOKENS, MAX_OUTPUT_TOKENS)
+
+    assert [r["text"] for r in results] == ["b a", "e d c", "f"]
+    assert [r["prompt_tokens"] for r in results] == [2, 3, 1]
+    assert [r["completion_tokens"] for r in results] == [2, 3, 1]
+    assert all(r["error"] is None for r in results)
+    # A single engine call for the whole batch
+    assert len(engine.calls) == 1
+
+
+def test_conversations_that_fail_to_encode_or_are_too_long_get_their_own_error():
+    engine = FakeEngine()
+    too_long = _chat(" ".join(["w"] * (MAX_MODEL_TOKENS - MAX_OUTPUT_TOKENS + 1)))
+
+    results = generate_batch(engine, [_chat("a bad"), too_long, _chat("a b")], MAX_MODEL_TOKENS, MAX_OUTPUT_TOKENS)
+
+    assert results[0]["text"] is None
+    assert results[0]["error"].startswith("KeyError")
+    assert results[0]["prompt_tokens"] == 0
+    assert results[1]["text"] is None
+    assert results[1]["error"].startswith("ValueError: Input length exceeds")
+    assert results[1]["prompt_tokens"] == MAX_MODEL_TOKENS - MAX_OUTPUT_TOKENS + 1
+    assert results[2] == {"text": "b a", "error": None, "prompt_tokens": 2, "completion_tokens": 2}
+    # Only the valid conversation reaches the engine
+    assert engine.calls == [[["a", "b"]]]
+
+
+def test_a_failing_engine_call_fails_every_conversation_sent_to_it():
+    engine = FakeEngine(error=RuntimeError("CUDA out of memory"))
+
+    results = generate_batch(engine, [_chat("a b"), _chat("a bad"), _chat("c")], MAX_MODEL_TOKENS, MAX_OUTPUT_TOKENS)
+
+    assert results[0] == {
+        "text": None,
+        "error": "RuntimeError: CUDA out of memory",
+        "prompt_tokens": 2,
+        "completion_tokens": 0,
+    }
+    assert results[1]["error"].startswith("KeyError")
+    assert results[2]["error"] == "RuntimeError: CUDA out of memory"
+
+
+def test_missing_generations_are_reported_instead_of_misassigned():
+    engine = FakeEngine(max_generations=1)
+
+    results = generate_batch(engine, [_chat("a"), _chat("b")], MAX_MODEL_TOKENS, MAX_OUTPUT_TOKENS)
+
+    assert [r["text"] for r in results] == [None, None]
+    assert all(r["error"] == "RuntimeError: The engine returned 1 generations for 2 prompts" for r in results)
+
+
+@pytest.mark.parametrize("chat_histories", [[], [_chat("a bad")]])
+def test_the_engine_is_not_called_without_valid_conversations(chat_histories):
+    engine = FakeEngine()
+
+    results = generate_batch(engine, chat_histories, MAX_MODEL_TOKENS, MAX_OUTPUT_TOKENS)
+
+    assert len(results) == len(chat_histories)
+    assert engine.calls == []
@@ -0,0 +1,448 @@
+"""
+LLM backends: where LLMCall sends its chat completion requests.
+
+Requests are plain OpenAI chat completion keyword arguments (model, messages,
+temperature, max_tokens). A backend answers them with a Completion, or with a
+stream of Chunks whose last one carries the token usage. Three backends exist:
+
+- "openai": the OpenAI API.
+- "openai-compatible": any server speaking the OpenAI API at LEARNBEE_LLM_BASE_URL
+  (vLLM, llama.cpp, Ollama, a local fake server, ...).
+- "modal": the VLLMModel class deployed from modal/main.py.
+
+The default backend is chosen with LEARNBEE_LLM_BACKEND, and single operations
+can be routed to another one (see learnbee.routing); get_backend() returns the
+shared instances.
+"""
+
+import logging
+import os
+import threading
+from dataclasses import dataclass
+from typing import AsyncIterator, Iterator
+
+from learnbee.clients import get_async_openai_client, get_openai_client
+from learnbee.constants import (
+    DEFAULT_LLM_BACKEND,
+    DEFAULT_LLM_MODEL,
+    MODAL_APP_NAME,
+    MODAL_CLASS_NAME,
+    MODAL_MODEL_NAME,
+)
+from learnbee.token_budget import count_tokens
+
+logger = logging.getLogger(__name__)
+
+LLM_BACKEND = os.getenv("LEARNBEE_LLM_BACKEND", DEFAULT_LLM_BACKEND)
+LLM_MODEL = os.getenv("LEARNBEE_LLM_MODEL")
+LLM_BASE_URL = os.getenv("LEARNBEE_LLM_BASE_URL")
+LLM_API_KEY = os.getenv("LEARNBEE_LLM_API_KEY")
+MODAL_APP = os.getenv("LEARNBEE_MODAL_APP", MODAL_APP_NAME)
+
+
+@dataclass(frozen=True)
+class Usage:
+    """Token usage of one call."""
+
+    prompt_tokens: int
+    completion_tokens: int
+    cached_tokens: int = 0
+
+
+@dataclass(frozen=True)
+class Completion:
+    """The text and usage of a non-streamed call."""
+
+    text: str
+    usage: Usage | None = None
+
+
+@dataclass(frozen=True)
+class Chunk:
+    """One item of a streamed call: a text delta, or the usage at the end of the stream."""
+
+    text: str = ""
+    usage: Usage | None = None
+
+
+class LLMBackend:
+    """
+    Interface of the LLM backends.
+
+    Subclasses implement the four network methods; count_tokens defaults to
+    the tiktoken count of learnbee.token_budget.
+    """
+
+    name = ""
+
+    def __init__(self, model: str = None):
+        """
+        Initialize the backend.
+
+        Args:
+            model (str): The model used when a caller does not choose one.
+        """
+        self.default_model = model or DEFAULT_LLM_MODEL
+
+    def complete(self, request: dict) -> Completion:
+        """
+        Run a chat completion request.
+
+        Args:
+            request (dict): OpenAI chat completion arguments, without stream options.
+
+        Returns:
+            Completion: The reply and its token usage, if known.
+        """
+        raise NotImplementedError
+
+    def stream(self, request: dict) -> Iterator[Chunk]:
+        """
+        Run a chat completion request, streaming the reply.
+
+        Args:
+            request (dict): OpenAI chat completion arguments, without stream options.
+
+        Yields:
+            Chunk: Text deltas, then the token usage if known.
+        """
+        raise NotImplementedError
+
+    async def acomplete(self, request: dict) -> Completion:
+        """Asynchronous variant of complete()."""
+        raise NotImplementedError
+
+    def astream(self, request: dict) -> AsyncIterator[Chunk]:
+        """Asynchronous variant of stream()."""
+        raise NotImplementedError
+
+    def count_tokens(self, text: str, model: str = None) -> int:
+        """
+        Count the tokens of a text for a model of this backend.
+
+        Args:
+            text (str): The text to count.
+            model (str): The model. Defaults to the default model of the backend.
+
+        Returns:
+            int: The token count, estimated if the tokenizer is not available locally.
+        """
+        return count_tokens(text, model or self.default_model)
+
+    def __repr__(self):
+        return f"{type(self).__name__}(model={self.default_model!r})"
+
+
+def _openai_usage(usage) -> Usage | None:
+    if usage is None:
+        return None
+    details = getattr(usage, "prompt_tokens_details", None)
+    return Usage(
+        prompt_tokens=usage.prompt_tokens,
+        completion_tokens=usage.completion_tokens,
+        cached_tokens=(getattr(details, "cached_tokens", None) or 0) if details else 0,
+    )
+
+
+def _openai_chunk(chunk) -> Chunk | None:
+    """Convert a streamed OpenAI chunk, or return None if it carries nothing."""
+    text = chunk.choices[0].delta.content if chunk.choices else None
+    usage = _openai_usage(chunk.usage)
+    if text is None and usage is None:
+        return None
+    return Chunk(text or "", usage)
+
+
+class OpenAIBackend(LLMBackend):
+    """The OpenAI API, through the pooled clients of learnbee.clients."""
+
+    name = "openai"
+
+    def __init__(self, model: str = None, api_key: str = None, base_url: str = None):
+        """
+        Initialize the backend.
+
+        Args:
+            model (str): The default model.
+            api_key (str): The API key. Defaults to OPENAI_API_KEY.
+            base_url (str): The API base URL. Defaults to OPENAI_BASE_URL or the OpenAI API.
+        """
+        super().__init__(model)
+        self.api_key = api_key
+        self.base_url = base_url
+
+    @property
+    def client(self):
+        return get_openai_client(self.api_key, self.base_url)
+
+    @property
+    def async_client(self):
+        # Looked up per call: async clients are bound to the running event loop
+        return get_async_openai_client(self.api_key, self.base_url)
+
+    def complete(self, request: dict) -> Completion:
+        response = self.client.chat.completions.create(**request)
+        return Completion(response.choices[0].message.content or "", _openai_usage(response.usage))
+
+    def stream(self, request: dict) -> Iterator[Chunk]:
+        stream = self.client.chat.completions.create(**request, stream=True, stream_options={"include_usage": True})
+        for chunk in stream:
+            converted = _openai_chunk(chunk)
+            if converted is not None:
+                yield converted
+
+    async def acomplete(self, request: dict) -> Completion:
+        response = await self.async_client.chat.completions.create(**request)
+        return Completion(response.choices[0].message.content or "", _openai_usage(response.usage))
+
+    async def astream(self, request: dict) -> AsyncIterator[Chunk]:
+        stream = await self.async_client.chat.completions.create(
+            **request, stream=True, stream_options={"include_usage": True}
+        )
+        async for chunk in stream:
+            converted = _openai_chunk(chunk)
+            if converted is not None:
+                yield converted
+
+    def __repr__(self):
+        return f"{type(self).__name__}(model={self.default_model!r}, base_url={self.base_url!r})"
+
+
+class OpenAICompatibleBackend(OpenAIBackend):
+    """
+    A self-hosted server speaking the OpenAI API, e.g. vLLM or llama.cpp.
+
+    Such servers rarely report cached prompt tokens, and some omit usage from
+    streams altogether; the usage is then estimated from the text.
+    """
+
+    name = "openai-compatible"
+
+    def __init__(self, model: str = None, api_key: str = None, base_url: str = None):
+        """
+        Initialize the backend.
+
+        Args:
+            model (str): The model name the server expects.
+            api_key (str): The API key. Most self-hosted servers accept any value.
+            base_url (str): The base URL of the server, e.g. "http://localhost:8000/v1".
+
+        Raises:
+            ValueError: If no base URL is given.
+        """
+        if not base_url:
+            raise ValueError("The openai-compatible backend needs a base URL (LEARNBEE_LLM_BASE_URL)")
+        super().__init__(model, api_key or "unused", base_url)
+
+    def complete(self, request: dict) -> Completion:
+        completion = super().complete(request)
+        return completion if completion.usage else Completion(
+            completion.text, _estimated_usage(self, request, completion.text)
+        )
+
+    async def acomplete(self, request: dict) -> Completion:
+        completion = await super().acomplete(request)
+        return completion if completion.usage else Completion(
+            completion.text, _estimated_usage(self, request, completion.text)
+        )
+
+    def stream(self, request: dict) -> Iterator[Chunk]:
+        yield from _estimate_missing_usage(self, request, super().stream(request))
+
+    async def astream(self, request: dict) -> AsyncIterator[Chunk]:
+        async for chunk in _aestimate_missing_usage(self, request, super().astream(request)):
+            yield chunk
+
+
+def _estimated_usage(backend: LLMBackend, request: dict, reply: str) -> Usage:
+    """Estimate the usage of a call whose backend does not report it."""
+    model = request.get("model")
+    prompt = "\n".join(_message_text(message) for message in request.get("messages", []))
+    return Usage(backend.count_tokens(prompt, model), backend.count_tokens(reply, model))
+
+
+def _estimate_missing_usage(backend: LLMBackend, request: dict, chunks: Iterator[Chunk]) -> Iterator[Chunk]:
+    """Pass chunks through, adding an estimated usage chunk if the stream reported none."""
+    text = []
+    reported = False
+    for chunk in chunks:
+        text.append(chunk.text)
+        reported = reported or chunk.usage is not None
+        yield chunk
+    if not reported:
+        yield Chunk(usage=_estimated_usage(backend, request, "".join(text)))
+
+
+async def _aestimate_missing_usage(
+    backend: LLMBackend, request: dict, chunks: AsyncIterator[Chunk]
+) -> AsyncIterator[Chunk]:
+    """Asynchronous variant of _estimate_missing_usage."""
+    text = []
+    reported = False
+    async for chunk in chunks:
+        text.append(chunk.text)
+        reported = reported or chunk.usage is not None
+        yield chunk
+    if not reported:
+        yield Chunk(usage=_estimated_usage(backend, request, "".join(text)))
+
+
+def _message_text(message: dict) -> str:
+    content = message.get("content") or ""
+    if isinstance(content, list):
+        return "".join(part.get("text", "") for part in content if isinstance(part, dict))
+    return str(content)
+
+
+class ModalVLLMBackend(LLMBackend):
+    """
+    The VLLMModel class of modal/main.py, deployed with ``modal deploy modal/main.py``.
+
+    The deployed class applies its own sampling parameters, so the temperature
+    and max_tokens of requests are ignored. Its generate_stream yields text
+    deltas, which are passed on as they are. It reports no usage either: token
+    counts are estimated locally (the Gemma tokenizer is not available here).
+    Requires the optional ``modal`` package and Modal credentials.
+    """
+
+    name = "modal"
+
+    def __init__(self, model: str = None, app_name: str = MODAL_APP, class_name: str = MODAL_CLASS_NAME):
+        """
+        Initialize the backend. Modal is contacted on the first call.
+
+        Args:
+            model (str): The model the deployed class serves, used for token
+                counting and usage accounting. Defaults to MODAL_MODEL_NAME.
+            app_name (str): The name of the deployed Modal app.
+            class_name (str): The name of the deployed class.
+        """
+        super().__init__(model or MODAL_MODEL_NAME)
+        self.app_name = app_name
+        self.class_name = class_name
+        self._model = None
+        self._lock = threading.Lock()
+
+    @property
+    def model(self):
+        """The remote VLLMModel instance, looked up on first use."""
+        if self._model is None:
+            with self._lock:
+                if self._model is None:
+                    try:
+                        import modal
+                    except ImportError:
+                        modal = None
+                    # Without the package, the modal/ directory of this repository is imported instead
+                    if not hasattr(modal, "Cls"):
+                        raise RuntimeError("The modal backend requires the modal package (pip install modal)")
+                    self._model = modal.Cls.from_name(self.app_name, self.class_name)()
+        return self._model
+
+    @staticmethod
+    def _chat_history(request: dict) -> list[dict]:
+        """Convert the messages of a request to the content parts VLLMModel expects."""
+        return [
+            {"role": message["role"], "content": [{"type": "text", "text": _message_text(message)}]}
+            for message in request["messages"]
+        ]
+
+    def complete(self, request: dict) -> Completion:
+        text = self.model.generate.remote(self._chat_history(request))
+        return Completion(text, _estimated_usage(self, request, text))
+
+    def stream(self, request: dict) -> Iterator[Chunk]:
+        received = ""
+        for text in self.model.generate_stream.remote_gen(self._chat_history(request)):
+            received += text
+            if text:
+                yield Chunk(text)
+        yield Chunk(usage=_estimated_usage(self, request, received))
+
+    async def acomplete(self, request: dict) -> Completion:
+        text = await self.model.generate.remote.aio(self._chat_history(request))
+        return Completion(text, _estimated_usage(self, request, text))
+
+    async def astream(self, request: dict) -> AsyncIterator[Chunk]:
+        received = ""
+        async for text in self.model.generate_stream.remote_gen.aio(self._chat_history(request)):
+            received += text
+            if text:
+                yield Chunk(text)
+        yield Chunk(usage=_estimated_usage(self, request, received))
+
+    def __repr__(self):
+        return f"{type(self).__name__}(model={self.default_model!r}, app={self.app_name!r})"
+
+
+BACKENDS = {
+    OpenAIBackend.name: OpenAIBackend,
+    OpenAICompatibleBackend.name: OpenAICompatibleBackend,
+    ModalVLLMBackend.name: ModalVLLMBackend,
+}
+
+
+def create_backend(name: str = None, **options) -> LLMBackend:
+    """
+    Create a backend from its name and the LEARNBEE_LLM_* environment variables.
+
+    LEARNBEE_LLM_MODEL sets the default model of the LEARNBEE_LLM_BACKEND backend
+    only, and LEARNBEE_LLM_BASE_URL and LEARNBEE_LLM_API_KEY configure the
+    openai-compatible backend; the openai backend uses OPENAI_API_KEY and OPENAI_BASE_URL.
+
+    Args:
+        name (str): "openai", "openai-compatible" or "modal". Defaults to LEARNBEE_LLM_BACKEND.
+        **options: Constructor arguments overriding the environment, e.g. base_url.
+
+    Returns:
+        LLMBackend: The backend.
+
+    Raises:
+        ValueError: If the name is unknown.
+    """
+    name = name or LLM_BACKEND
+    if name not in BACKENDS:
+        raise ValueError(f"Unknown LLM backend '{name}', expected one of {list(BACKENDS)}")
+    if name == LLM_BACKEND:
+        options.setdefault("model", LLM_MODEL)
+    if name == OpenAICompatibleBackend.name:
+        options.setdefault("api_key", LLM_API_KEY)
+        options.setdefault("base_url", LLM_BASE_URL)
+    return BACKENDS[name](**options)
+
+
+_backends: dict[str, LLMBackend] = {}
+_backend_lock = threading.Lock()
+
+
+def get_backend(name: str = None) -> LLMBackend:
+    """
+    Return the process-wide instance of a backend, creating it on first use.
+
+    Args:
+        name (str): The backend name. Defaults to LEARNBEE_LLM_BACKEND.
+
+    Returns:
+        LLMBackend: The shared backend.
+    """
+    name = name or LLM_BACKEND
+    backend = _backends.get(name)
+    if backend is None:
+        with _backend_lock:
+            backend = _backends.get(name)
+            if backend is None:
+                backend = _backends[name] = create_backend(name)
+                logger.info("LLM backend %s: %r", name, backend)
+    return backend
+
+
+def set_backend(backend: LLMBackend, name: str = None):
+    """
+    Replace a process-wide backend, e.g. to point every LLMCall at another server.
+
+    Args:
+        backend (LLMBackend): The new backend.
+        name (str): The name it is registered under. Defaults to LEARNBEE_LLM_BACKEND.
+    """
+    with _backend_lock:
+        _backends[name or LLM_BACKEND] = backend
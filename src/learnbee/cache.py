@@ -0,0 +1,209 @@
+"""Caching helpers shared by the lesson and LLM layers."""
+
+import hashlib
+import json
+import logging
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+def content_hash(text: str) -> str:
+    """Return a stable hex digest identifying a piece of lesson content."""
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+class TTLCache:
+    """
+    Thread-safe in-memory cache with a time-to-live and least-recently-used eviction.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl: float | None = None):
+        """
+        Initialize the cache.
+
+        Args:
+            max_entries (int): Maximum number of entries kept in memory.
+            ttl (float | None): Seconds after which an entry expires. None disables expiry.
+        """
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key):
+        """
+        Return the cached value for a key, or None if it is missing or expired.
+
+        Args:
+            key: Any hashable cache key.
+        """
+        with self._lock:
+            item = self._entries.get(key)
+            if item is None:
+                self.misses += 1
+                return None
+            value, expires_at = item
+            if expires_at is not None and expires_at <= time.monotonic():
+                del self._entries[key]
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """
+        Store a value and evict the least recently used entries beyond the size limit.
+
+        Args:
+            key: Any hashable cache key.
+            value: The value to store.
+        """
+        expires_at = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires_at)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """Remove all entries."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def stats(self) -> dict:
+        """Return cache counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "entries": len(self._entries),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+
+class PersistentCache:
+    """
+    Small SQLite-backed key/value store with least-recently-used eviction.
+
+    Values are stored as JSON. Several caches can share one database file by
+    using different namespaces. Any database error is logged and treated as a
+    cache miss so a read-only or missing disk never breaks the caller.
+    """
+
+    def __init__(self, path: str | Path, namespace: str, max_entries: int = 1000):
+        """
+        Initialize the cache.
+
+        Args:
+            path (str | Path): Location of the SQLite database file.
+            namespace (str): Namespace separating this cache from others in the same file.
+            max_entries (int): Maximum number of entries kept in this namespace.
+        """
+        self.path = Path(path)
+        self.namespace = namespace
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._conn = None
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key: str):
+        """
+        Return the cached value for a key, or None if it is not cached.
+
+        Args:
+            key (str): The cache key.
+        """
+        with self._lock:
+            try:
+                conn = self._connect()
+                row = conn.execute(
+                    "SELECT value FROM cache WHERE namespace = ? AND key = ?",
+                    (self.namespace, key),
+                ).fetchone()
+                if row is None:
+                    self.misses += 1
+                    return None
+                conn.execute(
+                    "UPDATE cache SET accessed_at = ? WHERE namespace = ? AND key = ?",
+                    (time.time(), self.namespace, key),
+                )
+                conn.commit()
+                self.hits += 1
+                return json.loads(row[0])
+            except (sqlite3.Error, OSError, ValueError) as e:
+                logger.warning("Cache read failed for %s: %s", self.namespace, e)
+                self.misses += 1
+                return None
+
+    def set(self, key: str, value):
+        """
+        Store a JSON-serializable value and evict the least recently used entries.
+
+        Args:
+            key (str): The cache key.
+            value: The value to store.
+        """
+        with self._lock:
+            try:
+                conn = self._connect()
+                now = time.time()
+                conn.execute(
+                    "INSERT OR REPLACE INTO cache (namespace, key, value, created_at, accessed_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (self.namespace, key, json.dumps(value), now, now),
+                )
+                conn.execute(
+                    "DELETE FROM cache WHERE namespace = ? AND key IN ("
+                    "SELECT key FROM cache WHERE namespace = ? "
+                    "ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                    (self.namespace, self.namespace, self.max_entries),
+                )
+                conn.commit()
+            except (sqlite3.Error, OSError) as e:
+                logger.warning("Cache write failed for %s: %s", self.namespace, e)
+
+    def clear(self):
+        """Remove all entries of this namespace."""
+        with self._lock:
+            try:
+                conn = self._connect()
+                conn.execute("DELETE FROM cache WHERE namespace = ?", (self.namespace,))
+                conn.commit()
+            except (sqlite3.Error, OSError) as e:
+                logger.warning("Cache clear failed for %s: %s", self.namespace, e)
+
+    def stats(self) -> dict:
+        """Return cache counters for monitoring."""
+        lookups = self.hits + self.misses
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / lookups if lookups else 0.0,
+        }
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use and create the schema if needed."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS cache ("
+                "namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "created_at REAL NOT NULL, accessed_at REAL NOT NULL, "
+                "PRIMARY KEY (namespace, key))"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
@@ -0,0 +1,106 @@
+"""Process-wide registry of pooled OpenAI clients."""
+
+import asyncio
+import os
+import threading
+import weakref
+
+import httpx
+from dotenv import load_dotenv
+from openai import AsyncOpenAI, DefaultAsyncHttpxClient, DefaultHttpxClient, OpenAI
+
+# Load environment variables from .env file
+load_dotenv()
+
+# Connection pool settings, overridable through the environment
+HTTP_MAX_CONNECTIONS = int(os.getenv("LEARNBEE_HTTP_MAX_CONNECTIONS", "200"))
+HTTP_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv("LEARNBEE_HTTP_MAX_KEEPALIVE_CONNECTIONS", "50"))
+HTTP_KEEPALIVE_EXPIRY = float(os.getenv("LEARNBEE_HTTP_KEEPALIVE_EXPIRY", "120"))
+HTTP_CONNECT_TIMEOUT = float(os.getenv("LEARNBEE_HTTP_CONNECT_TIMEOUT", "5"))
+HTTP_TIMEOUT = float(os.getenv("LEARNBEE_HTTP_TIMEOUT", "120"))
+
+_lock = threading.Lock()
+_clients: dict[tuple, OpenAI] = {}
+# Async connection pools are bound to the event loop that created them
+_async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, dict[tuple, AsyncOpenAI]]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def _limits() -> httpx.Limits:
+    return httpx.Limits(
+        max_connections=HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=HTTP_KEEPALIVE_EXPIRY,
+    )
+
+
+def _timeout() -> httpx.Timeout:
+    return httpx.Timeout(HTTP_TIMEOUT, connect=HTTP_CONNECT_TIMEOUT)
+
+
+def get_openai_client(api_key: str = None, base_url: str = None) -> OpenAI:
+    """
+    Return the shared OpenAI client for an endpoint, creating it on first use.
+
+    All callers with the same base URL and API key share one client and
+    therefore one keep-alive connection pool, so requests after the first
+    skip the TCP and TLS handshakes.
+
+    Args:
+        api_key (str): The API key. Defaults to the OPENAI_API_KEY environment variable.
+        base_url (str): The API base URL. Defaults to OPENAI_BASE_URL or the OpenAI API.
+
+    Returns:
+        OpenAI: A thread-safe client backed by a pooled HTTP connection.
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    base_url = base_url or os.getenv("OPENAI_BASE_URL")
+    key = (base_url, api_key)
+    client = _clients.get(key)
+    if client is not None:
+        return client
+    with _lock:
+        client = _clients.get(key)
+        if client is None:
+            http_client = DefaultHttpxClient(limits=_limits(), timeout=_timeout())
+            client = OpenAI(api_key=api_key, base_url=base_url, http_client=http_client, timeout=_timeout())
+            _clients[key] = client
+        return client
+
+
+def get_async_openai_client(api_key: str = None, base_url: str = None) -> AsyncOpenAI:
+    """
+    Return the shared AsyncOpenAI client for an endpoint and the running event loop.
+
+    Args:
+        api_key (str): The API key. Defaults to the OPENAI_API_KEY environment variable.
+        base_url (str): The API base URL. Defaults to OPENAI_BASE_URL or the OpenAI API.
+
+    Returns:
+        AsyncOpenAI: A client backed by a pooled async HTTP connection.
+    """
+    api_key = api_key or os.getenv("OPENAI_API_KEY")
+    base_url = base_url or os.getenv("OPENAI_BASE_URL")
+    key = (base_url, api_key)
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+
+    with _lock:
+        loop_clients = _async_clients.setdefault(loop, {}) if loop is not None else {}
+        client = loop_clients.get(key)
+        if client is None:
+            http_client = DefaultAsyncHttpxClient(limits=_limits(), timeout=_timeout())
+            client = AsyncOpenAI(api_key=api_key, base_url=base_url, http_client=http_client, timeout=_timeout())
+            loop_clients[key] = client
+        return client
+
+
+def close_clients():
+    """Close every pooled synchronous client, e.g. on shutdown or in tests."""
+    with _lock:
+        for client in _clients.values():
+            client.close()
+        _clients.clear()
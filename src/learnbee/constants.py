@@ -1,7 +1,104 @@
 """Constants used throughout the Learnbee MCP application."""
 
-# Maximum length for lesson content
-LESSON_CONTENT_MAX_LENGTH = 50000
+# Directory containing the lesson files
+LESSONS_DIR = "./lessons"
+
+# Minimum number of seconds between two scans of the lessons directory
+LESSON_CATALOG_POLL_INTERVAL = 2.0
+
+# Default and maximum number of bytes returned by one get_lesson_chunk call
+LESSON_CHUNK_DEFAULT_LENGTH = 4000
+LESSON_CHUNK_MAX_LENGTH = 64 * 1024
+
+# Maximum number of lessons generated concurrently by create_lessons
+LESSON_CREATION_MAX_WORKERS = 8
+
+# Typical length of a generated lesson in tokens, used to report generation progress
+LESSON_EXPECTED_TOKENS = 1300
+# Streamed lesson text is written and previewed at most every LESSON_STREAM_FLUSH_INTERVAL
+# seconds, or sooner once LESSON_STREAM_FLUSH_CHARS new characters are buffered
+LESSON_STREAM_FLUSH_INTERVAL = 0.25
+LESSON_STREAM_FLUSH_CHARS = 1024
+
+# SQLite database holding cached LLM results, stored next to the lessons
+LESSON_CACHE_PATH = "./lessons/.learnbee_cache.sqlite3"
+
+# Maximum number of cached key concept lists
+CONCEPT_CACHE_MAX_ENTRIES = 1000
+
+# Cached lesson introductions (shared across tutors) and their lifetime in seconds
+INTRODUCTION_CACHE_MAX_ENTRIES = 512
+INTRODUCTION_CACHE_TTL = 24 * 60 * 60
+
+# Streamed tutor replies are sent to the UI at most every STREAM_FLUSH_INTERVAL seconds,
+# or sooner once STREAM_FLUSH_CHARS new characters are buffered
+STREAM_FLUSH_INTERVAL = 0.05
+STREAM_FLUSH_CHARS = 64
+
+# Maximum number of concurrent runs of each UI event (chat turns, lesson loads, ...). The
+# handlers are async, so streams are bounded by open connections rather than threads; None
+# means no limit. Can also be set with the LEARNBEE_UI_CONCURRENCY_LIMIT environment variable.
+UI_CONCURRENCY_LIMIT = None
+
+# Maximum number of compiled tutor system prompts kept in memory
+PROMPT_CACHE_MAX_ENTRIES = 256
+
+# Recent messages always sent verbatim with each tutor turn (older turns are summarized).
+# The token budget for the verbatim history is set per model in learnbee.token_budget.
+HISTORY_MIN_MESSAGES = 4
+# Refresh the rolling summary once this many turns fell out of the history window
+HISTORY_SUMMARY_EVERY = 6
+
+# Lessons longer than this many tokens are not pasted whole into the tutor prompt:
+# the prompt gets an outline plus the LESSON_RETRIEVAL_TOP_K sections most relevant to the question
+LESSON_RETRIEVAL_MIN_TOKENS = 2000
+LESSON_RETRIEVAL_TOP_K = 3
+
+# Opt-in cache of early tutor replies, shared by all sessions. 0 disables it; the size can
+# also be set with the LEARNBEE_RESPONSE_CACHE_MAX_ENTRIES environment variable.
+RESPONSE_CACHE_MAX_ENTRIES = 0
+RESPONSE_CACHE_TTL = 6 * 60 * 60
+# Only replies to the first RESPONSE_CACHE_MAX_TURNS messages of a conversation are cached
+RESPONSE_CACHE_MAX_TURNS = 2
+
+# Token usage ledger (see learnbee.usage): database location and seconds between flushes
+USAGE_LEDGER_PATH = "./lessons/.learnbee_usage.sqlite3"
+USAGE_FLUSH_INTERVAL = 30.0
+
+# Prices in US dollars per million tokens: (input, cached input, output)
+MODEL_PRICES = {
+    "gpt-4o-mini": (0.15, 0.075, 0.60),
+    "gpt-4o": (2.50, 1.25, 10.00),
+    "gpt-4.1-nano": (0.10, 0.025, 0.40),
+    "gpt-4.1-mini": (0.40, 0.10, 1.60),
+    "gpt-4.1": (2.00, 0.50, 8.00),
+}
+
+# LLM backend (see learnbee.backends): "openai", "openai-compatible" or "modal". The
+# LEARNBEE_LLM_* environment variables override these defaults.
+DEFAULT_LLM_BACKEND = "openai"
+DEFAULT_LLM_MODEL = "gpt-4o-mini"
+# Deployed Modal app and class serving modal/main.py, and the model it runs
+MODAL_APP_NAME = "llm-server"
+MODAL_CLASS_NAME = "VLLMModel"
+MODAL_MODEL_NAME = "google/gemma-3-4b-it"
+
+# Model, output limit, timeout in seconds and backend of each LLMCall operation (see
+# learnbee.routing). A None model or backend uses the defaults above. Single fields can be
+# overridden with LEARNBEE_ROUTE_<OPERATION>_<FIELD>, e.g. LEARNBEE_ROUTE_EXTRACT_KEY_CONCEPTS_MODEL.
+LLM_ROUTES = {
+    # A few short lines: small enough for the smallest, fastest model
+    "extract_key_concepts": {"model": None, "max_tokens": 100, "timeout": 30.0, "backend": None},
+    "generate_lesson_introduction": {"model": None, "max_tokens": 400, "timeout": 60.0, "backend": None},
+    # Tutor turns: short replies for age-appropriate brevity, on the quality model
+    "respond": {"model": None, "max_tokens": 500, "timeout": 60.0, "backend": None},
+    # Complete lessons of 500-1000 words
+    "generate_lesson": {"model": None, "max_tokens": 5000, "timeout": 300.0, "backend": None},
+    "summarize_conversation": {"model": None, "max_tokens": 250, "timeout": 60.0, "backend": None},
+}
+
+# Latency histogram buckets, in seconds, of the /metrics endpoint (see learnbee.metrics)
+METRICS_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0)
 
 # Available tutor names for early childhood education
 # Mix of Disney characters, video game characters, famous personalities, and original characters
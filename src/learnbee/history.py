@@ -0,0 +1,135 @@
+"""Conversation history windowing and rolling summaries for long tutoring sessions."""
+
+import json
+from dataclasses import dataclass
+
+from learnbee.cache import content_hash
+from learnbee.constants import HISTORY_MIN_MESSAGES, HISTORY_SUMMARY_EVERY
+from learnbee.token_budget import count_tokens, get_budget
+
+
+@dataclass
+class ConversationSummary:
+    """Rolling summary of the first ``covered`` messages of a conversation."""
+
+    text: str
+    covered: int
+    prefix_hash: str
+
+
+def _normalize(history: list) -> list[dict]:
+    """Drop system messages and keep only role and content."""
+    return [
+        {"role": h.get("role", "user"), "content": h.get("content", "")}
+        for h in history
+        if h.get("role") != "system"
+    ]
+
+
+def _messages_hash(messages: list[dict]) -> str:
+    return content_hash(json.dumps(messages, ensure_ascii=False, sort_keys=True, default=str))
+
+
+def _message_text(message: dict) -> str:
+    content = message.get("content", "")
+    return content if isinstance(content, str) else str(content)
+
+
+class HistoryPolicy:
+    """
+    Decide which part of the conversation history is sent with each turn.
+
+    The most recent messages are kept within a token budget. Older messages
+    are represented by a rolling summary, refreshed every ``summarize_every``
+    turns outside of the chat turn itself, so the prompt size stays roughly
+    constant however long the session runs. Messages that fell out of the
+    budget but are not covered by the summary yet are still sent verbatim, so
+    the history exceeds its budget by at most ``summarize_every`` turns.
+    """
+
+    def __init__(
+        self,
+        model: str = "gpt-4o-mini",
+        max_tokens: int = None,
+        min_messages: int = HISTORY_MIN_MESSAGES,
+        summarize_every: int = HISTORY_SUMMARY_EVERY,
+    ):
+        """
+        Initialize the policy.
+
+        Args:
+            model (str): The model the history is sent to, used for token counting.
+            max_tokens (int): Token budget for the verbatim recent history. Defaults to
+                the history budget of the model.
+            min_messages (int): Number of recent messages always kept, even over budget.
+            summarize_every (int): Number of turns (user + assistant messages) that may
+                fall out of the window before the summary is refreshed.
+        """
+        self.model = model
+        self.max_tokens = get_budget(model).max_history_tokens if max_tokens is None else max_tokens
+        self.min_messages = min_messages
+        self.summarize_every = summarize_every
+
+    def window_start(self, messages: list[dict]) -> int:
+        """Return the index of the first message kept verbatim."""
+        total = 0
+        start = len(messages)
+        for index in range(len(messages) - 1, -1, -1):
+            total += count_tokens(_message_text(messages[index]), self.model)
+            if total > self.max_tokens and len(messages) - index > self.min_messages:
+                break
+            start = index
+        return start
+
+    def valid_summary(self, messages: list[dict], summary: ConversationSummary | None) -> ConversationSummary | None:
+        """Return the summary if it still describes the beginning of this conversation."""
+        if summary is None or summary.covered > len(messages):
+            return None
+        if _messages_hash(messages[: summary.covered]) != summary.prefix_hash:
+            return None
+        return summary
+
+    def apply(self, history: list, summary: ConversationSummary | None = None) -> tuple[list[dict], str | None]:
+        """
+        Window the history for the next turn.
+
+        Args:
+            history (list): The full Gradio conversation history.
+            summary (ConversationSummary | None): The session's rolling summary, if any.
+
+        Returns:
+            tuple[list[dict], str | None]: The recent messages to send verbatim, and the
+            summary text of older messages (None when nothing was dropped or summarized).
+        """
+        messages = _normalize(history)
+        summary = self.valid_summary(messages, summary)
+        # Nothing is dropped before the summary covers it
+        start = min(self.window_start(messages), summary.covered if summary else 0)
+        summary_text = summary.text if summary and start > 0 else None
+        return messages[start:], summary_text
+
+    def should_summarize(self, history: list, summary: ConversationSummary | None = None) -> bool:
+        """Return True when enough messages fell out of the token window without being summarized."""
+        messages = _normalize(history)
+        summary = self.valid_summary(messages, summary)
+        covered = summary.covered if summary else 0
+        return self.window_start(messages) - covered >= 2 * self.summarize_every
+
+    def pending(self, history: list, summary: ConversationSummary | None = None) -> tuple[list[dict], int]:
+        """
+        Return the messages to fold into the summary and the new covered count.
+
+        Args:
+            history (list): The full Gradio conversation history.
+            summary (ConversationSummary | None): The session's rolling summary, if any.
+        """
+        messages = _normalize(history)
+        summary = self.valid_summary(messages, summary)
+        covered = summary.covered if summary else 0
+        start = self.window_start(messages)
+        return messages[covered:start], start
+
+    def make_summary(self, history: list, text: str, covered: int) -> ConversationSummary:
+        """Build a summary object for the first ``covered`` messages of the history."""
+        messages = _normalize(history)
+        return ConversationSummary(text=text, covered=covered, prefix_hash=_messages_hash(messages[:covered]))
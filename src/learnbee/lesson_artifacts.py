@@ -0,0 +1,83 @@
+"""Sidecar artifacts (key concepts and introductions) precomputed for each lesson."""
+
+import json
+import logging
+import os
+from pathlib import Path
+
+from learnbee.cache import content_hash
+from learnbee.constants import LESSONS_DIR
+
+logger = logging.getLogger(__name__)
+
+ARTIFACT_SUFFIX = ".meta.json"
+
+# Bump when the artifact layout changes so old sidecars are regenerated
+ARTIFACT_VERSION = 1
+
+
+def artifact_path(lesson_name: str, lessons_dir: str | Path = LESSONS_DIR) -> Path:
+    """Return the path of the sidecar artifact for a lesson."""
+    return Path(lessons_dir) / f"{lesson_name}{ARTIFACT_SUFFIX}"
+
+
+def read_lesson_artifacts(lesson_name: str, lessons_dir: str | Path = LESSONS_DIR) -> dict | None:
+    """
+    Read the sidecar artifact of a lesson without checking whether it is stale.
+
+    Args:
+        lesson_name (str): The name of the lesson (without .txt extension).
+        lessons_dir (str | Path): Directory containing the lessons.
+
+    Returns:
+        dict | None: The artifact, or None if it is missing or unreadable.
+    """
+    path = artifact_path(lesson_name, lessons_dir)
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            artifacts = json.load(f)
+    except FileNotFoundError:
+        return None
+    except (OSError, ValueError) as e:
+        logger.warning("Ignoring unreadable lesson artifact %s: %s", path, e)
+        return None
+    if not isinstance(artifacts, dict) or artifacts.get("version") != ARTIFACT_VERSION:
+        return None
+    return artifacts
+
+
+def load_lesson_artifacts(
+    lesson_name: str, lesson_content: str, lessons_dir: str | Path = LESSONS_DIR
+) -> dict | None:
+    """
+    Return the sidecar artifact of a lesson if it was generated from this exact content.
+
+    Args:
+        lesson_name (str): The name of the lesson (without .txt extension).
+        lesson_content (str): The lesson content the artifact must match.
+        lessons_dir (str | Path): Directory containing the lessons.
+
+    Returns:
+        dict | None: The artifact with "concepts" and "introductions" keys, or None if
+        it is missing or stale.
+    """
+    artifacts = read_lesson_artifacts(lesson_name, lessons_dir)
+    if artifacts is None or artifacts.get("content_hash") != content_hash(lesson_content):
+        return None
+    return artifacts
+
+
+def save_lesson_artifacts(lesson_name: str, artifacts: dict, lessons_dir: str | Path = LESSONS_DIR):
+    """
+    Atomically write the sidecar artifact of a lesson.
+
+    Args:
+        lesson_name (str): The name of the lesson (without .txt extension).
+        artifacts (dict): The artifact to write.
+        lessons_dir (str | Path): Directory containing the lessons.
+    """
+    path = artifact_path(lesson_name, lessons_dir)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump({**artifacts, "version": ARTIFACT_VERSION}, f, ensure_ascii=False, indent=2)
+    os.replace(tmp_path, path)
@@ -0,0 +1,241 @@
+"""In-memory catalog of the lessons stored in the lessons directory."""
+
+import os
+import threading
+import time
+from dataclasses import dataclass
+from pathlib import Path
+
+from learnbee.constants import LESSON_CATALOG_POLL_INTERVAL, LESSONS_DIR
+
+LESSON_SUFFIX = ".txt"
+
+
+@dataclass
+class LessonEntry:
+    """A lesson file known to the catalog."""
+
+    name: str
+    path: Path
+    size: int
+    mtime_ns: int
+    content: str | None = None
+
+
+def _char_start(data: bytes, index: int) -> int:
+    """Return the first index at or after ``index`` that does not split a UTF-8 character."""
+    while index < len(data) and (data[index] & 0xC0) == 0x80:
+        index += 1
+    return index
+
+
+class LessonCatalog:
+    """
+    Thread-safe, in-memory index of lesson files.
+
+    The directory is scanned once and then re-polled at most every
+    ``poll_interval`` seconds. Entries whose size or mtime changed are
+    invalidated and their content is reloaded lazily on the next lookup, so
+    listing lessons and reading their content are plain dictionary hits.
+    """
+
+    def __init__(self, lessons_dir: str | Path = LESSONS_DIR, poll_interval: float = LESSON_CATALOG_POLL_INTERVAL):
+        """
+        Initialize the catalog.
+
+        Args:
+            lessons_dir (str | Path): Directory containing the ``.txt`` lesson files.
+            poll_interval (float): Minimum number of seconds between two directory scans.
+        """
+        self.lessons_dir = Path(lessons_dir)
+        self.poll_interval = poll_interval
+        self._lock = threading.RLock()
+        self._entries: dict[str, LessonEntry] = {}
+        self._names: list[str] = []
+        self._available = False
+        self._last_scan = None
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def available(self) -> bool:
+        """Whether the lessons directory exists."""
+        self._refresh_if_stale()
+        return self._available
+
+    def list_names(self) -> list[str]:
+        """Return the sorted list of lesson names."""
+        self._refresh_if_stale()
+        return list(self._names)
+
+    def exists(self, lesson_name: str) -> bool:
+        """Return True if a lesson with the given name is in the catalog."""
+        self._refresh_if_stale()
+        return lesson_name in self._entries
+
+    def get(self, lesson_name: str) -> LessonEntry | None:
+        """
+        Return the catalog entry for a lesson, loading its content if needed.
+
+        Args:
+            lesson_name (str): The name of the lesson (without .txt extension).
+
+        Returns:
+            LessonEntry | None: The entry, or None if the lesson does not exist.
+        """
+        self._refresh_if_stale()
+        with self._lock:
+            entry = self._entries.get(lesson_name)
+            if entry is None:
+                return None
+            if entry.content is not None:
+                self.hits += 1
+                return entry
+            self.misses += 1
+            try:
+                with open(entry.path, "r", encoding="utf-8") as f:
+                    entry.content = f.read()
+            except FileNotFoundError:
+                self._remove(lesson_name)
+                return None
+            return entry
+
+    def get_content(self, lesson_name: str) -> str | None:
+        """Return the decoded content of a lesson, or None if it does not exist."""
+        entry = self.get(lesson_name)
+        return entry.content if entry else None
+
+    def read_range(self, lesson_name: str, offset: int, length: int) -> tuple[str, int, int, int] | None:
+        """
+        Read part of a lesson file without loading the whole lesson.
+
+        Offsets are byte offsets into the UTF-8 file. The range is widened or
+        narrowed to whole characters, so an offset landing inside a multi-byte
+        character starts at the next character.
+
+        Args:
+            lesson_name (str): The name of the lesson (without .txt extension).
+            offset (int): Byte offset to start reading at.
+            length (int): Maximum number of bytes to read.
+
+        Returns:
+            tuple[str, int, int, int] | None: The decoded text, its start and end byte
+            offsets, and the file size, or None if the lesson does not exist.
+        """
+        self._refresh_if_stale()
+        entry = self._entries.get(lesson_name)
+        if entry is None:
+            return None
+        try:
+            with open(entry.path, "rb") as f:
+                size = os.fstat(f.fileno()).st_size
+                offset = min(max(offset, 0), size)
+                f.seek(offset)
+                # A UTF-8 character is at most 4 bytes long
+                data = f.read(length + 3)
+        except FileNotFoundError:
+            with self._lock:
+                self._remove(lesson_name)
+            return None
+
+        start = _char_start(data, 0)
+        end = _char_start(data, min(length, len(data))) if len(data) > length else len(data)
+        if end <= start and start < len(data):
+            # The range is shorter than a single character; return that character
+            end = _char_start(data, start + 1)
+        text = data[start:end].decode("utf-8", errors="replace")
+        return text, offset + start, offset + end, size
+
+    def register(self, lesson_name: str, content: str | None = None) -> LessonEntry | None:
+        """
+        Add or refresh a single lesson without rescanning the directory.
+
+        Args:
+            lesson_name (str): The name of the lesson (without .txt extension).
+            content (str | None): The content just written to disk, if known.
+
+        Returns:
+            LessonEntry | None: The registered entry, or None if the file is missing.
+        """
+        path = self.lessons_dir / f"{lesson_name}{LESSON_SUFFIX}"
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            return None
+        with self._lock:
+            entry = LessonEntry(lesson_name, path, stat.st_size, stat.st_mtime_ns, content)
+            if lesson_name not in self._entries:
+                self._names = sorted([*self._names, lesson_name])
+            self._entries[lesson_name] = entry
+            self._available = True
+            return entry
+
+    def invalidate(self, lesson_name: str | None = None):
+        """
+        Drop cached content for one lesson, or force a full rescan if no name is given.
+
+        Args:
+            lesson_name (str | None): The lesson to invalidate. Defaults to all lessons.
+        """
+        with self._lock:
+            if lesson_name is None:
+                self._last_scan = None
+            elif lesson_name in self._entries:
+                self._entries[lesson_name].content = None
+
+    def stats(self) -> dict:
+        """Return cache counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "lessons": len(self._entries),
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    def _refresh_if_stale(self):
+        """Rescan the directory if the poll interval has elapsed."""
+        now = time.monotonic()
+        if self._last_scan is not None and now - self._last_scan < self.poll_interval:
+            return
+        with self._lock:
+            # Another thread may have refreshed while we waited for the lock
+            if self._last_scan is not None and now - self._last_scan < self.poll_interval:
+                return
+            self._scan()
+            self._last_scan = time.monotonic()
+
+    def _scan(self):
+        """Synchronize entries with the files on disk, keeping unchanged content."""
+        try:
+            dir_entries = list(os.scandir(self.lessons_dir))
+        except (FileNotFoundError, NotADirectoryError):
+            self._available = False
+            self._entries = {}
+            self._names = []
+            return
+
+        seen = {}
+        for dir_entry in dir_entries:
+            name, suffix = os.path.splitext(dir_entry.name)
+            if suffix.lower() != LESSON_SUFFIX or not dir_entry.is_file():
+                continue
+            stat = dir_entry.stat()
+            entry = self._entries.get(name)
+            if entry is None or entry.size != stat.st_size or entry.mtime_ns != stat.st_mtime_ns:
+                entry = LessonEntry(name, Path(dir_entry.path), stat.st_size, stat.st_mtime_ns)
+            seen[name] = entry
+
+        self._available = True
+        self._entries = seen
+        self._names = sorted(seen)
+
+    def _remove(self, lesson_name: str):
+        """Forget a lesson that disappeared from disk."""
+        self._entries.pop(lesson_name, None)
+        self._names = [name for name in self._names if name != lesson_name]
+
+
+# Shared catalog used by the MCP tools and the UI handlers
+lesson_catalog = LessonCatalog()
@@ -1,25 +1,176 @@
+import json
+import logging
 import os
-from typing import Generator
+import re
+import time
+from typing import AsyncGenerator, Generator
 
-from dotenv import load_dotenv
-from openai import OpenAI
+from learnbee.cache import PersistentCache, TTLCache, content_hash
+from learnbee.backends import LLMBackend, Usage, get_backend
+from learnbee.constants import (
+    CONCEPT_CACHE_MAX_ENTRIES,
+    INTRODUCTION_CACHE_MAX_ENTRIES,
+    INTRODUCTION_CACHE_TTL,
+    LESSON_CACHE_PATH,
+    RESPONSE_CACHE_MAX_ENTRIES,
+    RESPONSE_CACHE_MAX_TURNS,
+    RESPONSE_CACHE_TTL,
+    STREAM_FLUSH_CHARS,
+    STREAM_FLUSH_INTERVAL,
+)
+from learnbee import metrics
+from learnbee.routing import get_route, route_model
+from learnbee.singleflight import AsyncSingleFlight, SingleFlight
+from learnbee.streaming import acoalesce_deltas, coalesce_deltas, replay_text
+from learnbee.token_budget import get_budget, truncate_to_tokens
+from learnbee.usage import usage_cost, usage_ledger
 
-# Load environment variables from .env file
-load_dotenv()
+logger = logging.getLogger(__name__)
+
+# Bump when the concept extraction prompt changes to invalidate cached results
+CONCEPTS_PROMPT_VERSION = 1
+
+concept_cache = PersistentCache(LESSON_CACHE_PATH, "concepts", max_entries=CONCEPT_CACHE_MAX_ENTRIES)
+
+# Introductions do not depend on the tutor, so every tutor shares this cache
+introduction_cache = TTLCache(max_entries=INTRODUCTION_CACHE_MAX_ENTRIES, ttl=INTRODUCTION_CACHE_TTL)
+
+# Identical concurrent concept and introduction requests (e.g. a whole class loading
+# the same lesson) share one in-flight API call
+llm_flights = SingleFlight()
+async_llm_flights = AsyncSingleFlight()
+
+# Early tutor replies, replayed for children asking the same opening questions. Opt-in.
+RESPONSE_CACHE_SIZE = int(os.getenv("LEARNBEE_RESPONSE_CACHE_MAX_ENTRIES", RESPONSE_CACHE_MAX_ENTRIES))
+response_cache = TTLCache(max_entries=RESPONSE_CACHE_SIZE, ttl=RESPONSE_CACHE_TTL) if RESPONSE_CACHE_SIZE > 0 else None
+# Log the response cache hit rate every this many lookups
+RESPONSE_CACHE_LOG_EVERY = 100
+
+_PUNCTUATION_RE = re.compile(r"[^\w\s]", re.UNICODE)
+
+
+def normalize_message(message: str) -> str:
+    """Normalize a chat message for cache lookups: case, punctuation and spacing are ignored."""
+    return " ".join(_PUNCTUATION_RE.sub(" ", str(message).lower()).split())
+
+
+def response_cache_key(
+    lesson_content: str,
+    tutor_name: str,
+    difficulty_level: str,
+    message: str,
+    language: str,
+    history: list,
+) -> tuple | None:
+    """
+    Build the response cache key of a tutor turn.
+
+    The whole earlier conversation is part of the key: the child's messages
+    (normalized) and the tutor's replies (verbatim). A cached second turn is
+    therefore only replayed after the same first question and the same answer.
+
+    Args:
+        lesson_content (str): The lesson content sent to the tutor.
+        tutor_name (str): The name of the tutor.
+        difficulty_level (str): The difficulty level.
+        message (str): The child's message.
+        language (str): The selected language.
+        history (list): The conversation history before this message.
+
+    Returns:
+        tuple | None: The cache key, or None if the cache is disabled or the
+        conversation is past its first RESPONSE_CACHE_MAX_TURNS messages.
+    """
+    if response_cache is None:
+        return None
+    previous = [
+        [
+            h.get("role"),
+            normalize_message(h.get("content", "")) if h.get("role") == "user" else h.get("content", ""),
+        ]
+        for h in history
+        if h.get("role") != "system"
+    ]
+    if sum(role == "user" for role, _ in previous) >= RESPONSE_CACHE_MAX_TURNS:
+        return None
+    return (
+        content_hash(lesson_content),
+        tutor_name,
+        difficulty_level,
+        normalize_message(message),
+        language,
+        content_hash(json.dumps(previous, ensure_ascii=False, default=str)),
+    )
+
+
+def _cached_response(cache_key) -> str | None:
+    """Look up a tutor reply, logging the hit rate from time to time."""
+    if cache_key is None or response_cache is None:
+        return None
+    cached = response_cache.get(cache_key)
+    stats = response_cache.stats()
+    if (stats["hits"] + stats["misses"]) % RESPONSE_CACHE_LOG_EVERY == 0:
+        logger.info(
+            "Response cache: %d entries, hit rate %.1f%% (%d hits, %d misses)",
+            stats["entries"], 100 * stats["hit_rate"], stats["hits"], stats["misses"],
+        )
+    return cached
+
+
+def _cache_metrics() -> list:
+    """Expose the cache and single-flight counters on /metrics."""
+    stats = cache_stats()
+    flights = {"sync": stats.pop("single_flight"), "async": stats.pop("async_single_flight")}
+    return [
+        *metrics.stats_gauges("learnbee_llm_cache", "LLM result cache counter", "cache", stats),
+        *metrics.stats_gauges("learnbee_llm_single_flight", "Shared in-flight LLM call counter", "group", flights),
+    ]
+
+
+def cache_stats() -> dict:
+    """Return the counters of the LLM result caches."""
+    return {
+        "concepts": concept_cache.stats(),
+        "introductions": introduction_cache.stats(),
+        "responses": response_cache.stats() if response_cache is not None else None,
+        "single_flight": llm_flights.stats(),
+        "async_single_flight": async_llm_flights.stats(),
+    }
+
+
+metrics.registry.add_collector(_cache_metrics)
 
 
 class LLMCall:
-    """LLM client using OpenAI API for educational tutoring."""
+    """
+    LLM client for educational tutoring.
+
+    Each operation follows its route (see learnbee.routing): concept extraction
+    can run on a small model while tutor turns keep the quality model.
+    """
 
-    def __init__(self, model: str = "gpt-4o-mini"):
+    def __init__(self, model: str = None, usage_labels: dict = None, backend: LLMBackend = None):
         """
         Initialize the LLM client.
 
+        The backends and their connection pools are shared process-wide, so
+        creating an LLMCall per request is cheap.
+
         Args:
-            model (str): The OpenAI model to use. Defaults to "gpt-4o-mini".
+            model (str): Use this model for every operation instead of the routed models.
+            usage_labels (dict): Session, lesson, tutor and difficulty the token
+                usage of this client is accounted to (see learnbee.usage).
+            backend (LLMBackend): Send every operation to this backend, with its default
+                model unless ``model`` is given, instead of following the routes.
         """
-        self.client = OpenAI(api_key=os.getenv("OPENAI_API_KEY"))
-        self.model = model
+        self._pinned_model = model
+        self._pinned_backend = backend
+        self.backend = backend or get_backend()
+        # Model of the operations whose route does not choose one
+        self.model = model or self.backend.default_model
+        self.usage_labels = usage_labels or {}
+        # Token usage of the most recent API call (see _record_usage)
+        self.last_usage = None
 
     def _convert_history(self, message: str, gradio_history: list) -> list[dict]:
         """Convert Gradio history format to OpenAI API format."""
@@ -38,6 +189,120 @@ class LLMCall:
         messages.append({"role": "user", "content": message})
         return messages
 
+    def _route_backend(self, operation: str) -> LLMBackend:
+        """Return the backend serving an operation."""
+        if self._pinned_backend is not None:
+            return self._pinned_backend
+        return get_backend(get_route(operation).backend)
+
+    def _route_model(self, operation: str) -> str:
+        """Return the model serving an operation."""
+        if self._pinned_model or self._pinned_backend is not None:
+            return self.model
+        return route_model(operation)
+
+    def _request(self, operation: str, messages: list[dict], temperature: float) -> dict:
+        """Build a chat completion request with the model, output limit and timeout of an operation's route."""
+        route = get_route(operation)
+        request = dict(model=self._route_model(operation), messages=messages, temperature=temperature)
+        if route.max_tokens:
+            request["max_tokens"] = route.max_tokens
+        if route.timeout:
+            request["timeout"] = route.timeout
+        return request
+
+    def _complete(self, operation: str, request: dict) -> str:
+        """Send a request to the backend of its operation, account its usage and return the reply."""
+        backend = self._route_backend(operation)
+        start = time.perf_counter()
+        try:
+            response = backend.complete(request)
+        finally:
+            metrics.record_backend_call(operation, request["model"], backend.name, time.perf_counter() - start)
+        self._record_usage(operation, response.usage, request["model"])
+        return response.text
+
+    def _stream(self, operation: str, request: dict) -> Generator[str, None, None]:
+        """Stream a request from the backend of its operation, yielding the raw text deltas."""
+        backend = self._route_backend(operation)
+        start = time.perf_counter()
+        try:
+            for chunk in backend.stream(request):
+                if chunk.usage:
+                    self._record_usage(operation, chunk.usage, request["model"])
+                if chunk.text:
+                    yield chunk.text
+        finally:
+            metrics.record_backend_call(operation, request["model"], backend.name, time.perf_counter() - start)
+
+    def _record_usage(self, operation: str, usage: Usage | None, model: str = None):
+        """Remember, log and account the token usage reported by the backend, including cached prompt tokens."""
+        if usage is None:
+            return
+        model = model or self.model
+        self.last_usage = {
+            "operation": operation,
+            "prompt_tokens": usage.prompt_tokens,
+            "cached_tokens": usage.cached_tokens,
+            "completion_tokens": usage.completion_tokens,
+        }
+        counts = (self.last_usage["prompt_tokens"], self.last_usage["cached_tokens"], self.last_usage["completion_tokens"])
+        metrics.record_tokens(operation, model, *counts, cost=usage_cost(model, *counts))
+        usage_ledger.record(operation, model, *counts, labels=self.usage_labels)
+        logger.info(
+            "%s usage: prompt=%d (cached=%d) completion=%d",
+            operation,
+            self.last_usage["prompt_tokens"],
+            self.last_usage["cached_tokens"],
+            self.last_usage["completion_tokens"],
+        )
+
+    def _chat_request(self, message: str, history: list, system_prompt: str = None) -> dict:
+        """Build the chat completion request for a tutor turn."""
+        # Construct messages for OpenAI API
+        messages = []
+
+        # Add system prompt
+        if system_prompt:
+            messages.append({"role": "system", "content": system_prompt})
+
+        # Add conversation history (excluding system messages) and the current user message
+        messages.extend(self._convert_history(message, history))
+
+        # Educational-appropriate settings; the reply length is limited by the route
+        # Balanced temperature: creative enough for engagement, consistent for learning
+        return self._request("respond", messages, temperature=0.6)
+
+    def _stream_deltas(self, message: str, history: list, system_prompt: str = None) -> Generator[str, None, None]:
+        """Yield the raw text deltas of a streamed tutor turn, one per chunk."""
+        yield from self._stream("respond", self._chat_request(message, history, system_prompt))
+
+    def respond_deltas(
+        self,
+        message: str,
+        history: list,
+        system_prompt: str = None,
+        flush_interval: float = STREAM_FLUSH_INTERVAL,
+        flush_chars: int = STREAM_FLUSH_CHARS,
+    ) -> Generator[str, None, None]:
+        """
+        Stream a response as coalesced deltas instead of the accumulated text.
+
+        Args:
+            message (str): The user's message.
+            history (list): The conversation history.
+            system_prompt (str): The system prompt.
+            flush_interval (float): Maximum number of seconds to buffer tokens.
+            flush_chars (int): Number of buffered characters that triggers a flush.
+
+        Yields:
+            str: New text since the previous yield.
+        """
+        yield from coalesce_deltas(
+            self._stream_deltas(message, history, system_prompt), flush_interval, flush_chars
+        )
+
+    @metrics.instrument("llm")
     def respond(
         self,
         message: str,
@@ -45,9 +310,13 @@ class LLMCall:
         system_prompt: str = None,
         tutor_name: str = None,
         difficulty_level: str = "beginner",
+        cache_key: tuple = None,
     ) -> Generator[str, None, None]:
         """
-        Generate a response to the user message using the OpenAI LLM.
+        Generate a response to the user message using the LLM.
+
+        Tokens are coalesced (see respond_deltas) before being accumulated, so
+        long answers produce far fewer updates.
 
         Args:
             message (str): The user's message.
@@ -55,57 +324,27 @@ class LLMCall:
             system_prompt (str): The system prompt (optional, will be constructed if not provided).
             tutor_name (str): The name of the tutor.
             difficulty_level (str): The difficulty level (beginner, intermediate, advanced).
+            cache_key (tuple): Response cache key (see response_cache_key). A cached reply is
+                replayed instead of calling the API, and complete replies are stored.
 
         Yields:
-            str: Streaming response chunks.
+            str: The response accumulated so far.
         """
-        # Construct messages for OpenAI API
-        messages = []
-        
-        # Add system prompt
-        if system_prompt:
-            messages.append({"role": "system", "content": system_prompt})
-        
-        # Add conversation history (excluding system messages)
-        for h in history:
-            if h.get("role") != "system":
-                messages.append(
-                    {
-                        "role": h.get("role", "user"),
-                        "content": h.get("content", ""),
-                    }
-                )
-        
-        # Add current user message
-        messages.append({"role": "user", "content": message})
-
-        # Make streaming API call with educational-appropriate settings
-        # Lower temperature for more consistent, educational responses
-        stream = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            stream=True,
-            temperature=0.6,  # Balanced: creative enough for engagement, consistent for learning
-            max_tokens=500,  # Limit response length for age-appropriate brevity
-        )
-
+        cached = _cached_response(cache_key)
+        deltas = replay_text(cached) if cached is not None else self.respond_deltas(message, history, system_prompt)
         response = ""
-        for chunk in stream:
-            if chunk.choices[0].delta.content is not None:
-                content = chunk.choices[0].delta.content
-                response += content
-                yield response
+        for delta in deltas:
+            response += delta
+            yield response
+        if cached is None and cache_key is not None and response:
+            response_cache.set(cache_key, response)
 
-    def extract_key_concepts(self, lesson_content: str) -> list[str]:
-        """
-        Extract key concepts from the lesson content.
-
-        Args:
-            lesson_content (str): The content of the lesson.
+    def _concepts_cache_key(self, lesson_content: str) -> str:
+        model = self._route_model("extract_key_concepts")
+        return f"{content_hash(lesson_content)}:{model}:v{CONCEPTS_PROMPT_VERSION}"
 
-        Returns:
-            list[str]: A list of 2 to 5 key concepts from the lesson.
-        """
+    def _concepts_request(self, lesson_content: str) -> dict:
+        """Build the completion request extracting key concepts from a lesson."""
         system_prompt = (
             "Your task is to extract 2 to 5 key educational concepts from the provided lesson content. "
             "These concepts should be appropriate for early childhood education (ages 3-12). "
@@ -125,14 +364,11 @@ class LLMCall:
             {"role": "user", "content": lesson_content},
         ]
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=0.3,
-        )
+        return self._request("extract_key_concepts", messages, temperature=0.3)
 
-        content = response.choices[0].message.content
-        print("Response from LLM:", content)
+    def _parse_concepts(self, content: str) -> list[str]:
+        """Turn the concept extraction completion into a list of concepts."""
+        logger.debug("Key concepts response: %s", content)
 
         # Split the response by new lines and strip whitespace
         concepts = [concept.strip() for concept in content.split("\n") if concept.strip()]
@@ -140,26 +376,52 @@ class LLMCall:
         # Limit to 10 concepts
         return concepts[:10]
 
-    def generate_lesson_introduction(
-        self, lesson_content: str, lesson_name: str, concepts: list[str], language: str = "English"
-    ) -> str:
+    @metrics.instrument("llm")
+    def extract_key_concepts(self, lesson_content: str, use_cache: bool = True) -> list[str]:
         """
-        Generate an educational introduction for the lesson including:
-        - A brief summary of the activity
-        - Key concepts
-        - Example questions to guide the child
+        Extract key concepts from the lesson content.
+
+        Results are cached on disk by lesson content, model and prompt version,
+        so repeated loads of an unchanged lesson skip the API call.
 
         Args:
             lesson_content (str): The content of the lesson.
-            lesson_name (str): The name of the lesson.
-            concepts (list[str]): List of key concepts extracted from the lesson.
-            language (str): The language to generate the introduction in. Defaults to "English".
+            use_cache (bool): Whether to read and write the concept cache. Defaults to True.
 
         Returns:
-            str: A formatted introduction with summary, concepts, and example questions.
+            list[str]: A list of 2 to 5 key concepts from the lesson.
         """
+        cache_key = self._concepts_cache_key(lesson_content)
+        if not use_cache:
+            return self._fetch_key_concepts(lesson_content)
+
+        cached = concept_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        return llm_flights.do(
+            ("extract_key_concepts", cache_key), lambda: self._fetch_key_concepts(lesson_content, cache_key)
+        )
+
+    def _fetch_key_concepts(self, lesson_content: str, cache_key: str = None) -> list[str]:
+        """Call the API to extract key concepts, and cache them if a cache key is given."""
+        content = self._complete("extract_key_concepts", self._concepts_request(lesson_content))
+        concepts = self._parse_concepts(content)
+        if cache_key and concepts:
+            concept_cache.set(cache_key, concepts)
+        return concepts
+
+    def _introduction_cache_key(self, lesson_content: str, lesson_name: str, concepts: list[str], language: str):
+        model = self._route_model("generate_lesson_introduction")
+        return (content_hash(lesson_content), lesson_name, language, tuple(concepts[:8]), model)
+
+    def _introduction_request(
+        self, lesson_content: str, lesson_name: str, concepts: list[str], language: str
+    ) -> dict:
+        """Build the completion request generating a lesson introduction."""
         concepts_text = ", ".join(concepts[:8])  # Show up to 8 concepts
-        
+        model = self._route_model("generate_lesson_introduction")
+        lesson_excerpt = truncate_to_tokens(lesson_content, get_budget(model).max_introduction_lesson_tokens, model)
+
         system_prompt = (
             f"You are an educational expert creating an introduction for a lesson for children ages 3-12. "
             f"IMPORTANT: You must write the ENTIRE introduction in {language}. "
@@ -182,7 +444,7 @@ class LLMCall:
         user_prompt = (
             f"Lesson Name: {lesson_name}\n\n"
             f"Key Concepts: {concepts_text}\n\n"
-            f"Lesson Content:\n{lesson_content[:2000]}\n\n"
+            f"Lesson Content:\n{lesson_excerpt}\n\n"
             "Create an engaging introduction for this lesson."
         )
 
@@ -191,27 +453,62 @@ class LLMCall:
             {"role": "user", "content": user_prompt},
         ]
 
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=0.7,  # Slightly higher for creativity
-            max_tokens=400,
-        )
-
-        introduction = response.choices[0].message.content
-        return introduction
+        # Slightly higher temperature for creativity
+        return self._request("generate_lesson_introduction", messages, temperature=0.7)
 
-    def generate_lesson(self, topic: str, age_range: str = "3-6") -> str:
+    @metrics.instrument("llm")
+    def generate_lesson_introduction(
+        self,
+        lesson_content: str,
+        lesson_name: str,
+        concepts: list[str],
+        language: str = "English",
+        use_cache: bool = True,
+    ) -> str:
         """
-        Generate a complete lesson content based on a topic using ChatGPT.
-        
+        Generate an educational introduction for the lesson including:
+        - A brief summary of the activity
+        - Key concepts
+        - Example questions to guide the child
+
+        Introductions are cached in memory by lesson content, language and concepts.
+
         Args:
-            topic (str): The topic for the lesson (e.g., "dinosaurs", "space", "ocean animals").
-            age_range (str): The target age range. Defaults to "3-6".
-        
+            lesson_content (str): The content of the lesson.
+            lesson_name (str): The name of the lesson.
+            concepts (list[str]): List of key concepts extracted from the lesson.
+            language (str): The language to generate the introduction in. Defaults to "English".
+            use_cache (bool): Whether to read and write the introduction cache. Defaults to True.
+
         Returns:
-            str: The generated lesson content suitable for early childhood education.
+            str: A formatted introduction with summary, concepts, and example questions.
         """
+        cache_key = self._introduction_cache_key(lesson_content, lesson_name, concepts, language)
+        if not use_cache:
+            return self._fetch_lesson_introduction(lesson_content, lesson_name, concepts, language)
+
+        cached = introduction_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        return llm_flights.do(
+            ("generate_lesson_introduction", cache_key),
+            lambda: self._fetch_lesson_introduction(lesson_content, lesson_name, concepts, language, cache_key),
+        )
+
+    def _fetch_lesson_introduction(
+        self, lesson_content: str, lesson_name: str, concepts: list[str], language: str, cache_key: tuple = None
+    ) -> str:
+        """Call the API to generate an introduction, and cache it if a cache key is given."""
+        introduction = self._complete(
+            "generate_lesson_introduction",
+            self._introduction_request(lesson_content, lesson_name, concepts, language),
+        )
+        if cache_key and introduction:
+            introduction_cache.set(cache_key, introduction)
+        return introduction
+
+    def _lesson_request(self, topic: str, age_range: str) -> dict:
+        """Build the completion request generating a complete lesson."""
         system_prompt = (
             f"You are an expert educational content creator specializing in early childhood education "
             f"(ages {age_range}). Create a comprehensive, engaging lesson about '{topic}'.\n\n"
@@ -226,24 +523,306 @@ class LLMCall:
             "8. Include concrete examples from children's daily lives when possible\n\n"
             "Format the lesson as plain text without markdown. Make it ready to be used by an educational tutor."
         )
-        
+
         user_prompt = (
             f"Create a lesson about '{topic}' for children ages {age_range}. "
             f"Make it engaging, educational, and age-appropriate. "
             f"Include key concepts, interesting facts, and examples that will help children learn about {topic}."
         )
-        
+
+        messages = [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": user_prompt},
+        ]
+
+        return self._request("generate_lesson", messages, temperature=0.7)  # Creative but consistent
+
+    @metrics.instrument("llm")
+    def generate_lesson(self, topic: str, age_range: str = "3-6") -> str:
+        """
+        Generate a complete lesson content based on a topic using ChatGPT.
+
+        Args:
+            topic (str): The topic for the lesson (e.g., "dinosaurs", "space", "ocean animals").
+            age_range (str): The target age range. Defaults to "3-6".
+
+        Returns:
+            str: The generated lesson content suitable for early childhood education.
+        """
+        lesson_content = self._complete("generate_lesson", self._lesson_request(topic, age_range))
+        return lesson_content
+
+    @metrics.instrument("llm")
+    def generate_lesson_stream(self, topic: str, age_range: str = "3-6") -> Generator[str, None, None]:
+        """
+        Stream the generation of a lesson.
+
+        Args:
+            topic (str): The topic for the lesson (e.g., "dinosaurs", "space", "ocean animals").
+            age_range (str): The target age range. Defaults to "3-6".
+
+        Yields:
+            str: The raw text deltas of the lesson, roughly one per token.
+        """
+        yield from self._stream("generate_lesson", self._lesson_request(topic, age_range))
+
+    def _summary_request(self, messages: list[dict], previous_summary: str = None) -> dict:
+        """Build the completion request folding older turns into the rolling conversation summary."""
+        system_prompt = (
+            "You summarize a conversation between an educational tutor and a young child (ages 3-12). "
+            "Write at most 120 words in the language of the conversation. "
+            "Keep what the child learned, the problems they solved or struggled with, "
+            "mistakes that were corrected, the child's interests, and any open question. "
+            "Do not include greetings or filler."
+        )
+
+        transcript = "\n".join(f"{m['role'].upper()}: {m['content']}" for m in messages)
+        user_prompt = (
+            f"Previous summary:\n{previous_summary or '(none)'}\n\n"
+            f"New messages:\n{transcript}\n\n"
+            "Write the updated summary."
+        )
+
         messages = [
             {"role": "system", "content": system_prompt},
             {"role": "user", "content": user_prompt},
         ]
-        
-        response = self.client.chat.completions.create(
-            model=self.model,
-            messages=messages,
-            temperature=0.7,  # Creative but consistent
-            max_tokens=5000,  # Allow for comprehensive lesson content
-        )
-        
-        lesson_content = response.choices[0].message.content
+        return self._request("summarize_conversation", messages, temperature=0.3)
+
+    @metrics.instrument("llm")
+    def summarize_conversation(self, messages: list[dict], previous_summary: str = None) -> str:
+        """
+        Fold older conversation messages into a rolling summary.
+
+        Args:
+            messages (list[dict]): The messages to add to the summary.
+            previous_summary (str): The summary of the messages before them, if any.
+
+        Returns:
+            str: The updated summary.
+        """
+        return self._complete("summarize_conversation", self._summary_request(messages, previous_summary))
+
+
+class AsyncLLMCall(LLMCall):
+    """
+    Asynchronous variant of LLMCall, using the async methods of the backend.
+
+    Prompts, caching and parsing are shared with LLMCall; only the network
+    calls differ, so streams do not hold a worker thread while waiting for tokens.
+    """
+
+    async def _complete(self, operation: str, request: dict) -> str:
+        """Send a request to the backend of its operation, account its usage and return the reply."""
+        backend = self._route_backend(operation)
+        start = time.perf_counter()
+        try:
+            response = await backend.acomplete(request)
+        finally:
+            metrics.record_backend_call(operation, request["model"], backend.name, time.perf_counter() - start)
+        self._record_usage(operation, response.usage, request["model"])
+        return response.text
+
+    async def _stream(self, operation: str, request: dict) -> AsyncGenerator[str, None]:
+        """Stream a request from the backend of its operation, yielding the raw text deltas."""
+        backend = self._route_backend(operation)
+        start = time.perf_counter()
+        try:
+            async for chunk in backend.astream(request):
+                if chunk.usage:
+                    self._record_usage(operation, chunk.usage, request["model"])
+                if chunk.text:
+                    yield chunk.text
+        finally:
+            metrics.record_backend_call(operation, request["model"], backend.name, time.perf_counter() - start)
+
+    async def _stream_deltas(self, message: str, history: list, system_prompt: str = None) -> AsyncGenerator[str, None]:
+        """Yield the raw text deltas of a streamed tutor turn, one per chunk."""
+        async for delta in self._stream("respond", self._chat_request(message, history, system_prompt)):
+            yield delta
+
+    async def respond_deltas(
+        self,
+        message: str,
+        history: list,
+        system_prompt: str = None,
+        flush_interval: float = STREAM_FLUSH_INTERVAL,
+        flush_chars: int = STREAM_FLUSH_CHARS,
+    ) -> AsyncGenerator[str, None]:
+        """
+        Stream a response as coalesced deltas instead of the accumulated text.
+
+        Args:
+            message (str): The user's message.
+            history (list): The conversation history.
+            system_prompt (str): The system prompt.
+            flush_interval (float): Maximum number of seconds to buffer tokens.
+            flush_chars (int): Number of buffered characters that triggers a flush.
+
+        Yields:
+            str: New text since the previous yield.
+        """
+        async for delta in acoalesce_deltas(
+            self._stream_deltas(message, history, system_prompt), flush_interval, flush_chars
+        ):
+            yield delta
+
+    @metrics.instrument("llm")
+    async def respond(
+        self,
+        message: str,
+        history: list,
+        system_prompt: str = None,
+        tutor_name: str = None,
+        difficulty_level: str = "beginner",
+        cache_key: tuple = None,
+    ) -> AsyncGenerator[str, None]:
+        """
+        Generate a response to the user message using the LLM.
+
+        Args:
+            message (str): The user's message.
+            history (list): The conversation history.
+            system_prompt (str): The system prompt (optional, will be constructed if not provided).
+            tutor_name (str): The name of the tutor.
+            difficulty_level (str): The difficulty level (beginner, intermediate, advanced).
+            cache_key (tuple): Response cache key (see response_cache_key).
+
+        Yields:
+            str: The response accumulated so far.
+        """
+        response = ""
+        cached = _cached_response(cache_key)
+        if cached is not None:
+            for delta in replay_text(cached):
+                response += delta
+                yield response
+            return
+
+        async for delta in self.respond_deltas(message, history, system_prompt):
+            response += delta
+            yield response
+        if cache_key is not None and response:
+            response_cache.set(cache_key, response)
+
+    @metrics.instrument("llm")
+    async def extract_key_concepts(self, lesson_content: str, use_cache: bool = True) -> list[str]:
+        """
+        Extract key concepts from the lesson content.
+
+        Args:
+            lesson_content (str): The content of the lesson.
+            use_cache (bool): Whether to read and write the concept cache. Defaults to True.
+
+        Returns:
+            list[str]: A list of 2 to 5 key concepts from the lesson.
+        """
+        cache_key = self._concepts_cache_key(lesson_content)
+        if not use_cache:
+            return await self._fetch_key_concepts(lesson_content)
+
+        cached = concept_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        return await async_llm_flights.do(
+            ("extract_key_concepts", cache_key), lambda: self._fetch_key_concepts(lesson_content, cache_key)
+        )
+
+    async def _fetch_key_concepts(self, lesson_content: str, cache_key: str = None) -> list[str]:
+        """Call the API to extract key concepts, and cache them if a cache key is given."""
+        concepts = self._parse_concepts(
+            await self._complete("extract_key_concepts", self._concepts_request(lesson_content))
+        )
+        if cache_key and concepts:
+            concept_cache.set(cache_key, concepts)
+        return concepts
+
+    @metrics.instrument("llm")
+    async def generate_lesson_introduction(
+        self,
+        lesson_content: str,
+        lesson_name: str,
+        concepts: list[str],
+        language: str = "English",
+        use_cache: bool = True,
+    ) -> str:
+        """
+        Generate an educational introduction for the lesson.
+
+        Args:
+            lesson_content (str): The content of the lesson.
+            lesson_name (str): The name of the lesson.
+            concepts (list[str]): List of key concepts extracted from the lesson.
+            language (str): The language to generate the introduction in. Defaults to "English".
+            use_cache (bool): Whether to read and write the introduction cache. Defaults to True.
+
+        Returns:
+            str: A formatted introduction with summary, concepts, and example questions.
+        """
+        cache_key = self._introduction_cache_key(lesson_content, lesson_name, concepts, language)
+        if not use_cache:
+            return await self._fetch_lesson_introduction(lesson_content, lesson_name, concepts, language)
+
+        cached = introduction_cache.get(cache_key)
+        if cached is not None:
+            return cached
+        return await async_llm_flights.do(
+            ("generate_lesson_introduction", cache_key),
+            lambda: self._fetch_lesson_introduction(lesson_content, lesson_name, concepts, language, cache_key),
+        )
+
+    async def _fetch_lesson_introduction(
+        self, lesson_content: str, lesson_name: str, concepts: list[str], language: str, cache_key: tuple = None
+    ) -> str:
+        """Call the API to generate an introduction, and cache it if a cache key is given."""
+        introduction = await self._complete(
+            "generate_lesson_introduction",
+            self._introduction_request(lesson_content, lesson_name, concepts, language),
+        )
+        if cache_key and introduction:
+            introduction_cache.set(cache_key, introduction)
+        return introduction
+
+    @metrics.instrument("llm")
+    async def generate_lesson(self, topic: str, age_range: str = "3-6") -> str:
+        """
+        Generate a complete lesson content based on a topic using ChatGPT.
+
+        Args:
+            topic (str): The topic for the lesson (e.g., "dinosaurs", "space", "ocean animals").
+            age_range (str): The target age range. Defaults to "3-6".
+
+        Returns:
+            str: The generated lesson content suitable for early childhood education.
+        """
+        lesson_content = await self._complete("generate_lesson", self._lesson_request(topic, age_range))
         return lesson_content
+
+    @metrics.instrument("llm")
+    async def generate_lesson_stream(self, topic: str, age_range: str = "3-6") -> AsyncGenerator[str, None]:
+        """
+        Stream the generation of a lesson.
+
+        Args:
+            topic (str): The topic for the lesson (e.g., "dinosaurs", "space", "ocean animals").
+            age_range (str): The target age range. Defaults to "3-6".
+
+        Yields:
+            str: The raw text deltas of the lesson, roughly one per token.
+        """
+        async for delta in self._stream("generate_lesson", self._lesson_request(topic, age_range)):
+            yield delta
+
+    @metrics.instrument("llm")
+    async def summarize_conversation(self, messages: list[dict], previous_summary: str = None) -> str:
+        """
+        Fold older conversation messages into a rolling summary.
+
+        Args:
+            messages (list[dict]): The messages to add to the summary.
+            previous_summary (str): The summary of the messages before them, if any.
+
+        Returns:
+            str: The updated summary.
+        """
+        return await self._complete("summarize_conversation", self._summary_request(messages, previous_summary))
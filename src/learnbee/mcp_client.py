@@ -1,26 +1,220 @@
+from __future__ import annotations
+
 import asyncio
+import contextlib
+import itertools
 import json
 import os
+import re
+from datetime import timedelta
 
 from mcp import ClientSession
 from mcp.client.sse import sse_client
+from mcp.client.streamable_http import streamablehttp_client
+from mcp.shared.exceptions import McpError
 
 MCP_SERVER_URL = os.environ.get(
     "MCP_SERVER_URL", "http://localhost:7860/gradio_api/mcp/sse"
 )
+# "sse", "streamable-http", or "auto" to pick SSE for URLs ending in /sse and streamable HTTP otherwise
+MCP_TRANSPORT = os.environ.get("MCP_TRANSPORT", "auto")
+MCP_TRANSPORTS = ("sse", "streamable-http")
+# Number of initialized sessions kept open; each one can carry many concurrent calls
+MCP_POOL_SIZE = int(os.environ.get("MCP_POOL_SIZE", "2"))
+# Seconds to wait for a tool result (lesson creation can take minutes)
+MCP_CALL_TIMEOUT = float(os.environ.get("MCP_CALL_TIMEOUT", "600"))
+# Tools without side effects, which can safely be sent again when a call fails. A failed
+# create_lessons call may already be running on the server, so it is never retried.
+MCP_IDEMPOTENT_TOOLS = frozenset(
+    {
+        "get_lesson_list",
+        "get_lesson_content",
+        "get_lesson_chunk",
+        "get_lesson_introduction",
+        "search_lessons",
+        "get_usage_report",
+    }
+)
+
+
+# Tools report failures as text, e.g. "Error: ..." or "Error generating introduction: ..."
+_ERROR_REPLY_RE = re.compile(r"Error(?: \w+)*:")
+
+
+class MCPToolError(ValueError):
+    """Raised when the server reports an error for a tool call."""
+
+
+def resolve_transport(url: str, transport: str = "auto") -> str:
+    """
+    Return the transport to use for a server URL.
+
+    Args:
+        url (str): The MCP server URL.
+        transport (str): "sse", "streamable-http" or "auto".
+
+    Returns:
+        str: "sse" or "streamable-http".
+    """
+    if transport == "auto":
+        return "sse" if url.rstrip("/").endswith("/sse") else "streamable-http"
+    if transport not in MCP_TRANSPORTS:
+        raise ValueError(f"Unknown MCP transport '{transport}', expected one of {MCP_TRANSPORTS} or 'auto'")
+    return transport
+
+
+class _Connection:
+    """
+    One initialized MCP session, kept open by a background task.
+
+    The transport and session context managers must be entered and exited
+    by the same task, so a dedicated task owns them until close() is called
+    or the connection drops.
+    """
+
+    def __init__(self, url: str, transport: str):
+        self.url = url
+        self.transport = transport
+        self.session: ClientSession | None = None
+        self._ready = asyncio.Event()
+        self._closing = asyncio.Event()
+        self._error: BaseException | None = None
+        self._task: asyncio.Task | None = None
+
+    @property
+    def alive(self) -> bool:
+        return self.session is not None and self._task is not None and not self._task.done()
+
+    def _transport(self):
+        """Return the transport context manager yielding the read and write streams first."""
+        if self.transport == "sse":
+            return sse_client(self.url)
+        # Also yields a session id getter, which is not needed here
+        return streamablehttp_client(self.url)
+
+    async def start(self):
+        """Connect and initialize the session."""
+        self._task = asyncio.create_task(self._run())
+        await self._ready.wait()
+        if self.session is None:
+            raise ConnectionError(f"Could not connect to the MCP server at {self.url}: {self._error}")
+
+    async def _run(self):
+        try:
+            async with self._transport() as streams:
+                async with ClientSession(streams[0], streams[1]) as session:
+                    await session.initialize()
+                    self.session = session
+                    self._ready.set()
+                    await self._closing.wait()
+        except Exception as e:
+            self._error = e
+        finally:
+            self.session = None
+            self._ready.set()
+
+    async def close(self):
+        """Close the session and its transport."""
+        self._closing.set()
+        if self._task is not None:
+            with contextlib.suppress(Exception, asyncio.CancelledError):
+                await self._task
 
 
 class MCPClient:
+    """
+    Client for the Learnbee MCP server, over SSE or streamable HTTP.
+
+    Keeps a small pool of initialized sessions open instead of connecting for
+    every call. Calls are spread over the pool and may run concurrently. A
+    read-only call that fails because its connection dropped is retried once
+    on a fresh connection; other calls are not, since the server may already
+    be running them. Use it as an async context manager, or call close() when done.
+    """
 
-    async def with_session(self, func):
+    def __init__(
+        self,
+        url: str = None,
+        pool_size: int = MCP_POOL_SIZE,
+        call_timeout: float = MCP_CALL_TIMEOUT,
+        transport: str = None,
+    ):
         """
-        Create a session with the MCP server and execute the provided function.
-        - See: https://modelcontextprotocol.io/docs/concepts/transports#server-sent-events-sse
+        Initialize the client. Connections are opened lazily on the first call.
+
+        Args:
+            url (str): The MCP server URL. Defaults to MCP_SERVER_URL.
+            pool_size (int): Number of sessions to keep open.
+            call_timeout (float): Seconds to wait for a tool result.
+            transport (str): "sse", "streamable-http" or "auto". Defaults to MCP_TRANSPORT.
         """
-        async with sse_client(MCP_SERVER_URL) as streams:
-            async with ClientSession(streams[0], streams[1]) as session:
-                await session.initialize()
-                return await func(session)
+        self.url = url or MCP_SERVER_URL
+        self.transport = resolve_transport(self.url, transport or MCP_TRANSPORT)
+        self.pool_size = max(1, pool_size)
+        self.call_timeout = timedelta(seconds=call_timeout)
+        self._connections: list[_Connection | None] = [None] * self.pool_size
+        self._locks = [asyncio.Lock() for _ in range(self.pool_size)]
+        self._next = itertools.count()
+        self.reconnects = 0
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    def _new_connection(self) -> _Connection:
+        return _Connection(self.url, self.transport)
+
+    async def _connection(self, slot: int) -> _Connection:
+        """Return the open connection of a pool slot, connecting it if needed."""
+        connection = self._connections[slot]
+        if connection is not None and connection.alive:
+            return connection
+        async with self._locks[slot]:
+            connection = self._connections[slot]
+            if connection is None or not connection.alive:
+                if connection is not None:
+                    self.reconnects += 1
+                    await connection.close()
+                connection = self._new_connection()
+                await connection.start()
+                self._connections[slot] = connection
+            return connection
+
+    async def _discard(self, slot: int, connection: _Connection):
+        async with self._locks[slot]:
+            if self._connections[slot] is connection:
+                self._connections[slot] = None
+        await connection.close()
+
+    async def with_session(self, func, retry: bool = True):
+        """
+        Run ``func(session)`` on a pooled session.
+
+        A call that fails without an answer from the server discards its
+        connection. If ``retry`` is True, which is only safe when ``func`` has
+        no side effects, it is then run once more on a fresh connection.
+        - See: https://modelcontextprotocol.io/docs/concepts/transports
+        """
+        slot = next(self._next) % self.pool_size
+        for attempt in range(2 if retry else 1):
+            connection = await self._connection(slot)
+            try:
+                return await func(connection.session)
+            except (McpError, MCPToolError):
+                # The server answered: the connection is fine
+                raise
+            except Exception:
+                await self._discard(slot, connection)
+                if attempt or not retry:
+                    raise
+
+    async def close(self):
+        """Close all pooled sessions."""
+        connections = [c for c in self._connections if c is not None]
+        self._connections = [None] * self.pool_size
+        await asyncio.gather(*(c.close() for c in connections))
 
     async def list(self):
         """List available tools from the MCP server."""
@@ -30,51 +224,102 @@ class MCPClient:
 
         return await self.with_session(_list)
 
-    async def get_book_list(self) -> str:
-        """Get the list of books available on the MCP server."""
-        async def _get_book_list(session):
-            tool_name = "get_book_list"
-            response = await session.call_tool(tool_name)
-            if response.isError:
-                raise ValueError(f"Error calling tool: {tool_name}")
-            return response.content[0].text
+    async def call_tool(self, tool_name: str, arguments: dict = None) -> str:
+        """
+        Call a tool and return its text result.
+
+        Args:
+            tool_name (str): The name of the tool.
+            arguments (dict): The tool arguments.
 
-        return await self.with_session(_get_book_list)
+        Returns:
+            str: The text content of the result.
 
-    async def get_book_content(self, book_name: str, max_length: int = 0) -> str:
-        """Get the content of a book from the MCP server."""
-        async def _get_book_content(session):
-            tool_name = "get_book_content"
-            input_data = {"book_name": book_name, "max_length": max_length}
-            response = await session.call_tool(tool_name, input_data)
+        Raises:
+            MCPToolError: If the server reports an error for the call.
+        """
+        async def _call(session):
+            response = await session.call_tool(tool_name, arguments or {}, read_timeout_seconds=self.call_timeout)
+            text = "".join(getattr(item, "text", "") for item in response.content)
             if response.isError:
-                raise ValueError(f"Error calling tool: {tool_name}")
-            return response.content[0].text
+                raise MCPToolError(f"Error calling tool {tool_name}: {text}")
+            return text
+
+        return await self.with_session(_call, retry=tool_name in MCP_IDEMPOTENT_TOOLS)
+
+    async def _call_checked(self, tool_name: str, arguments: dict = None) -> str:
+        """Call a tool that reports failures as "Error: ..." text, raising MCPToolError for them."""
+        text = await self.call_tool(tool_name, arguments)
+        # get_lesson_list returns its error JSON-encoded
+        message = json.loads(text) if text.startswith('"') else text
+        if isinstance(message, str) and _ERROR_REPLY_RE.match(message):
+            raise MCPToolError(message)
+        return text
+
+    async def get_lesson_list(self) -> list[str]:
+        """Get the list of lessons available on the MCP server."""
+        return json.loads(await self._call_checked("get_lesson_list"))
+
+    async def get_lesson_content(self, lesson_name: str, max_length: int = 0) -> str:
+        """Get the content of a lesson, or its first ``max_length`` characters."""
+        return await self._call_checked("get_lesson_content", {"lesson_name": lesson_name, "max_length": max_length})
+
+    async def get_lesson_chunk(self, lesson_name: str, offset: int = 0, length: int = 4000) -> dict:
+        """Get part of a lesson; pass the returned next_cursor as the next offset."""
+        return json.loads(
+            await self._call_checked(
+                "get_lesson_chunk", {"lesson_name": lesson_name, "offset": offset, "length": length}
+            )
+        )
 
-        return await self.with_session(_get_book_content)
+    async def get_lesson_introduction(self, lesson_name: str, language: str = "English") -> str:
+        """Get the introduction of a lesson in a language."""
+        return await self._call_checked("get_lesson_introduction", {"lesson_name": lesson_name, "language": language})
+
+    async def search_lessons(self, query: str, top_k: int = 5) -> list[dict]:
+        """Search the sections of all lessons."""
+        return json.loads(await self.call_tool("search_lessons", {"query": query, "top_k": top_k}))
+
+    async def create_lessons(self, topics: list[str], age_range: str = "3-6", max_workers: int = 8) -> list[dict]:
+        """Create one lesson per topic; returns one result per topic."""
+        return json.loads(
+            await self.call_tool("create_lessons", {"topics": topics, "age_range": age_range, "max_workers": max_workers})
+        )
+
+    async def get_usage_report(
+        self, group_by: str = "lesson", session: str = "", lesson_name: str = "", day: str = "", limit: int = 20
+    ) -> list[dict]:
+        """Get token usage and cost totals, grouped by comma-separated columns."""
+        return json.loads(
+            await self._call_checked(
+                "get_usage_report",
+                {"group_by": group_by, "session": session, "lesson_name": lesson_name, "day": day, "limit": limit},
+            )
+        )
 
 
 async def main():
-    mcp_client = MCPClient()
-
-    tools = await mcp_client.list()
-    print("Available tools:")
-    print("=" * 20)
-    for tool in tools.tools:
-        print(f"Name: {tool.name}")
-        print(f"Description: {tool.description}")
-        print(f"Input Schema: {tool.inputSchema}")
-        print(f"Annotations: {tool.annotations}")
-        print("-" * 20)
-
-    book_list_str = await mcp_client.get_book_list()
-    book_list = json.loads(book_list_str)
-    print(f"Number of books available: {len(book_list)}")
-
-    book_name = book_list[0]
-    book_content = await mcp_client.get_book_content(book_name, max_length=100)
-    print(f"Content of the book '{book_name}':")
-    print(book_content + "...")
+    async with MCPClient() as mcp_client:
+        tools = await mcp_client.list()
+        print("Available tools:")
+        print("=" * 20)
+        for tool in tools.tools:
+            print(f"Name: {tool.name}")
+            print(f"Description: {tool.description}")
+            print(f"Input Schema: {tool.inputSchema}")
+            print(f"Annotations: {tool.annotations}")
+            print("-" * 20)
+
+        lesson_list = await mcp_client.get_lesson_list()
+        print(f"Number of lessons available: {len(lesson_list)}")
+
+        # Calls share the pooled sessions and run concurrently
+        previews = await asyncio.gather(
+            *(mcp_client.get_lesson_content(name, max_length=100) for name in lesson_list)
+        )
+        for lesson_name, lesson_content in zip(lesson_list, previews):
+            print(f"Content of the lesson '{lesson_name}':")
+            print(lesson_content + "...")
 
 
 if __name__ == "__main__":
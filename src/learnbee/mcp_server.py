@@ -1,9 +1,37 @@
 import json
-from pathlib import Path
+import os
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from typing import AsyncGenerator
 
-from learnbee.llm_call import LLMCall
+from learnbee.constants import (
+    LESSON_CHUNK_DEFAULT_LENGTH,
+    LESSON_CHUNK_MAX_LENGTH,
+    LESSON_CREATION_MAX_WORKERS,
+    LESSON_STREAM_FLUSH_CHARS,
+    LESSON_STREAM_FLUSH_INTERVAL,
+)
+from learnbee.lesson_artifacts import load_lesson_artifacts
+from learnbee.lesson_catalog import lesson_catalog
+from learnbee import metrics, retrieval
+from learnbee.llm_call import AsyncLLMCall, LLMCall
+from learnbee.routing import route_model
+from learnbee.streaming import acoalesce_deltas
+from learnbee.token_budget import fit_lesson
+from learnbee.usage import usage_ledger
 
 
+def _is_error_reply(result) -> bool:
+    """Tools report failures as "Error: ..." strings (possibly JSON-encoded) instead of raising."""
+    return isinstance(result, str) and result.lstrip('"').startswith("Error")
+
+
+# Decorates the MCP tools with request, latency and error metrics
+mcp_tool_metrics = metrics.instrument("mcp", failed=_is_error_reply)
+
+
+@mcp_tool_metrics
 def get_lesson_list() -> str:
     """
     Get list of available lessons.
@@ -11,18 +39,13 @@ def get_lesson_list() -> str:
     Returns:
         str: JSON string containing the list of lesson names.
     """
-    lessons_dir = Path("./lessons")
-    if not lessons_dir.exists():
+    if not lesson_catalog.available:
         return json.dumps("Error: Lessons directory not found.")
 
-    text_files = []
-    for file in lessons_dir.iterdir():
-        if file.is_file() and file.suffix.lower() == ".txt":
-            text_files.append(file.stem)
-
-    return json.dumps(sorted(text_files))
+    return json.dumps(lesson_catalog.list_names())
 
 
+@mcp_tool_metrics
 def get_lesson_content(lesson_name: str, max_length: int = 0) -> str:
     """
     Get the content of a lesson.
@@ -33,13 +56,19 @@ def get_lesson_content(lesson_name: str, max_length: int = 0) -> str:
     Returns:
         str: The content of the lesson, or an error message if the lesson is not found.
     """
-    lessons_dir = Path("./lessons")
-    lesson_file = lessons_dir / f"{lesson_name}.txt"
-    if not lesson_file.exists():
-        return f"Error: Lesson '{lesson_name}' not found."
+    return read_lesson(lesson_name, max_length)
+
 
-    with open(lesson_file, "r", encoding="utf-8") as f:
-        content = f.read()
+def read_lesson(lesson_name: str, max_length: int = 0) -> str:
+    """
+    Uninstrumented get_lesson_content, for callers that are not MCP clients.
+
+    Other tools and the UI handlers use it, so their calls are not counted as
+    MCP tool requests as well.
+    """
+    content = lesson_catalog.get_content(lesson_name)
+    if content is None:
+        return f"Error: Lesson '{lesson_name}' not found."
 
     if not max_length:
         return content
@@ -47,39 +76,79 @@ def get_lesson_content(lesson_name: str, max_length: int = 0) -> str:
         return content[:max_length]
 
 
-def get_lesson_introduction(lesson_name: str) -> str:
+@mcp_tool_metrics
+def get_lesson_chunk(lesson_name: str, offset: int = 0, length: int = LESSON_CHUNK_DEFAULT_LENGTH) -> str:
+    """
+    Get part of a lesson, for paging through long lessons.
+    Start with offset 0 and pass the returned next_cursor as the next offset until it is null.
+
+    Args:
+        lesson_name (str): The name of the lesson (without .txt extension).
+        offset (int): Byte offset to start reading at. Defaults to 0.
+        length (int): Maximum number of bytes to return (at most 65536). Defaults to 4000.
+
+    Returns:
+        str: JSON object with "lesson", "offset", "next_cursor", "total_size" and "content" keys,
+        or an error message if the lesson is not found.
+    """
+    length = min(max(int(length), 1), LESSON_CHUNK_MAX_LENGTH)
+    result = lesson_catalog.read_range(lesson_name, int(offset), length)
+    if result is None:
+        return f"Error: Lesson '{lesson_name}' not found."
+
+    content, start, end, total_size = result
+    return json.dumps(
+        {
+            "lesson": lesson_name,
+            "offset": start,
+            "next_cursor": end if end < total_size else None,
+            "total_size": total_size,
+            "content": content,
+        },
+        ensure_ascii=False,
+    )
+
+
+@mcp_tool_metrics
+def get_lesson_introduction(lesson_name: str, language: str = "English") -> str:
     """
     Get an educational introduction for a lesson including summary, key concepts, and example questions.
     This function serves as an MCP tool to help guide children with their first message.
 
     Args:
         lesson_name (str): The name of the lesson (without .txt extension).
+        language (str): The language to write the introduction in. Defaults to "English".
 
     Returns:
         str: A formatted introduction with summary, concepts, and example questions, or an error message.
     """
-    lessons_dir = Path("./lessons")
-    lesson_file = lessons_dir / f"{lesson_name}.txt"
-    if not lesson_file.exists():
+    if not lesson_catalog.exists(lesson_name):
         return f"Error: Lesson '{lesson_name}' not found."
 
-    # Get lesson content
-    lesson_content = get_lesson_content(lesson_name, max_length=50000)
+    # Get lesson content, fitted into the lesson token budget of the tutor model
+    # (as in the UI, so precomputed artifacts and caches match)
+    lesson_content = fit_lesson(read_lesson(lesson_name), route_model("respond"))
     
     if lesson_content.startswith("Error:"):
         return lesson_content
 
+    # Serve precomputed artifacts when they match the current lesson content
+    artifacts = load_lesson_artifacts(lesson_name, lesson_content, lesson_catalog.lessons_dir) or {}
+    introduction = artifacts.get("introductions", {}).get(language)
+    if introduction:
+        return introduction
+
     try:
         # Extract key concepts
-        call_llm = LLMCall()
-        concepts = call_llm.extract_key_concepts(lesson_content)
+        call_llm = LLMCall(usage_labels={"lesson": lesson_name})
+        concepts = artifacts.get("concepts") or call_llm.extract_key_concepts(lesson_content)
         
         if not concepts:
             return f"Error: Could not extract key concepts from lesson '{lesson_name}'."
         
         # Generate introduction
         introduction = call_llm.generate_lesson_introduction(
-            lesson_content, lesson_name, concepts
+            lesson_content, lesson_name, concepts, language=language
         )
         
         return introduction
@@ -87,54 +156,357 @@ def get_lesson_introduction(lesson_name: str) -> str:
         return f"Error generating introduction: {str(e)}"
 
 
-def create_lesson(topic: str, lesson_name: str = None, age_range: str = "3-6") -> str:
+@mcp_tool_metrics
+def search_lessons(query: str, top_k: int = 5) -> str:
     """
-    Create a new lesson by generating content with ChatGPT based on a topic.
-    The lesson will be saved to the lessons directory and can be used immediately.
-    
+    Search the sections of all lessons for a question or keywords.
+    Uses a local BM25 index, so no network call is made.
+
     Args:
-        topic (str): The topic for the lesson (e.g., "dinosaurs", "space", "ocean animals").
-        lesson_name (str): Optional name for the lesson file. If not provided, will be generated from topic.
-        age_range (str): The target age range. Defaults to "3-6".
-    
+        query (str): The question or keywords to search for.
+        top_k (int): The maximum number of sections to return. Defaults to 5.
+
     Returns:
-        str: Success message with the lesson name, or an error message if creation fails.
+        str: JSON list of results with "lesson", "section" and "score" keys, best first.
     """
-    lessons_dir = Path("./lessons")
+    return json.dumps(retrieval.search_lessons(query, int(top_k)), ensure_ascii=False)
+
+
+@mcp_tool_metrics
+def get_usage_report(
+    group_by: str = "lesson", session: str = "", lesson_name: str = "", day: str = "", limit: int = 20
+) -> str:
+    """
+    Report LLM token usage and estimated cost, to find the most expensive lessons, tutors or sessions.
+
+    Args:
+        group_by (str): Comma-separated columns to group by, among day, session, lesson, tutor,
+            difficulty, operation and model. Defaults to "lesson". Empty for a grand total.
+        session (str): Only include this UI session. Defaults to all sessions.
+        lesson_name (str): Only include this lesson. Defaults to all lessons.
+        day (str): Only include this UTC day (YYYY-MM-DD). Defaults to all days.
+        limit (int): Maximum number of rows, most expensive first. Defaults to 20.
+
+    Returns:
+        str: JSON list of rows with the group columns plus "calls", "prompt_tokens",
+        "cached_tokens", "completion_tokens" and "cost_usd", or an error message.
+    """
+    columns = tuple(column.strip() for column in group_by.split(",") if column.strip())
+    try:
+        rows = usage_ledger.query(
+            columns, {"session": session, "lesson": lesson_name, "day": day}, limit=int(limit)
+        )
+    except ValueError as e:
+        return f"Error: {e}"
+    return json.dumps(rows, ensure_ascii=False)
+
+
+def lesson_name_from_topic(topic: str) -> str:
+    """
+    Derive a lesson file name from a topic.
+
+    Args:
+        topic (str): The topic for the lesson.
+
+    Returns:
+        str: A lowercase name containing only letters, digits, underscores and hyphens.
+    """
+    # Convert topic to a valid filename (lowercase, replace spaces with underscores)
+    lesson_name = topic.lower().strip().replace(" ", "_").replace("/", "_").replace("\\", "_")
+    # Remove special characters
+    return "".join(c for c in lesson_name if c.isalnum() or c in ("_", "-"))
+
+
+def _prepare_lesson_file(topic: str, lesson_name: str = None):
+    """Resolve the lesson name and file path for a new lesson."""
+    lessons_dir = lesson_catalog.lessons_dir
     
     # Create lessons directory if it doesn't exist
     lessons_dir.mkdir(exist_ok=True)
     
     # Generate lesson name from topic if not provided
     if not lesson_name:
-        # Convert topic to a valid filename (lowercase, replace spaces with underscores)
-        lesson_name = topic.lower().strip().replace(" ", "_").replace("/", "_").replace("\\", "_")
-        # Remove special characters
-        lesson_name = "".join(c for c in lesson_name if c.isalnum() or c in ("_", "-"))
+        lesson_name = lesson_name_from_topic(topic)
     
     # Remove .txt extension if present
     if lesson_name.endswith(".txt"):
         lesson_name = lesson_name[:-4]
     
-    lesson_file = lessons_dir / f"{lesson_name}.txt"
-    
+    return lesson_name, lessons_dir / f"{lesson_name}.txt"
+
+
+def _open_temp_lesson(lesson_name: str, lesson_file):
+    """
+    Open a hidden temporary file next to the lesson file.
+
+    The catalog only lists ``.txt`` files, so a lesson is never visible
+    before it is complete and published by _publish_lesson. The file gets the
+    same permissions as a plain open() (0666 minus the umask), since
+    publishing keeps them.
+    """
+    tmp_path = str(lesson_file.parent / f".{lesson_name}.{uuid.uuid4().hex}.tmp")
+    fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_EXCL, 0o666)
+    return os.fdopen(fd, "w", encoding="utf-8"), tmp_path
+
+
+def _discard_temp_lesson(tmp_path: str):
+    try:
+        os.remove(tmp_path)
+    except FileNotFoundError:
+        pass
+
+
+def _publish_lesson(lesson_name: str, lesson_file, tmp_path: str, lesson_content: str) -> bool:
+    """
+    Move a completed temporary file into place, unless the lesson already exists, and register it.
+
+    A hard link is created and the temporary file removed, which fails instead
+    of overwriting when another process published the same lesson first. On
+    filesystems without hard links the file is renamed instead, after checking
+    that the lesson does not exist: that guarantee is then not atomic, and a
+    lesson published by another process in between is overwritten.
+
+    Returns:
+        bool: False if a lesson with this name already exists.
+    """
+    try:
+        os.link(tmp_path, lesson_file)
+    except FileExistsError:
+        return False
+    except OSError:
+        # Some filesystems do not support hard links; fall back to a (non-exclusive) rename
+        if lesson_file.exists():
+            return False
+        os.replace(tmp_path, lesson_file)
+    finally:
+        _discard_temp_lesson(tmp_path)
+    lesson_catalog.register(lesson_name, lesson_content)
+    return True
+
+
+def _save_lesson(lesson_name: str, lesson_file, lesson_content: str) -> bool:
+    """Atomically write a generated lesson to disk and register it in the catalog."""
+    f, tmp_path = _open_temp_lesson(lesson_name, lesson_file)
+    try:
+        with f:
+            f.write(lesson_content)
+    except BaseException:
+        _discard_temp_lesson(tmp_path)
+        raise
+    return _publish_lesson(lesson_name, lesson_file, tmp_path, lesson_content)
+
+
+# Lessons being generated in this process, so concurrent requests for the same name
+# fail fast instead of paying for a second generation
+_lessons_in_progress = set()
+_lessons_in_progress_lock = threading.Lock()
+
+
+def _reserve_lesson_name(lesson_name: str) -> bool:
+    """Claim a lesson name for generation; returns False if it is already being generated."""
+    with _lessons_in_progress_lock:
+        if lesson_name in _lessons_in_progress:
+            return False
+        _lessons_in_progress.add(lesson_name)
+        return True
+
+
+def _release_lesson_name(lesson_name: str):
+    with _lessons_in_progress_lock:
+        _lessons_in_progress.discard(lesson_name)
+
+
+def _lesson_unavailable_message(lesson_name: str, lesson_file) -> str | None:
+    """Reserve a lesson name, or return the error message explaining why it cannot be created."""
+    if not lesson_name:
+        return "Error: Invalid lesson name. It needs at least one letter or digit."
     # Check if lesson already exists
     if lesson_file.exists():
-        return f"Error: A lesson named '{lesson_name}' already exists. Please choose a different name."
+        return _lesson_exists_message(lesson_name)
+    if not _reserve_lesson_name(lesson_name):
+        return f"Error: A lesson named '{lesson_name}' is already being created. Please wait for it to finish."
+    return None
+
+
+def _invalid_topic_message(topic: str) -> str:
+    return f"Error: Invalid topic '{topic}'. The lesson name needs at least one letter or digit."
+
+
+def _lesson_exists_message(lesson_name: str) -> str:
+    return f"Error: A lesson named '{lesson_name}' already exists. Please choose a different name."
+
+
+def _lesson_created_message(lesson_name: str, topic: str) -> str:
+    return f"✅ Successfully created lesson '{lesson_name}' about '{topic}'! The lesson is now available in the lesson list and ready to use with the tutor."
+
+
+@mcp_tool_metrics
+def create_lesson(topic: str, lesson_name: str = None, age_range: str = "3-6") -> str:
+    """
+    Create a new lesson by generating content with ChatGPT based on a topic.
+    The lesson will be saved to the lessons directory and can be used immediately.
+    
+    Args:
+        topic (str): The topic for the lesson (e.g., "dinosaurs", "space", "ocean animals").
+        lesson_name (str): Optional name for the lesson file. If not provided, will be generated from topic.
+        age_range (str): The target age range. Defaults to "3-6".
+    
+    Returns:
+        str: Success message with the lesson name, or an error message if creation fails.
+    """
+    return _create_lesson(topic, lesson_name, age_range)
+
+
+def _create_lesson(topic: str, lesson_name: str = None, age_range: str = "3-6") -> str:
+    """Uninstrumented create_lesson, used by create_lessons so each lesson is not counted as a tool request."""
+    lesson_name, lesson_file = _prepare_lesson_file(topic, lesson_name)
+    
+    error = _lesson_unavailable_message(lesson_name, lesson_file)
+    if error:
+        return error
     
     try:
         # Generate lesson content using LLM
-        call_llm = LLMCall()
+        call_llm = LLMCall(usage_labels={"lesson": lesson_name})
         lesson_content = call_llm.generate_lesson(topic, age_range)
         
         # Save lesson to file
-        with open(lesson_file, "w", encoding="utf-8") as f:
-            f.write(lesson_content)
+        if not _save_lesson(lesson_name, lesson_file, lesson_content):
+            return _lesson_exists_message(lesson_name)
         
-        return f"✅ Successfully created lesson '{lesson_name}' about '{topic}'! The lesson is now available in the lesson list and ready to use with the tutor."
+        return _lesson_created_message(lesson_name, topic)
     
     except Exception as e:
         return f"Error creating lesson: {str(e)}"
+    finally:
+        _release_lesson_name(lesson_name)
+
+
+async def stream_lesson_async(
+    topic: str, lesson_name: str = None, age_range: str = "3-6"
+) -> AsyncGenerator[tuple[str, int, str | None], None]:
+    """
+    Create a new lesson, streaming its content while it is generated.
+
+    The lesson is written incrementally to a hidden temporary file and published
+    into the lessons directory only once complete, so an interrupted generation
+    never leaves a partial lesson behind. This is the UI's creation stream, not
+    an MCP tool; its metrics are those of the create_new_lesson handler.
+
+    Args:
+        topic (str): The topic for the lesson (e.g., "dinosaurs", "space", "ocean animals").
+        lesson_name (str): Optional name for the lesson file. If not provided, will be generated from topic.
+        age_range (str): The target age range. Defaults to "3-6".
+
+    Yields:
+        tuple[str, int, str | None]: The content generated so far, the number of tokens
+        received, and None until the last item, which carries the same message as create_lesson.
+    """
+    lesson_name, lesson_file = _prepare_lesson_file(topic, lesson_name)
+
+    error = _lesson_unavailable_message(lesson_name, lesson_file)
+    if error:
+        yield "", 0, error
+        return
+
+    tokens = 0
+    lesson_content = ""
+    call_llm = AsyncLLMCall(usage_labels={"lesson": lesson_name})
+
+    async def _counted_deltas():
+        nonlocal tokens
+        async for delta in call_llm.generate_lesson_stream(topic, age_range):
+            tokens += 1
+            yield delta
+
+    try:
+        f, tmp_path = _open_temp_lesson(lesson_name, lesson_file)
+        try:
+            with f:
+                async for text in acoalesce_deltas(
+                    _counted_deltas(), LESSON_STREAM_FLUSH_INTERVAL, LESSON_STREAM_FLUSH_CHARS
+                ):
+                    f.write(text)
+                    f.flush()
+                    lesson_content += text
+                    yield lesson_content, tokens, None
+
+            if not lesson_content.strip():
+                raise ValueError("The model returned an empty lesson.")
+        except BaseException:
+            # Failed, cancelled or closed mid-stream
+            _discard_temp_lesson(tmp_path)
+            raise
+
+        if _publish_lesson(lesson_name, lesson_file, tmp_path, lesson_content):
+            message = _lesson_created_message(lesson_name, topic)
+        else:
+            message = _lesson_exists_message(lesson_name)
+    except Exception as e:
+        message = f"Error creating lesson: {str(e)}"
+    finally:
+        _release_lesson_name(lesson_name)
+
+    yield lesson_content, tokens, message
+
+
+def _plan_bulk_lessons(topics: list[str]) -> list[tuple[str, str | None, str | None]]:
+    """
+    Pair each topic with its lesson name, or with the error explaining why it is skipped.
+
+    Topics without any usable character (e.g. empty or "???") and topics
+    repeating an earlier lesson name of the batch get a None lesson name.
+    """
+    seen = set()
+    plan = []
+    for topic in topics:
+        topic = str(topic).strip()
+        lesson_name = lesson_name_from_topic(topic)
+        if not lesson_name:
+            plan.append((topic, None, _invalid_topic_message(topic)))
+        elif lesson_name in seen:
+            plan.append((topic, None, f"Error: Topic '{topic}' duplicates lesson '{lesson_name}' of this batch."))
+        else:
+            seen.add(lesson_name)
+            plan.append((topic, lesson_name, None))
+    return plan
+
+
+def _bulk_result(topic: str, lesson_name: str | None, message: str) -> dict:
+    return {
+        "topic": topic,
+        "lesson_name": lesson_name,
+        "status": "created" if message.startswith("✅") else "error",
+        "message": message,
+    }
+
+
+@mcp_tool_metrics
+def create_lessons(topics: list[str], age_range: str = "3-6", max_workers: int = LESSON_CREATION_MAX_WORKERS) -> str:
+    """
+    Create several lessons at once, e.g. a whole curriculum.
+    Lessons are generated concurrently; a failing topic does not stop the others.
+
+    Args:
+        topics (list[str]): The topics to create lessons for. Lesson names are derived from the topics.
+        age_range (str): The target age range. Defaults to "3-6".
+        max_workers (int): Maximum number of lessons generated at the same time. Defaults to 8.
+
+    Returns:
+        str: JSON list with one result per topic, in order, with "topic", "lesson_name",
+        "status" ("created" or "error") and "message" keys.
+    """
+    plan = _plan_bulk_lessons(topics)
+    with ThreadPoolExecutor(max_workers=max(1, int(max_workers))) as executor:
+        futures = [
+            executor.submit(_create_lesson, topic, lesson_name, age_range) if lesson_name else None
+            for topic, lesson_name, _ in plan
+        ]
+        results = [
+            _bulk_result(topic, lesson_name, future.result() if future else error)
+            for (topic, lesson_name, error), future in zip(plan, futures)
+        ]
+    return json.dumps(results, ensure_ascii=False)
 
 
 if __name__ == "__main__":
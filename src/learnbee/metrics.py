@@ -0,0 +1,365 @@
+"""
+Process-wide metrics for LLM calls, UI handlers and MCP tools.
+
+Metrics are kept in memory and rendered in the Prometheus text exposition
+format by render_metrics(), which app.py serves on /metrics.
+"""
+
+import asyncio
+import functools
+import inspect
+import math
+import threading
+import time
+from typing import Callable, Iterable
+
+from learnbee.constants import METRICS_LATENCY_BUCKETS
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _format_labels(labels: dict) -> str:
+    if not labels:
+        return ""
+    return "{" + ",".join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == math.inf:
+        return "+Inf"
+    return repr(float(value)) if not float(value).is_integer() else str(int(value))
+
+
+class _Metric:
+    """Base class of the labelled metrics."""
+
+    type = ""
+
+    def __init__(self, name: str, documentation: str, labelnames: tuple[str, ...] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._lock = threading.Lock()
+        self._values: dict[tuple, object] = {}
+
+    def _key(self, labels: dict) -> tuple:
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def samples(self) -> Iterable[tuple[str, dict, float]]:
+        """Yield (sample name, labels, value) tuples."""
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    """A value that only goes up."""
+
+    type = "counter"
+
+    def inc(self, amount: float = 1.0, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0.0) + amount
+
+    def samples(self):
+        with self._lock:
+            items = list(self._values.items())
+        for key, value in items:
+            yield self.name, dict(zip(self.labelnames, key)), value
+
+
+class Gauge(Counter):
+    """A value that goes up and down."""
+
+    type = "gauge"
+
+    def dec(self, amount: float = 1.0, **labels):
+        self.inc(-amount, **labels)
+
+    def set(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    """Distribution of observed values over fixed buckets."""
+
+    type = "histogram"
+
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: tuple[str, ...] = (),
+        buckets: tuple[float, ...] = METRICS_LATENCY_BUCKETS,
+    ):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(sorted(buckets)) + (math.inf,)
+
+    def observe(self, value: float, **labels):
+        key = self._key(labels)
+        with self._lock:
+            counts, total = self._values.get(key) or ([0] * len(self.buckets), 0.0)
+            for i, bound in enumerate(self.buckets):
+                if value <= bound:
+                    counts[i] += 1
+                    break
+            self._values[key] = (counts, total + value)
+
+    def samples(self):
+        with self._lock:
+            items = [(key, (list(counts), total)) for key, (counts, total) in self._values.items()]
+        for key, (counts, total) in items:
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, count in zip(self.buckets, counts):
+                cumulative += count
+                yield f"{self.name}_bucket", {**labels, "le": _format_value(bound)}, cumulative
+            yield f"{self.name}_sum", labels, total
+            yield f"{self.name}_count", labels, cumulative
+
+
+class MetricsRegistry:
+    """
+    Holds the metrics of the process and renders them.
+
+    Collectors are callables returning extra metrics computed at scrape time,
+    such as cache counters that are already tracked elsewhere.
+    """
+
+    def __init__(self):
+        self._metrics: list[_Metric] = []
+        self._collectors: list[Callable[[], Iterable[_Metric]]] = []
+
+    def register(self, metric: _Metric) -> _Metric:
+        self._metrics.append(metric)
+        return metric
+
+    def add_collector(self, collector: Callable[[], Iterable[_Metric]]):
+        self._collectors.append(collector)
+
+    def render(self) -> str:
+        """Render every metric in the Prometheus text format."""
+        metrics = list(self._metrics)
+        for collector in self._collectors:
+            metrics.extend(collector())
+        lines = []
+        for metric in metrics:
+            lines.append(f"# HELP {metric.name} {metric.documentation}")
+            lines.append(f"# TYPE {metric.name} {metric.type}")
+            for name, labels, value in metric.samples():
+                lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+registry = MetricsRegistry()
+
+REQUESTS = registry.register(
+    Counter(
+        "learnbee_requests_total",
+        "Completed calls by component, operation and outcome (ok, error or cancelled).",
+        ("component", "operation", "outcome"),
+    )
+)
+ERRORS = registry.register(
+    Counter(
+        "learnbee_errors_total",
+        "Failed calls by component, operation and error type.",
+        ("component", "operation", "error"),
+    )
+)
+LATENCY = registry.register(
+    Histogram(
+        "learnbee_request_duration_seconds",
+        "Duration of calls, until the last item for streams.",
+        ("component", "operation"),
+    )
+)
+TIME_TO_FIRST_TOKEN = registry.register(
+    Histogram(
+        "learnbee_time_to_first_token_seconds",
+        "Time from the start of a stream to its first item.",
+        ("component", "operation"),
+    )
+)
+IN_FLIGHT = registry.register(
+    Gauge(
+        "learnbee_in_flight",
+        "Calls and streams currently in progress.",
+        ("component", "operation"),
+    )
+)
+TOKENS = registry.register(
+    Counter(
+        "learnbee_llm_tokens_total",
+        "Tokens reported by the LLM API, by kind (prompt, cached_prompt or completion).",
+        ("operation", "model", "kind"),
+    )
+)
+
+BACKEND_LATENCY = registry.register(
+    Histogram(
+        "learnbee_llm_backend_duration_seconds",
+        "Duration of LLM backend calls by route, until the end of the stream for streams.",
+        ("operation", "model", "backend"),
+    )
+)
+COST = registry.register(
+    Counter(
+        "learnbee_llm_cost_usd_total",
+        "Estimated cost of LLM calls in US dollars, by route (see MODEL_PRICES).",
+        ("operation", "model"),
+    )
+)
+
+
+def render_metrics() -> str:
+    """Return the metrics of the process in the Prometheus text format."""
+    return registry.render()
+
+
+def record_tokens(
+    operation: str, model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int, cost: float = 0.0
+):
+    """Count the token usage and estimated cost of one LLM API call."""
+    COST.inc(cost, operation=operation, model=model)
+    TOKENS.inc(prompt_tokens, operation=operation, model=model, kind="prompt")
+    TOKENS.inc(cached_tokens, operation=operation, model=model, kind="cached_prompt")
+    TOKENS.inc(completion_tokens, operation=operation, model=model, kind="completion")
+
+
+def record_backend_call(operation: str, model: str, backend: str, seconds: float):
+    """Record the duration of one LLM backend call."""
+    BACKEND_LATENCY.observe(seconds, operation=operation, model=model, backend=backend)
+
+
+class _CallTracker:
+    """Records the in-flight gauge, latency, first item and outcome of one call."""
+
+    def __init__(self, component: str, operation: str, failed: Callable[[object], bool] = None):
+        self.labels = {"component": component, "operation": operation}
+        self.failed = failed
+        self.error = None
+        self._first_item = False
+
+    def __enter__(self):
+        IN_FLIGHT.inc(**self.labels)
+        self.start = time.perf_counter()
+        return self
+
+    def first_item(self):
+        if not self._first_item:
+            self._first_item = True
+            TIME_TO_FIRST_TOKEN.observe(time.perf_counter() - self.start, **self.labels)
+
+    def result(self, value):
+        """Check a returned value for an error result, e.g. an "Error: ..." tool reply."""
+        if self.failed is not None and self.failed(value):
+            self.error = "error_result"
+        return value
+
+    def __exit__(self, exc_type, exc, tb):
+        LATENCY.observe(time.perf_counter() - self.start, **self.labels)
+        IN_FLIGHT.dec(**self.labels)
+        if exc_type is not None and issubclass(exc_type, (GeneratorExit, asyncio.CancelledError)):
+            outcome = "cancelled"
+        elif exc_type is not None or self.error:
+            outcome = "error"
+            ERRORS.inc(**self.labels, error=exc_type.__name__ if exc_type else self.error)
+        else:
+            outcome = "ok"
+        REQUESTS.inc(**self.labels, outcome=outcome)
+        return False
+
+
+def instrument(component: str, operation: str = None, failed: Callable[[object], bool] = None):
+    """
+    Decorate a function, coroutine function or (async) generator function with metrics.
+
+    Generators are tracked as streams: their time to first item is recorded,
+    and a generator closed before its end counts as cancelled.
+
+    Args:
+        component (str): The component label, e.g. "llm", "handler" or "mcp".
+        operation (str): The operation label. Defaults to the function name.
+        failed (Callable): Optional check of the return value; calls for which it
+            returns True count as errors even though they did not raise.
+
+    Returns:
+        Callable: The decorator.
+    """
+
+    def decorator(fn):
+        name = operation or fn.__name__
+
+        if inspect.isasyncgenfunction(fn):
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                agen = fn(*args, **kwargs)
+                try:
+                    with _CallTracker(component, name) as tracker:
+                        async for item in agen:
+                            tracker.first_item()
+                            yield item
+                finally:
+                    await agen.aclose()
+
+        elif inspect.iscoroutinefunction(fn):
+
+            @functools.wraps(fn)
+            async def wrapper(*args, **kwargs):
+                with _CallTracker(component, name, failed) as tracker:
+                    return tracker.result(await fn(*args, **kwargs))
+
+        elif inspect.isgeneratorfunction(fn):
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                gen = fn(*args, **kwargs)
+                try:
+                    with _CallTracker(component, name) as tracker:
+                        for item in gen:
+                            tracker.first_item()
+                            yield item
+                finally:
+                    gen.close()
+
+        else:
+
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with _CallTracker(component, name, failed) as tracker:
+                    return tracker.result(fn(*args, **kwargs))
+
+        return wrapper
+
+    return decorator
+
+
+def stats_gauges(name: str, documentation: str, label: str, stats: dict[str, dict]) -> list[Gauge]:
+    """
+    Turn nested counter dicts (e.g. cache_stats()) into one gauge per counter.
+
+    Args:
+        name (str): Metric name prefix; each counter becomes ``<name>_<counter>``.
+        documentation (str): Help text, completed with the counter name.
+        label (str): Label holding the outer key, e.g. "cache".
+        stats (dict[str, dict]): Counters by outer key. None values are skipped.
+
+    Returns:
+        list[Gauge]: The gauges, ready to be returned by a collector.
+    """
+    gauges = {}
+    for key, counters in stats.items():
+        for counter, value in (counters or {}).items():
+            if counter not in gauges:
+                gauges[counter] = Gauge(f"{name}_{counter}", f"{documentation} ({counter}).", (label,))
+            gauges[counter].set(value, **{label: key})
+    return list(gauges.values())
@@ -0,0 +1,184 @@
+"""
+Precompute key concepts and introductions for every lesson.
+
+Usage:
+    python -m learnbee.precompute [--lessons-dir ./lessons] [--workers 4] [--languages English Spanish]
+
+Writes a ``<lesson>.meta.json`` sidecar next to each lesson. Lessons whose
+content hash, prompt versions and models match an existing sidecar are
+skipped, and only missing languages are generated for the others.
+"""
+
+import argparse
+import sys
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+
+from learnbee.cache import content_hash
+from learnbee.constants import LANGUAGES, LESSONS_DIR
+from learnbee.lesson_artifacts import read_lesson_artifacts, save_lesson_artifacts
+from learnbee.lesson_catalog import LessonCatalog
+from learnbee.llm_call import CONCEPTS_PROMPT_VERSION, LLMCall
+from learnbee.routing import route_model
+from learnbee.token_budget import fit_lesson
+
+
+def plan_lesson(
+    lesson_name: str,
+    lesson_content: str,
+    languages: list[str],
+    concepts_model: str,
+    introduction_model: str,
+    lessons_dir,
+    force: bool,
+):
+    """
+    Decide what has to be generated for a lesson.
+
+    Concepts are reused if the lesson content, the concepts model and the
+    prompt version are unchanged; introductions also require an unchanged
+    introduction model.
+
+    Returns:
+        tuple[dict, bool, list[str]]: The artifact to update, whether concepts must be
+        extracted, and the languages whose introduction is missing.
+    """
+    digest = content_hash(lesson_content)
+    existing = None if force else read_lesson_artifacts(lesson_name, lessons_dir)
+    if (
+        existing
+        and existing.get("content_hash") == digest
+        and existing.get("concepts_model") == concepts_model
+        and existing.get("concepts_prompt_version") == CONCEPTS_PROMPT_VERSION
+        and existing.get("concepts")
+    ):
+        if existing.get("introduction_model") != introduction_model:
+            existing["introduction_model"] = introduction_model
+            existing["introductions"] = {}
+        missing = [lang for lang in languages if lang not in existing.get("introductions", {})]
+        return existing, False, missing
+
+    artifacts = {
+        "lesson_name": lesson_name,
+        "content_hash": digest,
+        "concepts_model": concepts_model,
+        "introduction_model": introduction_model,
+        "concepts_prompt_version": CONCEPTS_PROMPT_VERSION,
+        "concepts": [],
+        "introductions": {},
+    }
+    return artifacts, True, list(languages)
+
+
+def precompute_lessons(
+    lessons_dir: str = LESSONS_DIR,
+    languages: list[str] = None,
+    workers: int = 4,
+    model: str = None,
+    force: bool = False,
+) -> dict:
+    """
+    Generate sidecar artifacts for every lesson in a directory.
+
+    Args:
+        lessons_dir (str): Directory containing the lessons.
+        languages (list[str]): Languages to generate introductions for. Defaults to all LANGUAGES.
+        workers (int): Maximum number of concurrent LLM calls.
+        model (str): The model to use for both operations. Defaults to the models their
+            routes use at runtime (see learnbee.routing).
+        force (bool): Regenerate artifacts even if they are up to date.
+
+    Returns:
+        dict: Counters with the number of lessons updated, skipped and failed.
+    """
+    languages = languages or LANGUAGES
+    catalog = LessonCatalog(lessons_dir)
+    call_llm = LLMCall(model=model)
+    # The models the concepts and introductions are generated with, recorded to detect stale artifacts
+    concepts_model = model or route_model("extract_key_concepts")
+    introduction_model = model or route_model("generate_lesson_introduction")
+
+    plans = {}
+    for lesson_name in catalog.list_names():
+        lesson_content = catalog.get_content(lesson_name)
+        if lesson_content is None:
+            continue
+        # Same fitting as the Load path (the tutor model's budget), so the content hashes match at runtime
+        lesson_content = fit_lesson(lesson_content, route_model("respond"))
+        artifacts, needs_concepts, missing = plan_lesson(
+            lesson_name, lesson_content, languages, concepts_model, introduction_model, lessons_dir, force
+        )
+        if needs_concepts or missing:
+            plans[lesson_name] = (lesson_content, artifacts, needs_concepts, missing)
+
+    summary = {"updated": 0, "skipped": len(catalog.list_names()) - len(plans), "failed": 0}
+    failed = set()
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        # Phase 1: key concepts, which every introduction depends on
+        concept_futures = {
+            name: executor.submit(call_llm.extract_key_concepts, content)
+            for name, (content, _, needs_concepts, _) in plans.items()
+            if needs_concepts
+        }
+        for name, future in concept_futures.items():
+            try:
+                plans[name][1]["concepts"] = future.result()
+            except Exception as e:
+                print(f"❌ {name}: could not extract key concepts: {e}", file=sys.stderr)
+                failed.add(name)
+
+        # Phase 2: one introduction per (lesson, language)
+        intro_futures = {}
+        for name, (content, artifacts, _, missing) in plans.items():
+            if name in failed or not artifacts["concepts"]:
+                continue
+            for language in missing:
+                intro_futures[(name, language)] = executor.submit(
+                    call_llm.generate_lesson_introduction,
+                    content,
+                    name,
+                    artifacts["concepts"],
+                    language=language,
+                )
+        for (name, language), future in intro_futures.items():
+            try:
+                plans[name][1]["introductions"][language] = future.result()
+            except Exception as e:
+                print(f"⚠️ {name}: could not generate the {language} introduction: {e}", file=sys.stderr)
+
+    for name, (_, artifacts, _, _) in plans.items():
+        if name in failed:
+            summary["failed"] += 1
+            continue
+        artifacts["generated_at"] = datetime.now(timezone.utc).isoformat()
+        save_lesson_artifacts(name, artifacts, lessons_dir)
+        summary["updated"] += 1
+        print(f"✅ {name}: {len(artifacts['concepts'])} concepts, {len(artifacts['introductions'])} introductions")
+
+    return summary
+
+
+def main(argv: list[str] = None) -> int:
+    """Command line entry point."""
+    parser = argparse.ArgumentParser(description="Precompute lesson concepts and introductions.")
+    parser.add_argument("--lessons-dir", default=LESSONS_DIR, help="Directory containing the lessons.")
+    parser.add_argument("--languages", nargs="+", choices=LANGUAGES, help="Languages to generate (default: all).")
+    parser.add_argument("--workers", type=int, default=4, help="Maximum number of concurrent LLM calls.")
+    parser.add_argument("--model", help="The model to use (default: the model of each operation's route).")
+    parser.add_argument("--force", action="store_true", help="Regenerate artifacts that are up to date.")
+    args = parser.parse_args(argv)
+
+    summary = precompute_lessons(
+        lessons_dir=args.lessons_dir,
+        languages=args.languages,
+        workers=args.workers,
+        model=args.model,
+        force=args.force,
+    )
+    print(f"Updated: {summary['updated']}, skipped: {summary['skipped']}, failed: {summary['failed']}")
+    return 1 if summary["failed"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,5 +1,11 @@
 """System prompts for educational tutoring."""
 
+from learnbee.cache import TTLCache, content_hash
+from learnbee.constants import PROMPT_CACHE_MAX_ENTRIES
+
+# Compiled system prompts keyed by (tutor, description, difficulty, lesson hash)
+_prompt_cache = TTLCache(max_entries=PROMPT_CACHE_MAX_ENTRIES)
+
 
 def generate_tutor_system_prompt(
     tutor_name: str,
@@ -9,6 +15,11 @@ def generate_tutor_system_prompt(
 ) -> str:
     """
     Generate the system prompt for an educational tutor.
+
+    The prompt starts with the long instructions and the lesson, which are the
+    same for every tutor and difficulty, so provider-side prompt caching can
+    reuse that prefix. Tutor and difficulty specific text comes last. Compiled
+    prompts are memoized per tutor, difficulty and lesson content.
     
     Args:
         tutor_name: Name of the tutor
@@ -19,6 +30,21 @@ def generate_tutor_system_prompt(
     Returns:
         Complete system prompt string
     """
+    cache_key = (tutor_name, tutor_description, difficulty_level, content_hash(lesson_content))
+    system_prompt = _prompt_cache.get(cache_key)
+    if system_prompt is None:
+        system_prompt = _build_tutor_system_prompt(tutor_name, tutor_description, difficulty_level, lesson_content)
+        _prompt_cache.set(cache_key, system_prompt)
+    return system_prompt
+
+
+def _build_tutor_system_prompt(
+    tutor_name: str,
+    tutor_description: str,
+    difficulty_level: str,
+    lesson_content: str
+) -> str:
+    """Assemble the tutor system prompt (see generate_tutor_system_prompt)."""
     # Determine difficulty-specific instructions
     if difficulty_level == "beginner":
         difficulty_instruction = (
@@ -38,9 +64,8 @@ def generate_tutor_system_prompt(
     
     # fmt: off
     system_prompt = (
-        f"You are {tutor_name}, a friendly and patient Educational Tutor specializing in early childhood education (ages 3-12).\n"
-        f"Your character: {tutor_description}\n"
-        f"Embody this character and teaching style in all your interactions. Let your unique personality shine through while maintaining the educational focus.\n\n"
+        # Shared prefix: identical for every tutor and difficulty level
+        "You are a friendly and patient Educational Tutor specializing in early childhood education (ages 3-12).\n\n"
         
         "CORE TEACHING APPROACH - PROBLEM-BASED LEARNING:\n"
         "Your primary role is to PLANT QUESTIONS AND PROBLEMS for the child to solve, then guide them step-by-step.\n"
@@ -75,10 +100,6 @@ def generate_tutor_system_prompt(
         "- Be warm, enthusiastic, and patient. Show excitement about problem-solving!\n"
         "- Use the child's name when possible (refer to them as 'you' or 'little learner').\n\n"
         
-        "TEACHING STRATEGIES BY DIFFICULTY LEVEL:\n"
-        f"- {difficulty_level.upper()} level:\n"
-        f"{difficulty_instruction}\n"
-        
         "INTERACTION PATTERNS:\n"
         "- When starting a new topic: IMMEDIATELY present a problem or question. Don't just explain - challenge them!\n"
         "- When a child asks a question: Turn it into a problem! 'Great question! Let's figure this out together. What do you think...?'\n"
@@ -110,7 +131,17 @@ def generate_tutor_system_prompt(
         "IMPORTANT: Always respond in the EXACT same language that the child uses in their messages. "
         "If the child writes in Spanish, respond in Spanish. If they write in English, respond in English. "
         "If they write in French, respond in French. Match the child's language automatically. "
-        "This is critical for effective communication with young learners.\n"
+        "This is critical for effective communication with young learners.\n\n"
+        
+        # Per-tutor and per-difficulty suffix
+        "YOUR CHARACTER:\n"
+        f"Your name is {tutor_name}.\n"
+        f"Your character: {tutor_description}\n"
+        f"Embody this character and teaching style in all your interactions. Let your unique personality shine through while maintaining the educational focus.\n\n"
+        
+        "TEACHING STRATEGIES BY DIFFICULTY LEVEL:\n"
+        f"- {difficulty_level.upper()} level:\n"
+        f"{difficulty_instruction}"
     )
     # fmt: on
     
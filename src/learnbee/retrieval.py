@@ -0,0 +1,203 @@
+"""Local BM25 retrieval over lesson sections, used to keep tutor prompts small for long lessons."""
+
+import math
+import re
+from collections import Counter
+from dataclasses import dataclass
+
+from learnbee.cache import TTLCache, content_hash
+from learnbee.constants import LESSON_RETRIEVAL_TOP_K
+from learnbee.lesson_catalog import lesson_catalog
+
+# Paragraphs shorter than this many words (e.g. headings) are merged into the next one
+MIN_CHUNK_WORDS = 12
+# Paragraphs are grouped into chunks of at most this many words
+MAX_CHUNK_WORDS = 180
+# Length of each outline entry
+OUTLINE_ENTRY_CHARS = 80
+
+_WORD_RE = re.compile(r"\w+", re.UNICODE)
+
+_lesson_indexes = TTLCache(max_entries=256)
+_corpus_index = None
+
+
+def tokenize(text: str) -> list[str]:
+    """Split a text into lowercase word terms."""
+    return [term for term in _WORD_RE.findall(text.lower()) if len(term) > 1 or term.isdigit()]
+
+
+def chunk_lesson(lesson_content: str) -> list[str]:
+    """
+    Split a lesson into sections.
+
+    Paragraphs are separated by blank lines. Short paragraphs such as headings
+    are attached to the following paragraph, and paragraphs are grouped until a
+    chunk reaches MAX_CHUNK_WORDS words.
+
+    Args:
+        lesson_content (str): The lesson text.
+
+    Returns:
+        list[str]: The lesson chunks in reading order.
+    """
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", lesson_content) if p.strip()]
+    chunks = []
+    current = []
+    current_words = 0
+    for paragraph in paragraphs:
+        words = len(paragraph.split())
+        if current and current_words >= MIN_CHUNK_WORDS and current_words + words > MAX_CHUNK_WORDS:
+            chunks.append("\n\n".join(current))
+            current, current_words = [], 0
+        current.append(paragraph)
+        current_words += words
+        if current_words >= MIN_CHUNK_WORDS and words >= MIN_CHUNK_WORDS:
+            chunks.append("\n\n".join(current))
+            current, current_words = [], 0
+    if current:
+        chunks.append("\n\n".join(current))
+    return chunks
+
+
+class BM25Index:
+    """Okapi BM25 ranking over a fixed list of documents."""
+
+    def __init__(self, documents: list[str], k1: float = 1.5, b: float = 0.75):
+        """
+        Build the index.
+
+        Args:
+            documents (list[str]): The documents to index.
+            k1 (float): Term frequency saturation.
+            b (float): Document length normalization.
+        """
+        self.k1 = k1
+        self.b = b
+        self.term_freqs = [Counter(tokenize(doc)) for doc in documents]
+        self.doc_lengths = [sum(tf.values()) for tf in self.term_freqs]
+        self.avg_length = sum(self.doc_lengths) / len(documents) if documents else 0.0
+        doc_freqs = Counter(term for tf in self.term_freqs for term in tf)
+        total = len(documents)
+        self.idf = {
+            term: math.log(1 + (total - freq + 0.5) / (freq + 0.5)) for term, freq in doc_freqs.items()
+        }
+
+    def search(self, query: str, top_k: int = LESSON_RETRIEVAL_TOP_K) -> list[tuple[int, float]]:
+        """
+        Rank the documents for a query.
+
+        Args:
+            query (str): The search query.
+            top_k (int): Maximum number of results.
+
+        Returns:
+            list[tuple[int, float]]: (document index, score) pairs with a positive score,
+            best first.
+        """
+        terms = [term for term in set(tokenize(query)) if term in self.idf]
+        if not terms:
+            return []
+        scores = []
+        for index, tf in enumerate(self.term_freqs):
+            norm = self.k1 * (1 - self.b + self.b * self.doc_lengths[index] / (self.avg_length or 1))
+            score = 0.0
+            for term in terms:
+                freq = tf.get(term)
+                if freq:
+                    score += self.idf[term] * freq * (self.k1 + 1) / (freq + norm)
+            if score > 0:
+                scores.append((index, score))
+        scores.sort(key=lambda item: item[1], reverse=True)
+        return scores[:top_k]
+
+
+@dataclass
+class LessonIndex:
+    """Chunks, outline and BM25 index of one lesson."""
+
+    chunks: list[str]
+    outline: list[str]
+    index: BM25Index
+
+    def search(self, query: str, top_k: int = LESSON_RETRIEVAL_TOP_K) -> list[str]:
+        """Return the most relevant chunks for a query, in lesson order."""
+        hits = self.index.search(query, top_k)
+        return [self.chunks[i] for i in sorted(i for i, _ in hits)]
+
+
+def get_lesson_index(lesson_content: str) -> LessonIndex:
+    """Return the index of a lesson, built once per lesson content."""
+    key = content_hash(lesson_content)
+    lesson_index = _lesson_indexes.get(key)
+    if lesson_index is None:
+        chunks = chunk_lesson(lesson_content)
+        outline = [_outline_entry(chunk) for chunk in chunks]
+        lesson_index = LessonIndex(chunks=chunks, outline=outline, index=BM25Index(chunks))
+        _lesson_indexes.set(key, lesson_index)
+    return lesson_index
+
+
+def _outline_entry(chunk: str) -> str:
+    """Describe a chunk by the first line of each of its paragraphs."""
+    paragraphs = [p.strip() for p in re.split(r"\n\s*\n", chunk) if p.strip()]
+    entry = " / ".join(p.splitlines()[0].strip() for p in paragraphs)
+    if len(entry) > OUTLINE_ENTRY_CHARS:
+        entry = entry[: OUTLINE_ENTRY_CHARS - 3].rstrip() + "..."
+    return entry
+
+
+def lesson_outline(lesson_content: str) -> str:
+    """Return a short outline of a lesson, one line per section."""
+    return "\n".join(f"- {entry}" for entry in get_lesson_index(lesson_content).outline)
+
+
+def relevant_lesson_sections(lesson_content: str, query: str, top_k: int = LESSON_RETRIEVAL_TOP_K) -> str:
+    """
+    Return the lesson sections most relevant to a query.
+
+    Falls back to the opening sections of the lesson when nothing matches,
+    e.g. when the child writes in another language than the lesson.
+
+    Args:
+        lesson_content (str): The lesson text.
+        query (str): The child's message, optionally with the previous tutor reply.
+        top_k (int): Maximum number of sections.
+
+    Returns:
+        str: The selected sections separated by blank lines.
+    """
+    lesson_index = get_lesson_index(lesson_content)
+    sections = lesson_index.search(query, top_k) or lesson_index.chunks[:top_k]
+    return "\n\n".join(sections)
+
+
+def search_lessons(query: str, top_k: int = 5) -> list[dict]:
+    """
+    Search the sections of every lesson in the catalog.
+
+    Args:
+        query (str): The search query.
+        top_k (int): Maximum number of results.
+
+    Returns:
+        list[dict]: Results with "lesson", "section" and "score" keys, best first.
+    """
+    global _corpus_index
+    lessons = {name: lesson_catalog.get_content(name) for name in lesson_catalog.list_names()}
+    signature = tuple(sorted((name, content_hash(content)) for name, content in lessons.items() if content))
+    if _corpus_index is None or _corpus_index[0] != signature:
+        sources = []
+        documents = []
+        for name, content in lessons.items():
+            if not content:
+                continue
+            for chunk in get_lesson_index(content).chunks:
+                sources.append(name)
+                documents.append(chunk)
+        _corpus_index = (signature, sources, documents, BM25Index(documents))
+    _, sources, documents, index = _corpus_index
+    return [
+        {"lesson": sources[i], "section": documents[i], "score": round(score, 3)}
+        for i, score in index.search(query, top_k)
+    ]
@@ -0,0 +1,83 @@
+"""
+Per-operation routing of LLM calls.
+
+Each LLMCall operation (concept extraction, introductions, tutor turns,
+lesson generation, summaries) has a route: the model, output token limit,
+timeout and backend its requests use. This lets cheap, short operations run
+on a small model or self-hosted capacity while tutor turns keep the quality
+model. Routes come from LLM_ROUTES in constants.py, overridden per field by
+LEARNBEE_ROUTE_<OPERATION>_<FIELD> environment variables.
+"""
+
+import os
+from dataclasses import dataclass, fields
+
+from learnbee.backends import BACKENDS, LLM_BACKEND, get_backend
+from learnbee.constants import LLM_ROUTES
+
+
+@dataclass(frozen=True)
+class Route:
+    """Where and how the requests of one operation are sent."""
+
+    # None uses the default model of the backend
+    model: str | None = None
+    max_tokens: int | None = None
+    # Seconds; None uses the HTTP client timeout
+    timeout: float | None = None
+    # Backend name (see learnbee.backends); None uses LEARNBEE_LLM_BACKEND
+    backend: str | None = None
+
+
+_FIELD_TYPES = {"model": str, "max_tokens": int, "timeout": float, "backend": str}
+
+
+def load_routes(defaults: dict = LLM_ROUTES, environ=os.environ) -> dict[str, Route]:
+    """
+    Build the routing table from defaults and environment overrides.
+
+    Args:
+        defaults (dict): Route fields by operation, e.g. LLM_ROUTES.
+        environ: The environment to read LEARNBEE_ROUTE_<OPERATION>_<FIELD> overrides from.
+
+    Returns:
+        dict[str, Route]: The route of each operation.
+
+    Raises:
+        ValueError: If an override is not a valid number, a backend is unknown, or a
+            route sends its requests to a backend other than LEARNBEE_LLM_BACKEND
+            without naming a model (the default model belongs to the default backend).
+    """
+    routes = {}
+    for operation, options in defaults.items():
+        options = dict(options)
+        for field in fields(Route):
+            value = environ.get(f"LEARNBEE_ROUTE_{operation.upper()}_{field.name.upper()}")
+            if value:
+                options[field.name] = _FIELD_TYPES[field.name](value)
+        route = Route(**options)
+        if route.backend is not None and route.backend not in BACKENDS:
+            raise ValueError(
+                f"Unknown backend '{route.backend}' for the {operation} route, expected one of {list(BACKENDS)}"
+            )
+        if route.backend not in (None, LLM_BACKEND) and not route.model:
+            raise ValueError(
+                f"The {operation} route uses the {route.backend} backend but no model: "
+                f"set LEARNBEE_ROUTE_{operation.upper()}_MODEL"
+            )
+        routes[operation] = route
+    return routes
+
+
+llm_routes = load_routes()
+
+
+def get_route(operation: str) -> Route:
+    """Return the route of an operation; unknown operations get the defaults."""
+    return llm_routes.get(operation) or Route()
+
+
+def route_model(operation: str) -> str:
+    """Return the model serving an operation: its route's model, or the default model of its backend."""
+    route = get_route(operation)
+    return route.model or get_backend(route.backend).default_model
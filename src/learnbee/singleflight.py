@@ -0,0 +1,121 @@
+"""Coalesce identical concurrent calls so they share one execution and its result."""
+
+import asyncio
+import threading
+from typing import Awaitable, Callable, Hashable, TypeVar
+
+T = TypeVar("T")
+
+
+class _Call:
+    """A call in flight, shared by the caller running it and the callers waiting for it."""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error: BaseException | None = None
+
+
+class SingleFlight:
+    """
+    Thread-safe single-flight group.
+
+    While a call for a key is running, other callers with the same key wait
+    for it and receive its result (or exception) instead of running their own.
+    Nothing is kept once the call returns; pair it with a cache for that.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: dict[Hashable, _Call] = {}
+        self.calls = 0
+        self.shared = 0
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Run ``fn`` unless a call with the same key is already running, then return its result.
+
+        Args:
+            key (Hashable): Identifies identical calls, e.g. (operation, lesson hash, language).
+            fn (Callable[[], T]): The function to run.
+
+        Returns:
+            T: The result of the shared call.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.calls += 1
+            else:
+                self.shared += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn()
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def stats(self) -> dict:
+        """Return counters for monitoring."""
+        return {"in_flight": len(self._calls), "calls": self.calls, "shared": self.shared}
+
+
+class AsyncSingleFlight:
+    """
+    Single-flight group for coroutines.
+
+    The shared call runs as its own task, so a caller being cancelled does not
+    cancel the call for the others. Calls are only shared within one event loop.
+    """
+
+    def __init__(self):
+        self._tasks: dict[tuple, asyncio.Task] = {}
+        self.calls = 0
+        self.shared = 0
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[T]]) -> T:
+        """
+        Await ``fn()`` unless a call with the same key is already running, then return its result.
+
+        Args:
+            key (Hashable): Identifies identical calls, e.g. (operation, lesson hash, language).
+            fn (Callable[[], Awaitable[T]]): Returns the coroutine to run.
+
+        Returns:
+            T: The result of the shared call.
+        """
+        loop = asyncio.get_running_loop()
+        task_key = (id(loop), key)
+        task = self._tasks.get(task_key)
+        if task is None:
+            task = loop.create_task(fn())
+            self._tasks[task_key] = task
+            task.add_done_callback(lambda t: self._finish(task_key, t))
+            self.calls += 1
+        else:
+            self.shared += 1
+        return await asyncio.shield(task)
+
+    def _finish(self, task_key: tuple, task: asyncio.Task):
+        if self._tasks.get(task_key) is task:
+            del self._tasks[task_key]
+        # Mark the exception as retrieved in case every caller was cancelled
+        if not task.cancelled():
+            task.exception()
+
+    def stats(self) -> dict:
+        """Return counters for monitoring."""
+        return {"in_flight": len(self._tasks), "calls": self.calls, "shared": self.shared}
@@ -0,0 +1,103 @@
+"""Helpers for coalescing streamed LLM tokens into fewer UI updates."""
+
+import time
+from typing import AsyncGenerator, AsyncIterable, Generator, Iterable
+
+from learnbee.constants import STREAM_FLUSH_CHARS, STREAM_FLUSH_INTERVAL
+
+
+class DeltaCoalescer:
+    """
+    Buffer streamed text deltas and decide when to flush them.
+
+    The first delta is flushed immediately to keep time-to-first-token low.
+    After that, deltas are flushed once ``flush_chars`` characters are
+    buffered or ``flush_interval`` seconds have passed since the last flush.
+    """
+
+    def __init__(self, flush_interval: float = STREAM_FLUSH_INTERVAL, flush_chars: int = STREAM_FLUSH_CHARS):
+        self.flush_interval = flush_interval
+        self.flush_chars = flush_chars
+        self._parts = []
+        self._size = 0
+        self._last_flush = None
+
+    def add(self, delta: str) -> str | None:
+        """Buffer a delta and return the buffered text if it is time to flush."""
+        self._parts.append(delta)
+        self._size += len(delta)
+        now = time.monotonic()
+        if (
+            self._last_flush is None
+            or self._size >= self.flush_chars
+            or now - self._last_flush >= self.flush_interval
+        ):
+            self._last_flush = now
+            return self.flush()
+        return None
+
+    def flush(self) -> str | None:
+        """Return and clear the buffered text, or None if nothing is buffered."""
+        if not self._parts:
+            return None
+        text = "".join(self._parts)
+        self._parts = []
+        self._size = 0
+        return text
+
+
+def coalesce_deltas(
+    deltas: Iterable[str],
+    flush_interval: float = STREAM_FLUSH_INTERVAL,
+    flush_chars: int = STREAM_FLUSH_CHARS,
+) -> Generator[str, None, None]:
+    """
+    Group a stream of small text deltas into larger ones.
+
+    Args:
+        deltas (Iterable[str]): The raw deltas, typically one per token.
+        flush_interval (float): Maximum number of seconds to hold buffered text.
+        flush_chars (int): Number of buffered characters that triggers a flush.
+
+    Yields:
+        str: Coalesced deltas whose concatenation equals the input.
+    """
+    coalescer = DeltaCoalescer(flush_interval, flush_chars)
+    for delta in deltas:
+        text = coalescer.add(delta)
+        if text:
+            yield text
+    text = coalescer.flush()
+    if text:
+        yield text
+
+
+async def acoalesce_deltas(
+    deltas: AsyncIterable[str],
+    flush_interval: float = STREAM_FLUSH_INTERVAL,
+    flush_chars: int = STREAM_FLUSH_CHARS,
+) -> AsyncGenerator[str, None]:
+    """Async variant of coalesce_deltas."""
+    coalescer = DeltaCoalescer(flush_interval, flush_chars)
+    async for delta in deltas:
+        text = coalescer.add(delta)
+        if text:
+            yield text
+    text = coalescer.flush()
+    if text:
+        yield text
+
+
+def replay_text(text: str, flush_chars: int = STREAM_FLUSH_CHARS) -> Generator[str, None, None]:
+    """
+    Split an already complete text into deltas, as if it was streamed.
+
+    Args:
+        text (str): The text to replay.
+        flush_chars (int): Size of each delta.
+
+    Yields:
+        str: Deltas whose concatenation equals the text.
+    """
+    for start in range(0, len(text), flush_chars):
+        yield text[start : start + flush_chars]
@@ -0,0 +1,156 @@
+"""Token counting and per-model context budgets."""
+
+import logging
+from dataclasses import dataclass
+from functools import lru_cache
+
+from learnbee.cache import TTLCache, content_hash
+
+try:
+    import tiktoken
+except ImportError:  # pragma: no cover - optional dependency
+    tiktoken = None
+
+logger = logging.getLogger(__name__)
+
+# Characters per token used when no tokenizer is available
+CHARS_PER_TOKEN = 4
+
+
+@dataclass(frozen=True)
+class ModelBudget:
+    """How the context window of a model is split between the parts of a tutor prompt."""
+
+    context_window: int
+    max_output_tokens: int
+    max_lesson_tokens: int
+    max_history_tokens: int
+    # Lesson excerpt included in the introduction prompt
+    max_introduction_lesson_tokens: int = 600
+
+    @property
+    def max_prompt_tokens(self) -> int:
+        """Tokens available for the prompt once the reply is reserved."""
+        return self.context_window - self.max_output_tokens
+
+    def allocate(self, instructions_tokens: int, output_tokens: int = None) -> tuple[int, int]:
+        """
+        Split the prompt room left after the fixed instructions between lesson and history.
+
+        Args:
+            instructions_tokens (int): Tokens used by the system prompt without the lesson.
+            output_tokens (int): Tokens reserved for the reply. Defaults to max_output_tokens.
+
+        Returns:
+            tuple[int, int]: The lesson and history token budgets. They are scaled down
+            proportionally if the model cannot fit both maximums.
+        """
+        prompt_tokens = self.max_prompt_tokens if output_tokens is None else self.context_window - output_tokens
+        room = max(prompt_tokens - instructions_tokens, 0)
+        wanted = self.max_lesson_tokens + self.max_history_tokens
+        if wanted <= room:
+            return self.max_lesson_tokens, self.max_history_tokens
+        lesson_tokens = room * self.max_lesson_tokens // wanted
+        return lesson_tokens, room - lesson_tokens
+
+
+# Budgets per model; unknown models use DEFAULT_BUDGET
+MODEL_BUDGETS = {
+    "gpt-4o-mini": ModelBudget(context_window=128_000, max_output_tokens=500, max_lesson_tokens=12_000, max_history_tokens=1_500),
+    "gpt-4o": ModelBudget(context_window=128_000, max_output_tokens=500, max_lesson_tokens=12_000, max_history_tokens=1_500),
+    "gpt-4.1-mini": ModelBudget(context_window=1_000_000, max_output_tokens=500, max_lesson_tokens=12_000, max_history_tokens=1_500),
+    "gpt-4.1-nano": ModelBudget(context_window=1_000_000, max_output_tokens=500, max_lesson_tokens=12_000, max_history_tokens=1_500),
+}
+DEFAULT_BUDGET = ModelBudget(context_window=16_384, max_output_tokens=500, max_lesson_tokens=6_000, max_history_tokens=1_500)
+
+_lesson_token_counts = TTLCache(max_entries=1024)
+
+
+def get_budget(model: str) -> ModelBudget:
+    """Return the context budget of a model."""
+    return MODEL_BUDGETS.get(model, DEFAULT_BUDGET)
+
+
+@lru_cache(maxsize=None)
+def _get_encoding(model: str):
+    """Return the tiktoken encoding of a model, or None if no tokenizer is available."""
+    if tiktoken is None:
+        return None
+    try:
+        try:
+            return tiktoken.encoding_for_model(model)
+        except KeyError:
+            return tiktoken.get_encoding("o200k_base")
+    except Exception as e:
+        # The encoding files are downloaded on first use and may be unavailable offline
+        logger.warning("No tokenizer for %s, estimating token counts: %s", model, e)
+        return None
+
+
+def count_tokens(text: str, model: str = "gpt-4o-mini") -> int:
+    """
+    Count the tokens of a text for a model.
+
+    Args:
+        text (str): The text to count.
+        model (str): The model whose tokenizer to use.
+
+    Returns:
+        int: The exact token count, or an estimate if no tokenizer is available.
+    """
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return len(text) // CHARS_PER_TOKEN + 1
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def truncate_to_tokens(text: str, max_tokens: int, model: str = "gpt-4o-mini") -> str:
+    """
+    Cut a text down to at most ``max_tokens`` tokens.
+
+    Args:
+        text (str): The text to truncate.
+        max_tokens (int): The maximum number of tokens to keep.
+        model (str): The model whose tokenizer to use.
+
+    Returns:
+        str: The text itself if it fits, otherwise its longest prefix that fits.
+    """
+    encoding = _get_encoding(model)
+    if encoding is None:
+        return text[: max_tokens * CHARS_PER_TOKEN]
+    tokens = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    return encoding.decode(tokens[:max_tokens])
+
+
+def lesson_token_count(lesson_content: str, model: str = "gpt-4o-mini") -> int:
+    """Return the token count of a lesson, computed once per lesson content and model."""
+    key = (content_hash(lesson_content), model)
+    count = _lesson_token_counts.get(key)
+    if count is None:
+        count = count_tokens(lesson_content, model)
+        _lesson_token_counts.set(key, count)
+    return count
+
+
+def fit_lesson(lesson_content: str, model: str = "gpt-4o-mini", max_tokens: int = None) -> str:
+    """
+    Fit a lesson into the lesson budget of a model.
+
+    Args:
+        lesson_content (str): The full lesson content.
+        model (str): The model the lesson will be sent to.
+        max_tokens (int): Override for the lesson budget of the model.
+
+    Returns:
+        str: The lesson, truncated with a warning if it exceeds the budget.
+    """
+    if max_tokens is None:
+        max_tokens = get_budget(model).max_lesson_tokens
+    tokens = lesson_token_count(lesson_content, model)
+    if tokens <= max_tokens:
+        return lesson_content
+    logger.warning("Lesson truncated from %d to %d tokens to fit the %s budget", tokens, max_tokens, model)
+    return truncate_to_tokens(lesson_content, max_tokens, model)
@@ -1,15 +1,47 @@
 """Handler functions for tutor interactions and lesson management."""
 
-import json
+import asyncio
+import uuid
+
 import gradio as gr
 
-from learnbee.constants import LESSON_CONTENT_MAX_LENGTH, TUTOR_NAMES, get_tutor_names, get_tutor_description
-from learnbee.llm_call import LLMCall
-from learnbee.mcp_server import create_lesson, get_lesson_content, get_lesson_list
+from learnbee.constants import (
+    LESSON_EXPECTED_TOKENS,
+    LESSON_RETRIEVAL_MIN_TOKENS,
+    TUTOR_NAMES,
+    get_tutor_description,
+    get_tutor_names,
+)
+from learnbee import metrics
+from learnbee.history import HistoryPolicy
+from learnbee.lesson_artifacts import load_lesson_artifacts
+from learnbee.lesson_catalog import lesson_catalog
+from learnbee.llm_call import AsyncLLMCall, response_cache_key
+from learnbee.mcp_server import lesson_name_from_topic, read_lesson, stream_lesson_async
 from learnbee.prompts import generate_tutor_system_prompt
+from learnbee.retrieval import lesson_outline, relevant_lesson_sections
+from learnbee.routing import get_route, route_model
+from learnbee.token_budget import count_tokens, fit_lesson, get_budget, lesson_token_count
+
+# Keep references to background tasks so they are not garbage collected mid-flight
+_background_tasks = set()
+
+
+def _usage_labels(chat_session, lesson_name, selected_tutor, difficulty_level=None) -> dict:
+    """Labels the token usage of a UI session is accounted to (see learnbee.usage)."""
+    session_id = chat_session.setdefault("id", uuid.uuid4().hex[:12]) if chat_session is not None else ""
+    return {
+        "session": session_id,
+        "lesson": lesson_name,
+        "tutor": (selected_tutor or "").split(" - ")[0],
+        "difficulty": difficulty_level,
+    }
 
 
-def load_lesson_content(lesson_name, selected_tutor, selected_language, progress=gr.Progress()):
+@metrics.instrument("handler")
+async def load_lesson_content(
+    lesson_name, selected_tutor, selected_language, chat_session=None, progress=gr.Progress()
+):
     """
     Load lesson content and extract key concepts.
     
@@ -19,6 +51,7 @@ def load_lesson_content(lesson_name, selected_tutor, selected_language, progress
         lesson_name: Name of the lesson to load
         selected_tutor: Name of the selected tutor
         selected_language: Language for the introduction
+        chat_session: Per-session state dict, used to account token usage to the session
         progress: Gradio progress tracker
     
     Returns:
@@ -32,22 +65,26 @@ def load_lesson_content(lesson_name, selected_tutor, selected_language, progress
 
     progress(0.1, desc="Loading lesson content...")
 
-    lesson_content = get_lesson_content(lesson_name, LESSON_CONTENT_MAX_LENGTH)
+    # Fit the lesson into the lesson token budget of the tutor model
+    lesson_content = fit_lesson(read_lesson(lesson_name), route_model("respond"))
 
     progress(0.5, desc="Extracting key concepts from the lesson...")
 
+    # Precomputed artifacts (see learnbee.precompute) let us skip the LLM calls entirely
+    artifacts = load_lesson_artifacts(lesson_name, lesson_content, lesson_catalog.lessons_dir) or {}
+
     # Extract key concepts using LLM
     try:
-        call_llm = LLMCall()
-        concepts = call_llm.extract_key_concepts(lesson_content)
+        call_llm = AsyncLLMCall(usage_labels=_usage_labels(chat_session, lesson_name, selected_tutor))
+        concepts = artifacts.get("concepts") or await call_llm.extract_key_concepts(lesson_content)
 
         progress(0.7, desc="Generating lesson introduction...")
 
         # Generate lesson introduction with summary and example questions in selected language
-        introduction = ""
-        if concepts:
+        introduction = artifacts.get("introductions", {}).get(selected_language, "")
+        if concepts and not introduction:
             try:
-                introduction = call_llm.generate_lesson_introduction(
+                introduction = await call_llm.generate_lesson_introduction(
                     lesson_content, lesson_name, concepts, language=selected_language
                 )
             except Exception as e:
@@ -132,6 +169,7 @@ def load_lesson_content(lesson_name, selected_tutor, selected_language, progress
         )
 
 
+@metrics.instrument("handler")
 def reset_chat_interface():
     """
     Reset the chat interface to initial state.
@@ -160,30 +198,40 @@ def reset_chat_interface():
     )
 
 
-def create_new_lesson(topic, lesson_name, age_range, progress=gr.Progress()):
+@metrics.instrument("handler")
+async def create_new_lesson(topic, lesson_name, age_range, progress=gr.Progress()):
     """
     Create a new lesson from a topic using ChatGPT.
     
+    The lesson is streamed: progress follows the tokens received and the
+    Result box shows the lesson as it is written.
+    
     Args:
         topic: Topic for the lesson
         lesson_name: Optional custom name for the lesson
         age_range: Target age range
         progress: Gradio progress tracker
     
-    Returns:
-        Tuple of (result_message, empty_topic, lesson_dropdown_update)
+    Yields:
+        Tuples of (result_message, topic_update, lesson_dropdown_update)
     """
     if not topic or not topic.strip():
-        return "❌ Please enter a topic for the lesson.", "", gr.update()
-    
-    progress(0.2, desc="Generating lesson content with ChatGPT...")
+        yield "❌ Please enter a topic for the lesson.", "", gr.update()
+        return
     
     # Use provided lesson_name or None to auto-generate
     name_to_use = lesson_name.strip() if lesson_name and lesson_name.strip() else None
     
-    progress(0.6, desc="Saving lesson...")
+    progress(0.0, desc="Generating lesson content with ChatGPT...")
+    yield "✨ Generating lesson content with ChatGPT...", gr.update(), gr.update()
     
-    result = create_lesson(topic.strip(), name_to_use, age_range)
+    result = "Error creating lesson: no response."
+    async for content, tokens, message in stream_lesson_async(topic.strip(), name_to_use, age_range):
+        if message is not None:
+            result = message
+            break
+        progress(min(tokens / LESSON_EXPECTED_TOKENS, 0.95), desc=f"Writing lesson... ({tokens} tokens)")
+        yield f"✍️ Writing lesson... ({tokens} tokens)\n\n{content}", gr.update(), gr.update()
     
     progress(1.0, desc="Complete!")
     
@@ -197,12 +245,11 @@ def create_new_lesson(topic, lesson_name, age_range, progress=gr.Progress()):
             actual_name = name_to_use
         else:
             # Extract from topic
-            actual_name = topic.lower().strip().replace(" ", "_").replace("/", "_").replace("\\", "_")
-            actual_name = "".join(c for c in actual_name if c.isalnum() or c in ("_", "-"))
+            actual_name = lesson_name_from_topic(topic)
         
         # Get a preview of the lesson content
         try:
-            content = get_lesson_content(actual_name, max_length=500)
+            content = read_lesson(actual_name, max_length=500)
             if not content.startswith("Error:"):
                 lesson_content_preview = f"\n\n📖 Lesson Preview (first 500 characters):\n\n{content}"
         except:
@@ -210,20 +257,31 @@ def create_new_lesson(topic, lesson_name, age_range, progress=gr.Progress()):
         
         # Update lesson dropdown with new lesson list
         try:
-            lesson_choices = json.loads(get_lesson_list())
+            lesson_choices = lesson_catalog.list_names()
             lesson_dropdown_update = gr.update(choices=lesson_choices, value=actual_name)
         except:
             lesson_dropdown_update = gr.update()
     
-    return result + lesson_content_preview, "", lesson_dropdown_update
+    yield result + lesson_content_preview, "", lesson_dropdown_update
 
 
-def custom_respond(
-    message, history, lesson_name, lesson_content, selected_tutor, difficulty_level
+@metrics.instrument("handler")
+async def custom_respond(
+    message,
+    history,
+    lesson_name,
+    lesson_content,
+    selected_tutor,
+    difficulty_level,
+    selected_language="English",
+    chat_session=None,
 ):
     """
     Custom respond function with educational system prompt.
     
+    Only the recent part of the history is sent verbatim; older turns are
+    replaced by a rolling summary kept in the chat session state.
+    
     Args:
         message: User's message
         history: Conversation history
@@ -231,6 +289,8 @@ def custom_respond(
         lesson_content: Content of the lesson
         selected_tutor: Name of the selected tutor
         difficulty_level: Difficulty level (beginner, intermediate, advanced)
+        selected_language: Language selected for the lesson
+        chat_session: Per-session state dict holding the rolling conversation summary
     
     Yields:
         Response chunks from the LLM
@@ -239,30 +299,93 @@ def custom_respond(
         yield "Please select a lesson and tutor first."
         return
 
+    model = route_model("respond")
     if not lesson_content:
-        lesson_content = get_lesson_content(lesson_name, LESSON_CONTENT_MAX_LENGTH)
+        lesson_content = fit_lesson(read_lesson(lesson_name), model)
 
     # Get tutor description
     tutor_description = get_tutor_description(selected_tutor)
     if not tutor_description:
         tutor_description = "a friendly and patient educational tutor"
 
+    # Lesson and history share the context window left once the instructions,
+    # the message and the reply are reserved
+    instructions_tokens = count_tokens(
+        generate_tutor_system_prompt(selected_tutor, tutor_description, difficulty_level, ""), model
+    ) + count_tokens(str(message), model)
+    lesson_tokens, history_tokens = get_budget(model).allocate(instructions_tokens, get_route("respond").max_tokens)
+    lesson_content = fit_lesson(lesson_content, model, lesson_tokens)
+    history_policy = HistoryPolicy(model, max_tokens=history_tokens)
+
+    # Long lessons are represented by their outline in the (cacheable) system prompt,
+    # and only the sections relevant to this turn are appended below
+    use_retrieval = lesson_token_count(lesson_content, model) > LESSON_RETRIEVAL_MIN_TOKENS
+    prompt_lesson_content = lesson_outline(lesson_content) if use_retrieval else lesson_content
+
     # Generate educational system prompt with enhanced pedagogy focused on problem-solving
     system_prompt = generate_tutor_system_prompt(
         tutor_name=selected_tutor,
         tutor_description=tutor_description,
         difficulty_level=difficulty_level,
-        lesson_content=lesson_content
+        lesson_content=prompt_lesson_content
+    )
+
+    if use_retrieval:
+        # Include the previous tutor reply so short answers ("yes!", "a triangle?") still match
+        last_reply = next((h.get("content", "") for h in reversed(history) if h.get("role") == "assistant"), "")
+        query = f"{message}\n{last_reply if isinstance(last_reply, str) else ''}"
+        system_prompt += (
+            f"\nRELEVANT LESSON SECTIONS FOR THIS MESSAGE:\n"
+            f"{relevant_lesson_sections(lesson_content, query)}\n"
+        )
+
+    # Keep the prompt size constant: recent turns verbatim, older turns as a summary
+    summary = chat_session.get("summary") if chat_session is not None else None
+    recent_history, summary_text = history_policy.apply(history, summary)
+    if summary_text:
+        system_prompt += f"\nSUMMARY OF THE EARLIER CONVERSATION:\n{summary_text}\n"
+
+    # Opening questions repeat across sessions; their replies may be served from the response cache
+    cache_key = response_cache_key(
+        lesson_content, selected_tutor, difficulty_level, message, selected_language, history
     )
 
     # Call the respond method with educational system prompt
-    call_llm = LLMCall()
-    for response in call_llm.respond(
+    call_llm = AsyncLLMCall(
+        usage_labels=_usage_labels(chat_session, lesson_name, selected_tutor, difficulty_level)
+    )
+    async for response in call_llm.respond(
         message, 
-        history, 
+        recent_history, 
         system_prompt=system_prompt,
         tutor_name=selected_tutor,
-        difficulty_level=difficulty_level
+        difficulty_level=difficulty_level,
+        cache_key=cache_key,
     ):
         yield response
 
+    # Refresh the summary out of band so it is ready for the next turns
+    if chat_session is not None and history_policy.should_summarize(history, summary):
+        _schedule_summary(call_llm, history_policy, chat_session, history, summary)
+
+
+def _schedule_summary(call_llm, history_policy, chat_session, history, summary):
+    """Start a background task folding older turns into the session's rolling summary."""
+    if chat_session.get("summarizing"):
+        return
+    chat_session["summarizing"] = True
+
+    async def _summarize():
+        try:
+            messages, covered = history_policy.pending(history, summary)
+            text = await call_llm.summarize_conversation(messages, summary.text if summary else None)
+            chat_session["summary"] = history_policy.make_summary(history, text, covered)
+        except Exception as e:
+            print(f"Error summarizing conversation: {str(e)}")
+        finally:
+            chat_session["summarizing"] = False
+
+    task = asyncio.create_task(_summarize())
+    _background_tasks.add(task)
+    task.add_done_callback(_background_tasks.discard)
+
@@ -1,10 +1,22 @@
 """Gradio UI components and interface definition."""
 
-import json
+import os
+
 import gradio as gr
 
-from learnbee.constants import TUTOR_NAMES, LANGUAGES, DIFFICULTY_LEVELS, AGE_RANGES, get_tutor_names
-from learnbee.mcp_server import get_lesson_list, get_lesson_content
+from learnbee.constants import (
+    TUTOR_NAMES, LANGUAGES, DIFFICULTY_LEVELS, AGE_RANGES, UI_CONCURRENCY_LIMIT, get_tutor_names
+)
+from learnbee.lesson_catalog import lesson_catalog
+from learnbee.mcp_server import (
+    create_lessons,
+    get_lesson_chunk,
+    get_lesson_content,
+    get_lesson_introduction,
+    get_lesson_list,
+    get_usage_report,
+    search_lessons,
+)
 from learnbee.theme import BEAUTIFUL_THEME, CUSTOM_CSS
 from learnbee.tutor_handlers import (
     load_lesson_content,
@@ -14,6 +26,14 @@ from learnbee.tutor_handlers import (
 )
 
 
+def _concurrency_limit() -> int | None:
+    """Return the per-event concurrency limit: LEARNBEE_UI_CONCURRENCY_LIMIT, or UI_CONCURRENCY_LIMIT."""
+    value = os.getenv("LEARNBEE_UI_CONCURRENCY_LIMIT", "").strip().lower()
+    if not value:
+        return UI_CONCURRENCY_LIMIT
+    return None if value == "none" else int(value)
+
+
 def create_gradio_ui():
     """
     Create and return the Gradio interface for the Learnbee MCP application.
@@ -21,12 +41,12 @@ def create_gradio_ui():
     Returns:
         Gradio Blocks interface
     """
-    lesson_name = gr.BrowserState("")
-    selected_tutor = gr.BrowserState(get_tutor_names()[0] if TUTOR_NAMES else "")
-
-    lesson_choices = json.loads(get_lesson_list())
+    lesson_choices = lesson_catalog.list_names()
 
     with gr.Blocks(theme=BEAUTIFUL_THEME, css=CUSTOM_CSS, title="Learnbee MCP - Educational Tutor") as demo:
+        # Created inside the Blocks so they are part of the app config used by API/MCP clients
+        lesson_name = gr.BrowserState("")
+        selected_tutor = gr.BrowserState(get_tutor_names()[0] if TUTOR_NAMES else "")
 
         # Beautiful Header
         gr.HTML("""
@@ -107,6 +127,9 @@ def create_gradio_ui():
             # Hidden textbox for lesson content
             lesson_content = gr.Textbox(visible=False)
 
+            # Per-session chat state (rolling conversation summary)
+            chat_session = gr.State({})
+
             with gr.Row():
 
                 with gr.Column(scale=1):
@@ -179,6 +202,8 @@ def create_gradio_ui():
                             lesson_content,
                             tutor_dropdown,
                             difficulty_dropdown,
+                            language_dropdown,
+                            chat_session,
                         ],
                         type="messages",
                         autofocus=False
@@ -187,7 +212,7 @@ def create_gradio_ui():
                     # Connect load button after chat_interface is defined
                     load_button.click(
                         fn=load_lesson_content,
-                        inputs=[lesson_dropdown, tutor_dropdown, language_dropdown],
+                        inputs=[lesson_dropdown, tutor_dropdown, language_dropdown, chat_session],
                         outputs=[
                             lesson_name,
                             lesson_content,
@@ -331,6 +356,13 @@ def create_gradio_ui():
                     )
             btn.click(get_lesson_content, [lesson_name_input, lesson_len], lesson_content_output)
 
+        # API-only endpoints, exposed as MCP tools without a dedicated tab
+        gr.api(get_lesson_introduction)
+        gr.api(get_lesson_chunk)
+        gr.api(search_lessons)
+        gr.api(create_lessons)
+        gr.api(get_usage_report)
+
         # Footer: Multilingual Support (full-width)
         gr.HTML("""
             <footer class="multilingual-footer">
@@ -349,5 +381,8 @@ def create_gradio_ui():
             </footer>
         """)
 
+    # Gradio runs one instance of each event at a time by default, which would serialize
+    # every chat stream across all sessions
+    demo.queue(default_concurrency_limit=_concurrency_limit())
     return demo
 
@@ -0,0 +1,211 @@
+"""
+Token usage and cost ledger.
+
+Every LLM API call reports its usage here, labelled with the session, lesson,
+tutor and difficulty level of the LLMCall that made it. Usage is aggregated
+in memory and periodically added to a SQLite table, which query() reads.
+"""
+
+import atexit
+import logging
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+from learnbee.constants import MODEL_PRICES, USAGE_FLUSH_INTERVAL, USAGE_LEDGER_PATH
+
+logger = logging.getLogger(__name__)
+
+# Labels every usage record is aggregated by, in table column order
+USAGE_LABELS = ("session", "lesson", "tutor", "difficulty")
+GROUP_BY_COLUMNS = ("day", *USAGE_LABELS, "operation", "model")
+_COUNTER_COLUMNS = ("calls", "prompt_tokens", "cached_tokens", "completion_tokens", "cost_usd")
+
+
+def usage_cost(model: str, prompt_tokens: int, cached_tokens: int, completion_tokens: int) -> float:
+    """
+    Estimate the cost of one call in US dollars.
+
+    Args:
+        model (str): The model name. Dated snapshots (e.g. "gpt-4o-mini-2024-07-18")
+            use the price of their base model. Unknown models cost 0.
+        prompt_tokens (int): Prompt tokens, including cached ones.
+        cached_tokens (int): Prompt tokens served from the provider's prompt cache.
+        completion_tokens (int): Completion tokens.
+
+    Returns:
+        float: The estimated cost.
+    """
+    prices = MODEL_PRICES.get(model) or next(
+        (price for name, price in MODEL_PRICES.items() if model.startswith(f"{name}-")), None
+    )
+    if prices is None:
+        return 0.0
+    input_price, cached_price, output_price = prices
+    return (
+        (prompt_tokens - cached_tokens) * input_price
+        + cached_tokens * cached_price
+        + completion_tokens * output_price
+    ) / 1_000_000
+
+
+class UsageLedger:
+    """
+    Aggregates token usage in memory and adds it to a SQLite table periodically.
+
+    Recording never touches the disk, so it is cheap enough for every call.
+    A daemon thread flushes the pending totals every ``flush_interval`` seconds
+    and at exit. Database errors are logged; the pending totals are then kept
+    for the next flush.
+    """
+
+    def __init__(self, path: str | Path, flush_interval: float = USAGE_FLUSH_INTERVAL):
+        """
+        Initialize the ledger.
+
+        Args:
+            path (str | Path): Location of the SQLite database file.
+            flush_interval (float): Seconds between two flushes.
+        """
+        self.path = Path(path)
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._db_lock = threading.Lock()
+        self._pending: dict[tuple, list] = {}
+        self._conn = None
+        self._flusher = None
+
+    def record(
+        self,
+        operation: str,
+        model: str,
+        prompt_tokens: int,
+        cached_tokens: int,
+        completion_tokens: int,
+        labels: dict = None,
+    ):
+        """
+        Add the usage of one API call.
+
+        Args:
+            operation (str): The LLMCall operation, e.g. "respond".
+            model (str): The model that served the call.
+            prompt_tokens (int): Prompt tokens, including cached ones.
+            cached_tokens (int): Cached prompt tokens.
+            completion_tokens (int): Completion tokens.
+            labels (dict): Session, lesson, tutor and difficulty of the call; missing labels are empty.
+        """
+        labels = labels or {}
+        day = datetime.now(timezone.utc).date().isoformat()
+        key = (day, *(str(labels.get(name) or "") for name in USAGE_LABELS), operation, model)
+        cost = usage_cost(model, prompt_tokens, cached_tokens, completion_tokens)
+        with self._lock:
+            totals = self._pending.setdefault(key, [0, 0, 0, 0, 0.0])
+            totals[0] += 1
+            totals[1] += prompt_tokens
+            totals[2] += cached_tokens
+            totals[3] += completion_tokens
+            totals[4] += cost
+            if self._flusher is None:
+                self._start_flusher()
+
+    def flush(self):
+        """Add the pending totals to the database."""
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        placeholders = ", ".join("?" * (len(GROUP_BY_COLUMNS) + len(_COUNTER_COLUMNS)))
+        updates = ", ".join(f"{column} = {column} + excluded.{column}" for column in _COUNTER_COLUMNS)
+        with self._db_lock:
+            try:
+                conn = self._connect()
+                conn.executemany(
+                    f"INSERT INTO usage ({', '.join(GROUP_BY_COLUMNS + _COUNTER_COLUMNS)}) VALUES ({placeholders}) "
+                    f"ON CONFLICT ({', '.join(GROUP_BY_COLUMNS)}) DO UPDATE SET {updates}",
+                    [(*key, *totals) for key, totals in pending.items()],
+                )
+                conn.commit()
+            except (sqlite3.Error, OSError) as e:
+                logger.warning("Usage ledger flush failed: %s", e)
+                self._restore(pending)
+
+    def query(self, group_by: tuple[str, ...] = ("lesson",), filters: dict = None, limit: int = 50) -> list[dict]:
+        """
+        Return usage totals grouped by some columns, most expensive first.
+
+        Pending usage is flushed first, so the result includes the latest calls.
+
+        Args:
+            group_by (tuple[str, ...]): Columns to group by, among GROUP_BY_COLUMNS.
+            filters (dict): Exact-match filters on GROUP_BY_COLUMNS, e.g. {"session": "..."}.
+            limit (int): Maximum number of rows.
+
+        Returns:
+            list[dict]: One dict per group with the group columns and the summed counters.
+
+        Raises:
+            ValueError: If a group-by or filter column is unknown.
+        """
+        filters = {column: value for column, value in (filters or {}).items() if value}
+        unknown = [column for column in (*group_by, *filters) if column not in GROUP_BY_COLUMNS]
+        if unknown:
+            raise ValueError(f"Unknown usage column(s) {unknown}; expected some of {list(GROUP_BY_COLUMNS)}")
+
+        self.flush()
+        columns = ", ".join(group_by)
+        sums = ", ".join(f"SUM({column}) AS {column}" for column in _COUNTER_COLUMNS)
+        where = " AND ".join(f"{column} = ?" for column in filters) or "1"
+        sql = (
+            f"SELECT {columns + ', ' if group_by else ''}{sums} FROM usage WHERE {where} "
+            f"{'GROUP BY ' + columns if group_by else ''} ORDER BY cost_usd DESC, prompt_tokens DESC LIMIT ?"
+        )
+        with self._db_lock:
+            try:
+                cursor = self._connect().execute(sql, (*filters.values(), int(limit)))
+                names = [description[0] for description in cursor.description]
+                rows = [dict(zip(names, row)) for row in cursor.fetchall()]
+            except (sqlite3.Error, OSError) as e:
+                logger.warning("Usage ledger query failed: %s", e)
+                return []
+        # An empty table still yields one row of NULL sums without GROUP BY
+        return [row for row in rows if row["calls"]]
+
+    def _restore(self, pending: dict):
+        with self._lock:
+            for key, totals in pending.items():
+                current = self._pending.setdefault(key, [0, 0, 0, 0, 0.0])
+                for i, value in enumerate(totals):
+                    current[i] += value
+
+    def _start_flusher(self):
+        def _run():
+            while True:
+                time.sleep(self.flush_interval)
+                self.flush()
+
+        self._flusher = threading.Thread(target=_run, name="usage-ledger-flush", daemon=True)
+        self._flusher.start()
+        atexit.register(self.flush)
+
+    def _connect(self) -> sqlite3.Connection:
+        """Open the database on first use and create the schema if needed."""
+        if self._conn is None:
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            conn = sqlite3.connect(self.path, check_same_thread=False)
+            conn.execute(
+                "CREATE TABLE IF NOT EXISTS usage ("
+                "day TEXT NOT NULL, session TEXT NOT NULL, lesson TEXT NOT NULL, tutor TEXT NOT NULL, "
+                "difficulty TEXT NOT NULL, operation TEXT NOT NULL, model TEXT NOT NULL, "
+                "calls INTEGER NOT NULL, prompt_tokens INTEGER NOT NULL, cached_tokens INTEGER NOT NULL, "
+                "completion_tokens INTEGER NOT NULL, cost_usd REAL NOT NULL, "
+                f"PRIMARY KEY ({', '.join(GROUP_BY_COLUMNS)}))"
+            )
+            conn.commit()
+            self._conn = conn
+        return self._conn
+
+
+usage_ledger = UsageLedger(USAGE_LEDGER_PATH)